@@ -6,11 +6,11 @@ Compares naive, list, and tree indel algorithms to demonstrate
 that indel simulation is the rate limiting step.
 """
 
-import subprocess
 import pandas as pd
-import tempfile
 from pathlib import Path
 
+from indelsim.sweep import run_sweep
+
 # Configuration
 OUTPUT_DIR = "benchmark/assets/data/"
 ALGORITHMS = ['naive', 'list', 'tree']
@@ -21,70 +21,35 @@ SEQUENCE_LENGTHS = [100, 500, 1000, 5000]
 BRANCH_LENGTHS = [0.01, 0.05, 0.1, 0.5]
 NUM_SIMULATIONS = 3
 TREE_FILE = "benchmark/scaled_trees/scaled_1.tree"  # Path to your tree file
+WORKERS = 1  # Keep at 1 so the timings are not skewed by competing processes
 
 
-def create_test_tree(branch_length=0.1):
-    """Read tree file and set all branches to specified length"""
-    try:
-        with open(TREE_FILE, 'r') as f:
-            tree_content = f.read().strip()
-        
-        # Replace all branch lengths with the new value
-        # This regex finds patterns like :0.123 and replaces with :branch_length
-        import re
-        tree_with_new_branches = re.sub(r':\d*\.?\d+', f':{branch_length}', tree_content)
-        return tree_with_new_branches
-        
-    except FileNotFoundError:
-        print(f"Warning: Tree file {TREE_FILE} not found")
-    
-def run_simulation(algorithm, ins_rate, del_rate, seq_len, branch_len, tree_content):
-    """Run single simulation and extract timing"""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        tree_file = Path(temp_dir) / "tree.newick"
-        tree_file.write_text(tree_content)
-        cmd = [
-            "msa-simulator",
-            "--type", algorithm,
-            "--insertion_rate", str(ins_rate),
-            "--deletion_rate", str(del_rate),
-            "--original_sequence_length", str(seq_len),
-            "--tree_file", str(tree_file),
-            "--number_of_simulations", str(NUM_SIMULATIONS),
-            "--keep_in_memory",
-            "--output_type", "drop_output",
-            "--benchmark",
-        ]
-        # print(" ".join(cmd))
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
-            if result.returncode != 0:
-                return None
-            # Parse timing from output
-            indel_time = sub_time = total_time = 0.0
-            for line in result.stdout.split('\n'):
-                if "Indel simulation:" in line:
-                    indel_time = float(line.split(':')[1].split('s')[0].strip())
-                elif "Substitution simulation:" in line:
-                    sub_time = float(line.split(':')[1].split('s')[0].strip())
-                elif "Total runtime:" in line:
-                    total_time = float(line.split(':')[1].split('s')[0].strip())
-            
-            return {
-                'algorithm': algorithm,
-                'insertion_rate': ins_rate,
-                'deletion_rate': del_rate,
-                'sequence_length': seq_len,
-                'branch_length': branch_len,
-                'indel_time': indel_time,
-                'substitution_time': sub_time,
-                'total_time': total_time,
-                'indel_ratio': indel_time / (indel_time + sub_time) if (indel_time + sub_time) > 0 else 0,
-                'speedup_vs_naive': 1.0
-            }
-        except Exception as e:
-            print(e)
-            return None
+def run_grid():
+    """Run the whole grid in-process and sum the replicate timings of every point"""
+    grid = {
+        'engine': ALGORITHMS,
+        'insertion_rate': [INSERTION_RATE],
+        'deletion_rate': [DELETION_RATE],
+        'root_length': SEQUENCE_LENGTHS,
+        'branch_length': BRANCH_LENGTHS,
+    }
+    rows = run_sweep(TREE_FILE, grid, replicates=NUM_SIMULATIONS, enable_substitutions=True,
+                     substitution_algorithm="matrix", workers=WORKERS)
+    runs = pd.DataFrame(rows)
+    df = (runs.groupby(['engine', 'insertion_rate', 'deletion_rate', 'root_length', 'branch_length'], sort=False)
+              [['indel_seconds', 'substitution_seconds', 'total_seconds']].sum().reset_index())
+    df = df.rename(columns={
+        'engine': 'algorithm',
+        'root_length': 'sequence_length',
+        'indel_seconds': 'indel_time',
+        'substitution_seconds': 'substitution_time',
+        'total_seconds': 'total_time',
+    })
+    phase_time = df['indel_time'] + df['substitution_time']
+    df['indel_ratio'] = (df['indel_time'] / phase_time).where(phase_time > 0, 0.0)
+    df['speedup_vs_naive'] = 1.0
+    return df
+
 
 def main():
     output_dir = Path(OUTPUT_DIR)
@@ -92,35 +57,11 @@ def main():
     
     print("Indel Algorithm Performance Comparison")
     print("=" * 50)
-    INDEL_RATES = INSERTION_RATE + DELETION_RATE
-    results = []
     total_runs = len(ALGORITHMS) * len(SEQUENCE_LENGTHS) * len(BRANCH_LENGTHS)
-    current_run = 0
-    
-    for algorithm in ALGORITHMS:
-        print(f"\nTesting {algorithm} algorithm...")
-        
-        # for indel_rate in INDEL_RATES:
-        for seq_len in SEQUENCE_LENGTHS:
-            for branch_len in BRANCH_LENGTHS:
-                current_run += 1
-                ins_rate = INSERTION_RATE
-                del_rate = DELETION_RATE
-                print(f"  [{current_run:2d}/{total_runs}] "
-                        f"indel={INDEL_RATES:.3f}, len={seq_len}, branch={branch_len:.3f}", 
-                        end=" ... ")
-                
-                tree_content = create_test_tree(branch_len)
-                result = run_simulation(algorithm, ins_rate, del_rate, seq_len, branch_len, tree_content)
-                
-                if result:
-                    results.append(result)
-                    print(f"✓ indel_ratio={result['indel_ratio']:.2f}")
-                else:
-                    print("✗")
+    print(f"Running {total_runs} grid points with {NUM_SIMULATIONS} simulations each...")
+    df = run_grid()
     
     # Calculate speedups vs naive
-    df = pd.DataFrame(results)
     for _, group in df.groupby(['insertion_rate', 'deletion_rate', 'sequence_length', 'branch_length']):
         naive_time = group[group['algorithm'] == 'naive']['indel_time'].iloc[0] if 'naive' in group['algorithm'].values else 1.0
         for idx, row in group.iterrows():
@@ -148,4 +89,4 @@ def main():
     print(f"Results saved to: {output_file}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,5 +1,6 @@
 from .indel_simulator import main
+from .api import simulate
 from . import enums, utils, constants
 
 __version__ = "1.0.0"
-__all__ = ["main", "enums", "utils", "constants"]
\ No newline at end of file
+__all__ = ["main", "simulate", "enums", "utils", "constants"]
\ No newline at end of file
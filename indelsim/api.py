@@ -0,0 +1,163 @@
+"""
+In-process Python API for running many simulations.
+
+    from indelsim import simulate
+
+    for result in simulate("tree.newick", config, n=100_000, engine="tree"):
+        consume(result["msa"])
+
+Replicates are produced lazily, one at a time. The tree is parsed once and the
+substitution model is shared across replicates, and nothing from a replicate is
+retained after it has been yielded, so memory stays flat however many
+replicates are requested. Replicate `i` uses the seed ``config.random_seed + i``,
+exactly like the command-line tools, and produces the same alignment as them.
+"""
+
+import copy
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+
+import numpy as np
+from ete3 import Tree
+
+from indelsim.classes.models import get_model
+from indelsim.classes.sim_config import SimConfiguration, SimulationBudgetExceeded
+from indelsim.classes.simulation import Simulation
+from indelsim.classes.substitution import SubstitutionEvolver, sample_root_sequence
+from indelsim.classes.subtree_scheduler import SubtreeScheduler
+from indelsim.enums import SimulationTypes
+
+__all__ = ["simulate", "ENGINE_TYPES"]
+
+ENGINE_TYPES = {
+    "naive": SimulationTypes.NAIVE,
+    "list": SimulationTypes.BLOCK_LIST,
+    "tree": SimulationTypes.BLOCK_TREE,
+}
+
+
+
+def _resolve_engine(engine: Union[str, SimulationTypes, None]) -> Optional[SimulationTypes]:
+    if engine is None or isinstance(engine, SimulationTypes):
+        return engine
+    try:
+        return ENGINE_TYPES[engine]
+    except KeyError:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {sorted(ENGINE_TYPES)} or None")
+
+
+def _simulate_indels(tree: Tree, config: SimConfiguration, engine: SimulationTypes,
+                     subtree_workers: Optional[int] = None, split_depth: int = 2) -> Dict[str, str]:
+    """Run the indel phase and return the gap template of every leaf, keyed by leaf name."""
+    if subtree_workers is not None:
+        msa = SubtreeScheduler(tree, config, engine, split_depth, subtree_workers).run()
+    else:
+        simulation = Simulation(tree, config)
+        if engine == SimulationTypes.NAIVE:
+            simulation.msa_from_naive()
+        elif engine == SimulationTypes.BLOCK_LIST:
+            simulation.msa_from_blocklist()
+        else:
+            simulation.msa_from_blocktree()
+        msa = simulation.msa
+    msa.compute_msa()
+    return {msa._id_to_name[node_id]: row for node_id, row in msa._aligned_sequences.items()}
+
+
+def _simulate_substitutions(tree: Tree, config: SimConfiguration, msa_length: int,
+                            gap_templates: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """Evolve residues along the tree and lay them over the gap templates."""
+    model = get_model(config.substitution_model, **(config.substitution_model_parameters or {}))
+    root_sequence = sample_root_sequence(msa_length, config.random_seed, model)
+    evolver = SubstitutionEvolver(substitution_rate=config.substitution_rate, seed=config.random_seed,
+                                  matrix_sampler=config.matrix_sampler, model=model)
+
+    rows = {}
+    for _, node, evolved_sequence in evolver.evolve_tree(tree, root_sequence, config.substitution_algorithm,
+                                                           recycle_buffers=True):
+        if gap_templates is not None:
+            gaps = np.frombuffer(gap_templates[node.name].encode(), dtype=np.uint8) == ord('-')
+            evolved_sequence = np.where(gaps, model.num_states, evolved_sequence)
+        rows[node.name] = model.residue_bytes(evolved_sequence).decode("ascii")
+    return rows
+
+
+def simulate(tree: Union[Path, str, Tree], config: SimConfiguration, n: int = 1,
+             engine: Union[str, SimulationTypes, None] = "tree",
+             first_simulation: int = 0, subtree_workers: Optional[int] = None,
+             split_depth: int = 2) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily simulate `n` replicates along a phylogenetic tree.
+
+    Args:
+        tree: Newick file, newick string or an already parsed ete3 tree
+        config: Simulation parameters; substitutions are added on top of the
+            indel template when ``config.enable_substitutions`` is set
+        n: Number of replicates to yield
+        engine: Indel engine - "naive", "list", "tree" (or a SimulationTypes value),
+            or None to skip the indel phase and simulate substitutions only
+        first_simulation: Index of the first replicate, e.g. to continue a batch
+        subtree_workers: Simulate the indel phase of every replicate with a
+            `SubtreeScheduler` using this many worker processes, for trees too
+            large to wait on one process. It needs a block engine, and since
+            its branches draw from their own random streams, its alignments
+            differ from the command-line tools for the same seed.
+        split_depth: Depth below which the scheduler hands subtrees to the workers
+
+    Yields:
+        One dictionary per replicate with its number, seed, runtimes (total and
+        per phase) and the alignment as a mapping from leaf name to aligned row.
+        A replicate exceeding a budget of `config` (``max_sequence_length`` etc.)
+        is stopped early and yielded with ``msa`` None and the exceeded budget
+        under ``rejected``; ``rejected`` is None for all other replicates.
+    """
+    engine = _resolve_engine(engine)
+    if engine is None and not config.enable_substitutions:
+        raise ValueError("Nothing to simulate: no indel engine and substitutions are disabled")
+    if n < 0:
+        raise ValueError("Number of simulations must be non-negative")
+    if subtree_workers is not None and engine not in (SimulationTypes.BLOCK_LIST, SimulationTypes.BLOCK_TREE):
+        raise ValueError("Subtree scheduling requires the 'list' or 'tree' engine")
+
+    parsed_tree = tree if isinstance(tree, Tree) else Tree(str(tree))
+    for sim_num in range(first_simulation, first_simulation + n):
+        replicate_config = copy.copy(config)
+        replicate_config.random_seed = config.random_seed + sim_num
+
+        start_time = time.perf_counter()
+        gap_templates = None
+        msa_length = config.original_sequence_length
+        if engine is not None:
+            try:
+                gap_templates = _simulate_indels(parsed_tree, replicate_config, engine, subtree_workers, split_depth)
+            except SimulationBudgetExceeded as e:
+                yield {
+                    "simulation_number": sim_num + 1,
+                    "seed": replicate_config.random_seed,
+                    "runtime_seconds": time.perf_counter() - start_time,
+                    "indel_runtime_seconds": time.perf_counter() - start_time,
+                    "substitution_runtime_seconds": 0.0,
+                    "msa_length": None,
+                    "msa": None,
+                    "rejected": e.as_dict(),
+                }
+                continue
+            msa_length = len(next(iter(gap_templates.values()), ""))
+        indel_end_time = time.perf_counter()
+        if config.enable_substitutions:
+            rows = _simulate_substitutions(parsed_tree, replicate_config, msa_length, gap_templates)
+        else:
+            rows = gap_templates
+        end_time = time.perf_counter()
+
+        yield {
+            "simulation_number": sim_num + 1,
+            "seed": replicate_config.random_seed,
+            "runtime_seconds": end_time - start_time,
+            "indel_runtime_seconds": indel_end_time - start_time,
+            "substitution_runtime_seconds": end_time - indel_end_time,
+            "msa_length": msa_length,
+            "msa": rows,
+            "rejected": None,
+        }
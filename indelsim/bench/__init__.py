@@ -0,0 +1,31 @@
+"""
+Benchmarks of the simulator internals, run in-process.
+
+- ``indelsim.bench.engines``: microbenchmarks of the indel engines on synthetic event streams
+- ``indelsim.bench.trees``: synthetic trees of any size and shape
+- ``indelsim.bench.scaling``: scaling of the simulators with the number of leaves and the tree shape
+- ``indelsim.bench.complexity``: empirical complexity of the indel engines, fitted from traced runs
+- ``indelsim.bench.fuzz``: differential fuzzing of the engines and MSA builders against the naive engine
+- ``indelsim.bench.harness``: named benchmark cases and baselines tagged by git revision
+  (``python -m indelsim.bench`` / ``indel-bench``)
+"""
+
+from indelsim.bench.complexity import (CostModelFit, SlopeFit, collect_samples, fit_cost_models,
+                                       fit_per_event_slopes, fit_slopes, write_report)
+from indelsim.bench.engines import (DEFAULT_STREAMS, ENGINES, EngineMeasurement, EventStreamSpec,
+                                    compare_to_baseline, generate_events, load_baseline, run_engine_benchmark,
+                                    run_engine_suite, save_baseline)
+from indelsim.bench.fuzz import (MSA_BUILDERS, Discrepancy, EventCase, FuzzResult, TreeCase, check_event_case,
+                                 check_tree_case, run_fuzz)
+from indelsim.bench.harness import (CASES, BenchmarkCase, CaseResult, Comparison, compare_results, load_results,
+                                    register_case, run_cases, save_results)
+from indelsim.bench.scaling import ScalingFit, fit_power_law, fit_scaling, run_scaling_benchmark
+from indelsim.bench.trees import TREE_SHAPES, SyntheticTree, generate_tree
+
+__all__ = ["DEFAULT_STREAMS", "ENGINES", "EngineMeasurement", "EventStreamSpec", "compare_to_baseline",
+           "generate_events", "load_baseline", "run_engine_benchmark", "run_engine_suite", "save_baseline",
+           "ScalingFit", "fit_power_law", "fit_scaling", "run_scaling_benchmark", "TREE_SHAPES", "SyntheticTree",
+           "generate_tree", "CASES", "BenchmarkCase", "CaseResult", "Comparison", "compare_results", "load_results",
+           "register_case", "run_cases", "save_results", "CostModelFit", "SlopeFit", "collect_samples",
+           "fit_cost_models", "fit_per_event_slopes", "fit_slopes", "write_report", "MSA_BUILDERS", "Discrepancy",
+           "EventCase", "FuzzResult", "TreeCase", "check_event_case", "check_tree_case", "run_fuzz"]
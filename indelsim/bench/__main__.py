@@ -0,0 +1,3 @@
+from indelsim.bench.harness import main
+
+main()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Empirical complexity of the indel engines.
+
+The README states O(k*n') for the naive engine, O(k*b + n') for the block list
+and O(k*log(b) + n') for the block tree, with k events, b blocks and n' sites.
+This benchmark checks those costs against the implementation. It simulates a
+grid of root lengths and branch lengths on a Yule tree with every engine while
+tracing (``indelsim.tracing``), and turns the spans into one sample per branch
+and phase:
+
+- ``events``: applying the branch's events (spans "block updates" / "naive updates")
+- ``sequence``: building the branch sequence from its blocks ("generate sequence")
+
+plus one sample per replicate and engine for ``alignment`` (the naive
+alignment) and ``render`` (``Msa.compute_msa``). Every sample carries k (events),
+b (blocks after the events, the same for every engine) and n' (sites after the
+events; for replicate samples the totals and the MSA length).
+
+Three analyses are reported per engine and phase:
+
+- log-log slopes of the time in k, b and n' (least squares on all three)
+- slopes of the time per event in b and in n' alone: a block list should show
+  a slope near 1 in b, a block tree near 0, the naive engine near 1 in n'
+- linear cost models ``time = overhead + rate * x`` with x one of k, k*n',
+  k*b and k*log2(b+1): the best fit, and the share of branches whose overhead
+  outweighs the modelled work, i.e. where constant factors dominate
+
+    indel-bench-complexity --output_directory complexity/
+
+writes ``samples.csv``, ``report.md`` and ``complexity.png``.
+"""
+
+import argparse
+import math
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+from ete3 import Tree
+
+from indelsim.api import ENGINE_TYPES
+from indelsim.bench.trees import generate_tree
+from indelsim.classes.sim_config import SimConfiguration
+from indelsim.classes.simulation import Simulation
+from indelsim.sweep import write_rows
+from indelsim.tracing import start_tracing, stop_tracing
+
+__all__ = ["COST_MODELS", "EXPECTED_MODELS", "SlopeFit", "CostModelFit", "collect_samples", "fit_slopes",
+           "fit_per_event_slopes", "fit_cost_models", "write_report"]
+
+_ENGINE_METHODS = {"naive": "msa_from_naive", "list": "msa_from_blocklist", "tree": "msa_from_blocktree"}
+
+# Span names of the per-branch phases
+_BRANCH_PHASES = {"block updates": "events", "naive updates": "events", "generate sequence": "sequence"}
+
+COST_MODELS: Dict[str, Callable[[np.ndarray, np.ndarray, np.ndarray], np.ndarray]] = {
+    "k": lambda k, b, n: k,
+    "k*n'": lambda k, b, n: k * n,
+    "k*b": lambda k, b, n: k * b,
+    "k*log2(b+1)": lambda k, b, n: k * np.log2(b + 1),
+}
+
+# Event costs claimed by the README
+EXPECTED_MODELS = {"naive": "k*n'", "list": "k*b", "tree": "k*log2(b+1)"}
+
+
+@dataclass
+class SlopeFit:
+    """log(time) = intercept + slope_k * log(k) + slope_b * log(b) + slope_n * log(n')"""
+    engine: str
+    phase: str
+    samples: int
+    intercept: float
+    slope_k: float
+    slope_b: float
+    slope_n: float
+    r_squared: float
+
+
+@dataclass
+class CostModelFit:
+    """time = overhead_seconds + seconds_per_unit * x, x given by a cost model"""
+    engine: str
+    phase: str
+    model: str
+    overhead_seconds: float
+    seconds_per_unit: float
+    r_squared: float
+    overhead_dominated_share: float
+
+
+def collect_samples(engines: Sequence[str] = tuple(ENGINE_TYPES), root_lengths: Sequence[int] = (250, 1000, 4000),
+                    mean_branch_lengths: Sequence[float] = (0.02, 0.1, 0.5), leaves: int = 32,
+                    insertion_rate: float = 0.03, deletion_rate: float = 0.09, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Simulate every root length and mean branch length with every engine and return the samples
+    (engine, phase, root length, mean branch length, node, k, b, n_before, n_after, seconds).
+    """
+    samples = []
+    for point, (root_length, mean_branch_length) in enumerate(
+            (root, branch) for root in root_lengths for branch in mean_branch_lengths):
+        newick = generate_tree("yule", leaves, total_length=mean_branch_length * (2 * leaves - 2),
+                               seed=seed).to_newick()
+        config = SimConfiguration(original_sequence_length=root_length, indel_length_alpha=2.0,
+                                  indel_truncated_length=50, rate_ins=insertion_rate, rate_del=deletion_rate,
+                                  deletion_extra_edge_length=49, seed=seed + point)
+        # Blocks depend on the events only, which are the same for every engine
+        reference = Simulation(Tree(newick), config, record_blocks=True)
+        reference.msa_from_blocktree()
+        blocks = {node_id: len(node_blocks) for node_id, node_blocks in reference.node_blocks.items()}
+        branches = {node.id: node for node in reference.sim_nodes[1:]}
+        common = {"root_length": root_length, "mean_branch_length": mean_branch_length}
+
+        for engine in engines:
+            simulation = Simulation(Tree(newick), config)
+            start_tracing()
+            try:
+                getattr(simulation, _ENGINE_METHODS[engine])()
+            finally:
+                tracer = stop_tracing()
+            for event in tracer.events:
+                phase = _BRANCH_PHASES.get(event["name"])
+                if phase is None:
+                    continue
+                node = branches[event["args"]["node"]]
+                samples.append({"engine": engine, "phase": phase, **common, "node": node.id,
+                                "k": len(node.list_of_events), "b": blocks[node.id],
+                                "n_before": node.length_of_sequence_before,
+                                "n_after": node.length_of_sequence_after_events, "seconds": event["dur"] / 1e6})
+
+            totals = {"engine": engine, **common, "node": None, "k": reference.total_events,
+                      "b": reference.total_blocks, "n_before": root_length}
+            alignment = [event for event in tracer.events if event["name"] == "naive alignment"]
+            if alignment:
+                samples.append({**totals, "phase": "alignment", "n_after": simulation.msa._msa_length,
+                                "seconds": alignment[0]["dur"] / 1e6})
+            start_time = time.perf_counter()
+            simulation.msa.compute_msa()
+            render_seconds = time.perf_counter() - start_time
+            samples.append({**totals, "phase": "render", "n_after": simulation.msa._msa_length,
+                            "seconds": render_seconds})
+    return samples
+
+
+def _usable(samples: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [sample for sample in samples if sample["k"] > 0 and sample["n_after"] > 0 and sample["seconds"] > 0]
+
+
+def _groups(samples: List[Dict[str, Any]]) -> Dict[tuple, List[Dict[str, Any]]]:
+    groups: Dict[tuple, List[Dict[str, Any]]] = {}
+    for sample in _usable(samples):
+        groups.setdefault((sample["engine"], sample["phase"]), []).append(sample)
+    return groups
+
+
+def _columns(group: List[Dict[str, Any]]):
+    return (np.array([s["k"] for s in group], dtype=float), np.array([s["b"] for s in group], dtype=float),
+            np.array([s["n_after"] for s in group], dtype=float), np.array([s["seconds"] for s in group]))
+
+
+def _least_squares(design: np.ndarray, y: np.ndarray):
+    coefficients, *_ = np.linalg.lstsq(design, y, rcond=None)
+    residual = y - design @ coefficients
+    total = np.sum((y - y.mean()) ** 2)
+    r_squared = 1 - np.sum(residual ** 2) / total if total > 0 else 1.0
+    return coefficients, float(r_squared)
+
+
+def fit_slopes(samples: List[Dict[str, Any]]) -> List[SlopeFit]:
+    """Joint log-log slopes of the time in k, b and n' per engine and phase."""
+    fits = []
+    for (engine, phase), group in _groups(samples).items():
+        if len(group) < 4:
+            continue
+        k, b, n, seconds = _columns(group)
+        design = np.column_stack([np.ones(len(group)), np.log(k), np.log(b), np.log(n)])
+        (intercept, slope_k, slope_b, slope_n), r_squared = _least_squares(design, np.log(seconds))
+        fits.append(SlopeFit(engine, phase, len(group), float(intercept), float(slope_k), float(slope_b),
+                             float(slope_n), r_squared))
+    return fits
+
+
+def fit_per_event_slopes(samples: List[Dict[str, Any]], phase: str = "events") -> Dict[str, Dict[str, float]]:
+    """Log-log slopes of the time per event in b and in n' alone, per engine ("b" and "n")."""
+    slopes = {}
+    for (engine, group_phase), group in _groups(samples).items():
+        if group_phase != phase or len(group) < 2:
+            continue
+        k, b, n, seconds = _columns(group)
+        per_event = np.log(seconds / k)
+        slopes[engine] = {"b": float(np.polyfit(np.log(b), per_event, 1)[0]) if np.ptp(b) > 0 else math.nan,
+                          "n": float(np.polyfit(np.log(n), per_event, 1)[0]) if np.ptp(n) > 0 else math.nan}
+    return slopes
+
+
+def fit_cost_models(samples: List[Dict[str, Any]], phase: str = "events") -> List[CostModelFit]:
+    """Fit every model of COST_MODELS to the per-branch times of `phase`, per engine."""
+    fits = []
+    for (engine, group_phase), group in _groups(samples).items():
+        if group_phase != phase or len(group) < 3:
+            continue
+        k, b, n, seconds = _columns(group)
+        for model, feature in COST_MODELS.items():
+            x = feature(k, b, n)
+            (overhead, rate), r_squared = _least_squares(np.column_stack([np.ones(len(x)), x]), seconds)
+            if overhead < 0:
+                # A negative overhead has no meaning, fit the work alone
+                overhead, ((rate,), r_squared) = 0.0, _least_squares(x[:, None], seconds)
+            dominated = float(np.mean(overhead > rate * x)) if rate > 0 else 1.0
+            fits.append(CostModelFit(engine, phase, model, float(overhead), float(rate), r_squared, dominated))
+    return fits
+
+
+def best_models(fits: List[CostModelFit]) -> Dict[str, CostModelFit]:
+    """Best cost model per engine, by R squared."""
+    best: Dict[str, CostModelFit] = {}
+    for fit in fits:
+        if fit.engine not in best or fit.r_squared > best[fit.engine].r_squared:
+            best[fit.engine] = fit
+    return best
+
+
+def plot_samples(samples: List[Dict[str, Any]], path: Path) -> Path:
+    """Per-event time of the events phase against b and n', one series per engine."""
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib import pyplot as plt
+
+    figure, axes = plt.subplots(1, 2, figsize=(12, 5))
+    for (engine, phase), group in sorted(_groups(samples).items()):
+        if phase != "events":
+            continue
+        k, b, n, seconds = _columns(group)
+        per_event = seconds / k * 1e6
+        axes[0].scatter(b, per_event, s=6, alpha=0.5, label=engine)
+        axes[1].scatter(n, per_event, s=6, alpha=0.5, label=engine)
+    for axis, label in zip(axes, ("blocks after the events (b)", "sites after the events (n')")):
+        axis.set_xscale("log")
+        axis.set_yscale("log")
+        axis.set_xlabel(label)
+        axis.set_ylabel("time per event (µs)")
+        axis.legend()
+    figure.suptitle("Cost per indel event, per branch")
+    figure.tight_layout()
+    figure.savefig(path, dpi=120)
+    plt.close(figure)
+    return path
+
+
+def write_report(samples: List[Dict[str, Any]], output_directory: Path | str, plot: bool = True) -> Path:
+    """Write the samples, the fits and (with `plot`) the figure to `output_directory`; returns the report path."""
+    output_directory = Path(output_directory)
+    output_directory.mkdir(parents=True, exist_ok=True)
+    write_rows(samples, output_directory / "samples.csv")
+
+    lines = ["# Empirical complexity of the indel engines", "",
+             f"{len(samples)} samples: k events, b blocks and n' sites per branch (per replicate for "
+             "alignment and render).", "",
+             "## Log-log slopes", "",
+             "| engine | phase | samples | slope k | slope b | slope n' | R² |",
+             "|---|---|---|---|---|---|---|"]
+    for fit in fit_slopes(samples):
+        lines.append(f"| {fit.engine} | {fit.phase} | {fit.samples} | {fit.slope_k:.2f} | {fit.slope_b:.2f} | "
+                     f"{fit.slope_n:.2f} | {fit.r_squared:.3f} |")
+
+    lines += ["", "## Time per event", "",
+              "Slopes of log(time / k) in log b and in log n' alone. Linear search over the blocks shows a "
+              "slope near 1 in b, a balanced tree near 0, copying the sequence a slope near 1 in n'.", "",
+              "| engine | slope b | slope n' |", "|---|---|---|"]
+    for engine, slopes in fit_per_event_slopes(samples).items():
+        lines.append(f"| {engine} | {slopes['b']:.2f} | {slopes['n']:.2f} |")
+
+    cost_fits = fit_cost_models(samples)
+    best = best_models(cost_fits)
+    lines += ["", "## Cost models of the events phase", "",
+              "time = overhead + rate × x per branch. *Overhead-dominated* is the share of branches whose fixed "
+              "overhead exceeds the modelled work.", "",
+              "| engine | model | overhead (µs) | rate (ns/unit) | R² | overhead-dominated | |",
+              "|---|---|---|---|---|---|---|"]
+    for fit in cost_fits:
+        marks = []
+        if best[fit.engine] is fit:
+            marks.append("best")
+        if EXPECTED_MODELS.get(fit.engine) == fit.model:
+            marks.append("README")
+        lines.append(f"| {fit.engine} | {fit.model} | {fit.overhead_seconds * 1e6:.1f} | "
+                     f"{fit.seconds_per_unit * 1e9:.2f} | {fit.r_squared:.3f} | "
+                     f"{fit.overhead_dominated_share:.0%} | {', '.join(marks)} |")
+
+    if plot:
+        try:
+            plot_samples(samples, output_directory / "complexity.png")
+            lines += ["", "![Cost per event](complexity.png)"]
+        except ImportError:
+            lines += ["", "No figure: matplotlib is not installed."]
+
+    report_path = output_directory / "report.md"
+    report_path.write_text("\n".join(lines) + "\n")
+    return report_path
+
+
+def _create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Fit the empirical complexity of the indel engines from traced simulations",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  indel-bench-complexity --output_directory complexity/
+
+  # Block engines only, on longer sequences and branches
+  indel-bench-complexity --engines list tree --root_lengths 1000 10000 --mean_branch_lengths 0.1 1 2
+                         --output_directory complexity/
+        """
+    )
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINE_TYPES), default=list(ENGINE_TYPES),
+                        help="Indel engines (default: all)")
+    parser.add_argument("--root_lengths", nargs="+", type=int, default=[250, 1000, 4000],
+                        help="Root sequence lengths (default: 250 1000 4000)")
+    parser.add_argument("--mean_branch_lengths", nargs="+", type=float, default=[0.02, 0.1, 0.5],
+                        help="Mean branch lengths of the tree (default: 0.02 0.1 0.5)")
+    parser.add_argument("--leaves", type=int, default=32, help="Leaves of the Yule tree (default: 32)")
+    parser.add_argument("--insertion_rate", type=float, default=0.03, help="Insertion rate (default: 0.03)")
+    parser.add_argument("--deletion_rate", type=float, default=0.09, help="Deletion rate (default: 0.09)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    parser.add_argument("--no_plot", action="store_true", help="Do not draw the figure")
+    parser.add_argument("--output_directory", type=str, default="complexity",
+                        help="Directory of the samples, report and figure (default: complexity)")
+    return parser
+
+
+def main():
+    args = _create_parser().parse_args()
+    try:
+        samples = collect_samples(args.engines, args.root_lengths, args.mean_branch_lengths, leaves=args.leaves,
+                                  insertion_rate=args.insertion_rate, deletion_rate=args.deletion_rate,
+                                  seed=args.seed)
+        report_path = write_report(samples, args.output_directory, plot=not args.no_plot)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    for engine, slopes in fit_per_event_slopes(samples).items():
+        print(f"{engine}: time per event ~ b^{slopes['b']:.2f}, ~ n'^{slopes['n']:.2f}")
+    for engine, fit in best_models(fit_cost_models(samples)).items():
+        expected = EXPECTED_MODELS.get(engine)
+        agreement = "as in the README" if fit.model == expected else f"README: {expected}"
+        print(f"{engine}: events cost best fitted by {fit.model} (R² {fit.r_squared:.3f}, {agreement}), "
+              f"overhead dominates {fit.overhead_dominated_share:.0%} of the branches")
+    print(f"Report written to {report_path}")
+
+
+if __name__ == "__main__":
+    main()
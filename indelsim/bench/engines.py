@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks of the indel engines on synthetic event streams.
+
+A tree simulation mixes the cost of the engines with event generation, tree
+traversal and MSA building, and its event streams follow the rates of the run.
+Here every engine of ``ENGINES`` is fed the same pre-generated stream of
+``IndelEvent``s for a single sequence, so only ``calculate_event`` is timed.
+Streams are described by an ``EventStreamSpec``: root length, number of events,
+share of insertions, indel length distribution and a placement pattern, which
+can be adversarial for one engine or another:
+
+- ``uniform``: events anywhere in the current sequence, as in a simulation
+- ``at_end`` / ``at_start``: every event at the end / the start of the sequence
+- ``tiny_blocks``: indels of length 1 spread evenly over the sequence, so that
+  almost every event splits a block
+
+Every engine/stream pair reports the time per event (best of the repetitions,
+with the garbage collector off) and the tracemalloc peak reached while applying
+the events, above the memory of the freshly created engine. Results can be
+stored as a baseline and later runs fail when they regress beyond a tolerance:
+
+    indel-bench-engines --save_baseline engines.json
+    indel-bench-engines --baseline engines.json
+
+Baselines are only comparable on the machine that recorded them.
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from indelsim.classes.indel_event import IndelEvent
+from indelsim.classes.seq_node_as_list import SequenceNodeAsList
+from indelsim.classes.seq_node_as_tree import SequenceNodeAsTree
+from indelsim.classes.seq_node_naive import SequenceNodeNaive
+
+__all__ = ["ENGINES", "PATTERNS", "LENGTH_DISTRIBUTIONS", "DEFAULT_STREAMS", "EventStreamSpec", "EngineMeasurement",
+           "generate_events", "run_engine_benchmark", "run_engine_suite", "save_baseline", "load_baseline",
+           "compare_to_baseline"]
+
+
+def _naive_engine(sequence_length: int) -> SequenceNodeNaive:
+    return SequenceNodeNaive(0, list(range(sequence_length)))
+
+
+def _list_engine(sequence_length: int) -> SequenceNodeAsList:
+    return SequenceNodeAsList(0, sequence_length)
+
+
+def _tree_engine(sequence_length: int) -> SequenceNodeAsTree:
+    return SequenceNodeAsTree(0, sequence_length)
+
+
+# Engine factories by name: each builds the sequence of a node from its root length.
+# An engine needs `calculate_event(IndelEvent)` and `get_length()`, block engines also `blocks_iterator()`.
+ENGINES: Dict[str, Callable[[int], Any]] = {
+    "naive": _naive_engine,
+    "list": _list_engine,
+    "tree": _tree_engine,
+}
+
+PATTERNS = ("uniform", "at_end", "at_start", "tiny_blocks")
+LENGTH_DISTRIBUTIONS = ("zipf", "uniform", "fixed")
+
+# Fractional part of multiples of the golden ratio, the most evenly spread sequence of positions
+_GOLDEN_RATIO_FRACTION = 0.6180339887498949
+
+
+@dataclass(frozen=True)
+class EventStreamSpec:
+    """
+    A synthetic stream of indel events on one sequence.
+
+    Args:
+        name: Name of the stream in reports and baselines
+        sequence_length: Length of the sequence before the first event
+        events: Number of events
+        insertion_fraction: Probability of an event being an insertion
+        length_distribution: "zipf" (truncated at max_indel_length, like the simulators),
+            "uniform" (1 to max_indel_length) or "fixed" (always max_indel_length)
+        indel_length_alpha: Parameter of the zipf length distribution
+        max_indel_length: Maximum indel length
+        pattern: Placement of the events, one of PATTERNS
+        seed: Seed of the stream
+    """
+    name: str
+    sequence_length: int = 10_000
+    events: int = 2_000
+    insertion_fraction: float = 0.5
+    length_distribution: str = "zipf"
+    indel_length_alpha: float = 2.0
+    max_indel_length: int = 50
+    pattern: str = "uniform"
+    seed: int = 42
+
+    def __post_init__(self):
+        if self.sequence_length < 1 or self.events < 1:
+            raise ValueError(f"Stream '{self.name}' needs a positive sequence length and number of events")
+        if not 0.0 <= self.insertion_fraction <= 1.0:
+            raise ValueError(f"Stream '{self.name}': insertion_fraction must be between 0 and 1")
+        if self.length_distribution not in LENGTH_DISTRIBUTIONS:
+            raise ValueError(f"Unknown length distribution '{self.length_distribution}', "
+                             f"expected one of {LENGTH_DISTRIBUTIONS}")
+        if self.length_distribution == "zipf" and self.indel_length_alpha <= 1.0:
+            raise ValueError(f"Stream '{self.name}': the zipf parameter must be greater than 1")
+        if self.max_indel_length < 1:
+            raise ValueError(f"Stream '{self.name}': max_indel_length must be positive")
+        if self.pattern not in PATTERNS:
+            raise ValueError(f"Unknown pattern '{self.pattern}', expected one of {PATTERNS}")
+
+    def scaled(self, factor: float) -> "EventStreamSpec":
+        """The same stream with its sequence length and number of events multiplied by `factor`."""
+        return replace(self, sequence_length=max(1, round(self.sequence_length * factor)),
+                       events=max(1, round(self.events * factor)))
+
+
+DEFAULT_STREAMS: List[EventStreamSpec] = [
+    EventStreamSpec("uniform"),
+    EventStreamSpec("insertion_heavy", insertion_fraction=0.9),
+    EventStreamSpec("deletion_heavy", insertion_fraction=0.1),
+    EventStreamSpec("long_indels", length_distribution="fixed"),
+    EventStreamSpec("at_end", pattern="at_end"),
+    EventStreamSpec("at_start", pattern="at_start"),
+    EventStreamSpec("tiny_blocks", pattern="tiny_blocks"),
+]
+
+
+def _indel_lengths(spec: EventStreamSpec, rng: np.random.Generator) -> np.ndarray:
+    if spec.pattern == "tiny_blocks":
+        return np.ones(spec.events, dtype=np.int64)
+    if spec.length_distribution == "fixed":
+        return np.full(spec.events, spec.max_indel_length, dtype=np.int64)
+    if spec.length_distribution == "uniform":
+        return rng.integers(1, spec.max_indel_length + 1, size=spec.events)
+    # Truncated zipf as in `calc_trunc_zipf`, rejecting in batches
+    lengths = np.empty(0, dtype=np.int64)
+    while len(lengths) < spec.events:
+        draws = rng.zipf(spec.indel_length_alpha, size=spec.events)
+        lengths = np.concatenate([lengths, draws[draws <= spec.max_indel_length]])
+    return lengths[:spec.events]
+
+
+def generate_events(spec: EventStreamSpec) -> List[IndelEvent]:
+    """
+    Draw the events of a stream. Every event lies inside the sequence as it is when the event
+    happens (deletions are shortened to its end), and deletions of an empty sequence become insertions.
+    """
+    rng = np.random.default_rng(spec.seed)
+    is_insertion = rng.random(spec.events) < spec.insertion_fraction
+    lengths = _indel_lengths(spec, rng)
+    fractions = rng.random(spec.events)
+
+    events: List[IndelEvent] = []
+    sequence_length = spec.sequence_length
+    for i in range(spec.events):
+        size = int(lengths[i])
+        if spec.pattern == "tiny_blocks":
+            fraction = (i * _GOLDEN_RATIO_FRACTION) % 1.0
+        elif spec.pattern == "at_start":
+            fraction = 0.0
+        elif spec.pattern == "at_end":
+            fraction = 1.0
+        else:
+            fraction = fractions[i]
+
+        if is_insertion[i] or sequence_length == 0:
+            place = min(int(fraction * (sequence_length + 1)), sequence_length)
+            events.append(IndelEvent(True, place, size))
+            sequence_length += size
+        else:
+            if spec.pattern == "at_end":
+                place = max(0, sequence_length - size)
+            else:
+                place = min(int(fraction * sequence_length), sequence_length - 1)
+            size = min(size, sequence_length - place)
+            events.append(IndelEvent(False, place, size))
+            sequence_length -= size
+    return events
+
+
+@dataclass
+class EngineMeasurement:
+    """Cost of one engine on one stream."""
+    engine: str
+    stream: str
+    events: int
+    ns_per_event: float
+    peak_bytes: int
+    final_length: int
+    blocks: Optional[int] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.engine}/{self.stream}"
+
+
+def _peak_bytes(factory: Callable[[int], Any], sequence_length: int, events: Sequence[IndelEvent]) -> int:
+    started_tracemalloc = not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start()
+    try:
+        node = factory(sequence_length)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for event in events:
+            node.calculate_event(event)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if started_tracemalloc:
+            tracemalloc.stop()
+    return max(0, peak - current)
+
+
+def run_engine_benchmark(engine: str, spec: EventStreamSpec, events: Optional[List[IndelEvent]] = None,
+                         repeats: int = 5) -> EngineMeasurement:
+    """
+    Measure one engine on one stream.
+
+    Args:
+        engine: Name of the engine in ENGINES
+        spec: Stream to apply
+        events: Events of the stream, when they are already generated
+        repeats: Number of timed runs, the fastest one is reported
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {sorted(ENGINES)}")
+    if repeats < 1:
+        raise ValueError("Number of repeats must be positive")
+    factory = ENGINES[engine]
+    if events is None:
+        events = generate_events(spec)
+
+    best_ns = None
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            node = factory(spec.sequence_length)
+            calculate_event = node.calculate_event
+            start_ns = time.perf_counter_ns()
+            for event in events:
+                calculate_event(event)
+            elapsed_ns = time.perf_counter_ns() - start_ns
+            best_ns = elapsed_ns if best_ns is None else min(best_ns, elapsed_ns)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    blocks = len(node.blocks_iterator()) if hasattr(node, "blocks_iterator") else None
+    return EngineMeasurement(engine=engine, stream=spec.name, events=len(events),
+                             ns_per_event=best_ns / len(events),
+                             peak_bytes=_peak_bytes(factory, spec.sequence_length, events),
+                             final_length=node.get_length(), blocks=blocks)
+
+
+def run_engine_suite(engines: Optional[Sequence[str]] = None, streams: Optional[Sequence[EventStreamSpec]] = None,
+                     repeats: int = 5, scale: float = 1.0) -> List[EngineMeasurement]:
+    """Measure every engine on every stream (default: all of ENGINES on DEFAULT_STREAMS)."""
+    engines = list(ENGINES) if engines is None else list(engines)
+    streams = DEFAULT_STREAMS if streams is None else streams
+    measurements = []
+    for spec in streams:
+        if scale != 1.0:
+            spec = spec.scaled(scale)
+        events = generate_events(spec)
+        for engine in engines:
+            measurements.append(run_engine_benchmark(engine, spec, events, repeats))
+    return measurements
+
+
+def save_baseline(measurements: List[EngineMeasurement], path: Path | str) -> Path:
+    """Store measurements as a baseline, together with the host that produced them."""
+    from indelsim.benchmark_report import host_info
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({"host": host_info(), "measurements": [asdict(m) for m in measurements]}, f, indent=2)
+    return path
+
+
+def load_baseline(path: Path | str) -> Dict[str, Dict[str, Any]]:
+    """Read a baseline written by `save_baseline`, keyed by "engine/stream"."""
+    with open(path) as f:
+        data = json.load(f)
+    return {f"{m['engine']}/{m['stream']}": m for m in data["measurements"]}
+
+
+def compare_to_baseline(measurements: List[EngineMeasurement], baseline: Dict[str, Dict[str, Any]],
+                        time_tolerance: float = 0.25, memory_tolerance: float = 0.10) -> List[str]:
+    """
+    Return a description of every regression: a time per event or peak memory more than the
+    tolerance (a fraction) above the baseline. Pairs missing from the baseline are not compared.
+    """
+    regressions = []
+    for measurement in measurements:
+        reference = baseline.get(measurement.key)
+        if reference is None:
+            continue
+        if reference["events"] != measurement.events:
+            raise ValueError(f"{measurement.key}: the baseline has {reference['events']} events, "
+                             f"this run {measurement.events}; use the same stream scale")
+        if measurement.ns_per_event > reference["ns_per_event"] * (1 + time_tolerance):
+            regressions.append(f"{measurement.key}: {measurement.ns_per_event:.0f} ns/event, "
+                               f"baseline {reference['ns_per_event']:.0f} ns/event")
+        if measurement.peak_bytes > reference["peak_bytes"] * (1 + memory_tolerance):
+            regressions.append(f"{measurement.key}: peak {measurement.peak_bytes} bytes, "
+                               f"baseline {reference['peak_bytes']} bytes")
+    return regressions
+
+
+def print_measurements(measurements: List[EngineMeasurement]) -> None:
+    print(f"{'engine':<8} {'stream':<16} {'events':>8} {'ns/event':>12} {'peak KiB':>10} {'length':>8} {'blocks':>8}")
+    for m in measurements:
+        blocks = "-" if m.blocks is None else str(m.blocks)
+        print(f"{m.engine:<8} {m.stream:<16} {m.events:>8} {m.ns_per_event:>12.0f} {m.peak_bytes / 1024:>10.1f} "
+              f"{m.final_length:>8} {blocks:>8}")
+
+
+def _create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Microbenchmark the indel engines on synthetic event streams",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Record a baseline, then check a later revision against it
+  indel-bench-engines --save_baseline engines.json
+  indel-bench-engines --baseline engines.json
+
+  # Block engines only, on streams ten times as long
+  indel-bench-engines --engines list tree --scale 10
+        """
+    )
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=list(ENGINES),
+                        help="Engines to measure (default: all)")
+    parser.add_argument("--streams", nargs="+", choices=[spec.name for spec in DEFAULT_STREAMS],
+                        default=[spec.name for spec in DEFAULT_STREAMS], help="Event streams to apply (default: all)")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Factor multiplying the sequence length and number of events of every stream (default: 1)")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per engine and stream (default: 5)")
+    parser.add_argument("--baseline", type=str, default=None,
+                        help="Baseline to compare against; exits with status 1 on regressions")
+    parser.add_argument("--save_baseline", type=str, default=None, help="Store the measurements as a baseline")
+    parser.add_argument("--time_tolerance", type=float, default=0.25,
+                        help="Allowed slowdown per event relative to the baseline (default: 0.25)")
+    parser.add_argument("--memory_tolerance", type=float, default=0.10,
+                        help="Allowed growth of the peak memory relative to the baseline (default: 0.10)")
+    return parser
+
+
+def main():
+    args = _create_parser().parse_args()
+    streams = [spec for spec in DEFAULT_STREAMS if spec.name in args.streams]
+    try:
+        baseline = load_baseline(args.baseline) if args.baseline else None
+        measurements = run_engine_suite(args.engines, streams, repeats=args.repeats, scale=args.scale)
+        print_measurements(measurements)
+        if args.save_baseline:
+            print(f"Baseline written to {save_baseline(measurements, args.save_baseline)}")
+        regressions = [] if baseline is None else compare_to_baseline(
+            measurements, baseline, args.time_tolerance, args.memory_tolerance)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if regressions:
+        print(f"{len(regressions)} regressions against {args.baseline}:", file=sys.stderr)
+        for regression in regressions:
+            print(f"  {regression}", file=sys.stderr)
+        sys.exit(1)
+    if baseline is not None:
+        print(f"No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,609 @@
+#!/usr/bin/env python3
+"""
+Differential fuzzing of the indel engines and MSA builders against the naive oracle.
+
+``SequenceNodeNaive`` keeps the sequence as an explicit list of sites and is the
+reference every faster engine has to agree with. The fuzzer draws random cases
+and compares them on two levels:
+
+- event streams: a root length and a list of ``IndelEvent``s applied to every
+  engine of ``ENGINES`` (engines.py). The block list of an engine is expanded to
+  the site map it describes, the parent index of every site or None for inserted
+  sites, which must equal the naive sequence. Block lists themselves are not
+  unique (an insertion at the start may hang off index 0 or -1), site maps are.
+- small trees: a random synthetic tree with the events of a simulation on its
+  branches, aligned by every builder of ``MSA_BUILDERS``. Two alignments agree
+  when they have the same homology columns: the sets of (leaf, k-th residue of
+  the leaf) aligned together. The order of columns and all-gap columns (sites
+  that only lived in internal nodes) are not compared, builders differ in both.
+
+A failing case is shrunk to a minimal reproducer: events, branches and leaves
+are dropped and the remaining lengths and places reduced for as long as the case
+keeps failing. A tree case whose discrepancy comes from an engine is reduced to
+the event stream of the offending branch. The reproducer is printed as Python:
+
+    indel-bench-fuzz --iterations 2000 --seed 1
+    indel-bench-fuzz --time_budget 600 --engines tree
+
+A new engine is validated by adding its factory to ``ENGINES`` (and, to check its
+alignments, a builder to ``MSA_BUILDERS``) before running ``run_fuzz``.
+"""
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from ete3 import Tree
+
+from indelsim.bench.engines import ENGINES
+from indelsim.bench.trees import TREE_SHAPES, generate_tree
+from indelsim.classes.indel_event import IndelEvent
+from indelsim.classes.sim_config import SimConfiguration
+from indelsim.classes.simulation import Simulation
+
+__all__ = ["ORACLE", "MSA_BUILDERS", "EventCase", "TreeCase", "Discrepancy", "FuzzResult", "site_map",
+           "homology_columns", "random_event_case", "random_tree_case", "check_event_case", "check_tree_case",
+           "shrink_event_case", "shrink_tree_case", "run_fuzz"]
+
+# Engine and MSA builder every other one is compared against
+ORACLE = "naive"
+
+
+@dataclass
+class EventCase:
+    """Events applied, in order, to a sequence of `sequence_length` sites."""
+    sequence_length: int
+    events: List[IndelEvent]
+
+    @property
+    def size(self) -> Tuple[int, ...]:
+        return (len(self.events), self.sequence_length, sum(e.length for e in self.events),
+                sum(e.place for e in self.events))
+
+    def reproducer(self, engine: str) -> str:
+        events = ",\n".join(f"    {event!r}" for event in self.events)
+        return (f"from indelsim.bench.engines import ENGINES\n"
+                f"from indelsim.classes.indel_event import IndelEvent\n\n"
+                f"node = ENGINES[{engine!r}]({self.sequence_length})\n"
+                f"for event in [\n{events}\n]:\n"
+                f"    node.calculate_event(event)\n")
+
+
+@dataclass
+class TreeCase:
+    """
+    A tree with the events of every branch.
+
+    Args:
+        newick: Tree with every node named (leaves and internal nodes), in ete3 format 1
+        root_length: Length of the root sequence
+        events: Events of the branch above each node, by node name
+    """
+    newick: str
+    root_length: int
+    events: Dict[str, List[IndelEvent]] = field(default_factory=dict)
+
+    @property
+    def size(self) -> Tuple[int, ...]:
+        events = [event for branch in self.events.values() for event in branch]
+        return (len(Tree(self.newick, format=1)), len(events), self.root_length, sum(e.length for e in events),
+                sum(e.place for e in events))
+
+    def reproducer(self, builder: str) -> str:
+        branches = "".join(f"    {name!r}: {events!r},\n" for name, events in self.events.items() if events)
+        return (f"from indelsim.bench.fuzz import TreeCase, check_tree_case\n"
+                f"from indelsim.classes.indel_event import IndelEvent\n\n"
+                f"case = TreeCase({self.newick!r}, {self.root_length}, {{\n{branches}}})\n"
+                f"print(check_tree_case(case, [{builder!r}]))\n")
+
+
+@dataclass
+class Discrepancy:
+    """An engine or MSA builder disagreeing with the oracle on a (shrunk) case."""
+    kind: str  # "engine" or "msa"
+    name: str
+    message: str
+    case: Any
+
+    def reproducer(self) -> str:
+        return self.case.reproducer(self.name)
+
+
+@dataclass
+class FuzzResult:
+    iterations: int
+    event_cases: int
+    tree_cases: int
+    seconds: float
+    failure: Optional[Discrepancy] = None
+
+
+# --- Event streams ---
+
+def _normalize_events(sequence_length: int, events: Sequence[IndelEvent]) -> List[IndelEvent]:
+    """
+    Clip events to the sequence as it is when they happen, as the simulator draws them:
+    insertions at most at its end, deletions inside it. Deletions of nothing are dropped.
+    """
+    normalized = []
+    for event in events:
+        length = max(1, event.length)
+        if event.is_insertion:
+            place = min(event.place, sequence_length)
+            sequence_length += length
+        else:
+            place = min(event.place, sequence_length - 1)
+            length = min(length, sequence_length - place)
+            if place < 0 or length < 1:
+                continue
+            sequence_length -= length
+        normalized.append(IndelEvent(event.is_insertion, place, length))
+    return normalized
+
+
+def _sequence_length_after(sequence_length: int, events: Sequence[IndelEvent]) -> int:
+    return sequence_length + sum(e.length if e.is_insertion else -e.length for e in events)
+
+
+def random_event_case(rng: np.random.Generator, max_sequence_length: int = 60,
+                      max_events: int = 40) -> EventCase:
+    """
+    Draw a small event stream. Lengths are zipf or uniform, places uniform or piled up at the
+    ends of the sequence, where the block engines have their edge cases.
+    """
+    sequence_length = int(rng.integers(1, max_sequence_length + 1))
+    insertion_fraction = rng.random()
+    max_indel_length = int(rng.integers(1, 16))
+    zipf_lengths = rng.random() < 0.5
+    edge_bias = rng.choice([0.0, 0.3, 0.9])
+
+    events = []
+    current_length = sequence_length
+    for _ in range(int(rng.integers(0, max_events + 1))):
+        if zipf_lengths:
+            length = int(min(rng.zipf(1.5), max_indel_length))
+        else:
+            length = int(rng.integers(1, max_indel_length + 1))
+        is_insertion = current_length == 0 or rng.random() < insertion_fraction
+        last_place = current_length if is_insertion else current_length - 1
+        if rng.random() < edge_bias:
+            place = 0 if rng.random() < 0.5 else last_place
+        else:
+            place = int(rng.integers(0, last_place + 1))
+        events.append(IndelEvent(is_insertion, place, length))
+        current_length = _sequence_length_after(current_length, _normalize_events(current_length, events[-1:]))
+    return EventCase(sequence_length, _normalize_events(sequence_length, events))
+
+
+def site_map(node: Any, sequence_length: int) -> List[Optional[int]]:
+    """
+    Sites of an engine's sequence: the index of each site in the original sequence of
+    `sequence_length` sites, or None for inserted sites. Block engines are read through
+    `blocks_iterator()`, the naive engine through its `seq`.
+    """
+    if hasattr(node, "blocks_iterator"):
+        sites: List[Optional[int]] = []
+        for block in node.blocks_iterator():
+            sites.extend(range(block.index_in_predecessor, block.index_in_predecessor + block.copy_sites_count))
+            sites.extend([None] * block.inserted_seq_count)
+        return sites
+    return [site if site < sequence_length else None for site in node.seq]
+
+
+def _first_difference(expected: List[Optional[int]], found: List[Optional[int]]) -> str:
+    for position, (expected_site, found_site) in enumerate(zip(expected, found)):
+        if expected_site != found_site:
+            return f"site {position} is {found_site}, expected {expected_site}"
+    return f"{len(found)} sites, expected {len(expected)}"
+
+
+def _run_engine(engine: str, case: EventCase) -> Tuple[List[Optional[int]], int]:
+    node = ENGINES[engine](case.sequence_length)
+    for event in case.events:
+        # Engines may keep the events, give each one its own copy
+        node.calculate_event(IndelEvent(event.is_insertion, event.place, event.length))
+    return site_map(node, case.sequence_length), node.get_length()
+
+
+def check_event_case(case: EventCase, engines: Optional[Sequence[str]] = None) -> List[Discrepancy]:
+    """Apply the case to every engine (default: all of ENGINES) and return their disagreements with the oracle."""
+    engines = [engine for engine in (ENGINES if engines is None else engines) if engine != ORACLE]
+    expected, _ = _run_engine(ORACLE, case)
+    discrepancies = []
+    for engine in engines:
+        try:
+            sites, length = _run_engine(engine, case)
+        except Exception as e:
+            discrepancies.append(Discrepancy("engine", engine, f"raised {e!r}", case))
+            continue
+        if sites != expected:
+            discrepancies.append(Discrepancy("engine", engine, _first_difference(expected, sites), case))
+        elif length != len(expected):
+            discrepancies.append(Discrepancy("engine", engine, f"get_length() is {length}, expected {len(expected)}",
+                                             case))
+    return discrepancies
+
+
+def _smaller_numbers(value: int, smallest: int = 0) -> List[int]:
+    return [candidate for candidate in dict.fromkeys((smallest, value // 2, value - 1)) if smallest <= candidate < value]
+
+
+def _event_list_candidates(events: List[IndelEvent]) -> Iterator[List[IndelEvent]]:
+    """Smaller variants of an event list: chunks removed (largest first), then single events reduced."""
+    chunk = len(events)
+    while chunk >= 1:
+        for start in range(0, len(events), chunk):
+            yield events[:start] + events[start + chunk:]
+        chunk //= 2
+    for idx, event in enumerate(events):
+        for length in _smaller_numbers(event.length, 1):
+            yield events[:idx] + [IndelEvent(event.is_insertion, event.place, length)] + events[idx + 1:]
+        for place in _smaller_numbers(event.place):
+            yield events[:idx] + [IndelEvent(event.is_insertion, place, event.length)] + events[idx + 1:]
+
+
+def _shrink(case: Any, candidates: Callable[[Any], Iterator[Any]], fails: Callable[[Any], bool],
+            max_checks: int) -> Any:
+    """Greedily move to the first smaller candidate that still fails, until none does."""
+    checks = 0
+    shrunk = True
+    while shrunk and checks < max_checks:
+        shrunk = False
+        for candidate in candidates(case):
+            if candidate.size >= case.size:
+                continue
+            checks += 1
+            if fails(candidate):
+                case = candidate
+                shrunk = True
+                break
+            if checks >= max_checks:
+                break
+    return case
+
+
+def shrink_event_case(discrepancy: Discrepancy, max_checks: int = 10_000) -> Discrepancy:
+    """Reduce the case of an engine discrepancy to a minimal one on which the engine still disagrees."""
+    engine = discrepancy.name
+
+    def candidates(case: EventCase) -> Iterator[EventCase]:
+        for sequence_length in _smaller_numbers(case.sequence_length, 1):
+            yield EventCase(sequence_length, _normalize_events(sequence_length, case.events))
+        for events in _event_list_candidates(case.events):
+            yield EventCase(case.sequence_length, _normalize_events(case.sequence_length, events))
+
+    def fails(case: EventCase) -> bool:
+        return bool(check_event_case(case, [engine]))
+
+    case = _shrink(discrepancy.case, candidates, fails, max_checks)
+    return check_event_case(case, [engine])[0]
+
+
+# --- Trees ---
+
+def _named_tree(newick: str) -> Tree:
+    tree = Tree(newick, format=1)
+    for idx, node in enumerate(tree.traverse("preorder")):
+        if not node.is_leaf():
+            node.name = f"n{idx}"
+    return tree
+
+
+def _normalize_tree_case(tree: Tree, root_length: int, events: Dict[str, List[IndelEvent]]) -> TreeCase:
+    """Clip the events of every branch to its parent's sequence, top down."""
+    lengths = {tree.name: root_length}
+    normalized = {}
+    for node in tree.traverse("preorder"):
+        if node.is_root():
+            continue
+        branch_events = _normalize_events(lengths[node.up.name], events.get(node.name, []))
+        lengths[node.name] = _sequence_length_after(lengths[node.up.name], branch_events)
+        normalized[node.name] = branch_events
+    return TreeCase(tree.write(format=1), root_length, normalized)
+
+
+def random_tree_case(rng: np.random.Generator, max_leaves: int = 6, max_root_length: int = 40) -> TreeCase:
+    """Draw a small tree of a random shape and the events a simulation with random parameters puts on it."""
+    shape = sorted(TREE_SHAPES)[int(rng.integers(len(TREE_SHAPES)))]
+    n_leaves = int(rng.integers(2, max_leaves + 1))
+    synthetic = generate_tree(shape, n_leaves, total_length=float(rng.uniform(0.1, 3.0)),
+                              seed=int(rng.integers(2 ** 31)))
+    config = SimConfiguration(original_sequence_length=int(rng.integers(1, max_root_length + 1)),
+                              indel_length_alpha=float(rng.uniform(1.1, 3.0)),
+                              indel_truncated_length=int(rng.integers(1, 20)),
+                              rate_ins=float(rng.uniform(0.0, 0.3)), rate_del=float(rng.uniform(0.01, 0.3)),
+                              deletion_extra_edge_length=int(rng.integers(0, 10)), seed=int(rng.integers(2 ** 31)))
+
+    tree = _named_tree(synthetic.to_newick())
+    simulation = Simulation(tree, config)
+    events = {simulation.id_to_name[node.id]: node.list_of_events for node in simulation.sim_nodes[1:]}
+    return _normalize_tree_case(tree, config.original_sequence_length, events)
+
+
+def _replay(case: TreeCase) -> Simulation:
+    """A simulation of the case's tree whose branches carry the case's events instead of sampled ones."""
+    config = SimConfiguration(original_sequence_length=case.root_length, indel_length_alpha=2.0,
+                              indel_truncated_length=1, rate_ins=1e-3, rate_del=1e-3, deletion_extra_edge_length=0,
+                              seed=0)
+    simulation = Simulation(Tree(case.newick, format=1), config)
+    lengths = {0: case.root_length}
+    for node in simulation.sim_nodes[1:]:
+        node.list_of_events = [IndelEvent(e.is_insertion, e.place, e.length)
+                               for e in case.events.get(simulation.id_to_name[node.id], [])]
+        node.length_of_sequence_before = lengths[node.parent_id]
+        node.length_of_sequence_after_events = _sequence_length_after(node.length_of_sequence_before,
+                                                                      node.list_of_events)
+        lengths[node.id] = node.length_of_sequence_after_events
+    return simulation
+
+
+def _computed_rows(simulation: Simulation) -> Dict[str, str]:
+    simulation.msa.compute_msa()
+    return {simulation.id_to_name[node_id]: row for node_id, row in simulation.msa._aligned_sequences.items()}
+
+
+def _streamed_rows(simulation: Simulation) -> Dict[str, str]:
+    simulation.msa.index_rows()
+    return {simulation.id_to_name[node_id]: simulation.msa.pop_row(node_id)
+            for node_id in sorted(simulation.nodes_to_align - {0})}
+
+
+def _naive_msa(case: TreeCase) -> Dict[str, str]:
+    simulation = _replay(case)
+    simulation.msa_from_naive()
+    return _computed_rows(simulation)
+
+
+def _list_msa(case: TreeCase) -> Dict[str, str]:
+    simulation = _replay(case)
+    simulation.msa_from_blocklist()
+    return _computed_rows(simulation)
+
+
+def _tree_msa(case: TreeCase) -> Dict[str, str]:
+    simulation = _replay(case)
+    simulation.msa_from_blocktree()
+    return _computed_rows(simulation)
+
+
+def _tree_streamed_msa(case: TreeCase) -> Dict[str, str]:
+    simulation = _replay(case)
+    simulation.msa_from_blocktree()
+    return _streamed_rows(simulation)
+
+
+# MSA builders by name: each aligns the leaves of a case, rows keyed by leaf name
+MSA_BUILDERS: Dict[str, Callable[[TreeCase], Dict[str, str]]] = {
+    "naive": _naive_msa,
+    "list": _list_msa,
+    "tree": _tree_msa,
+    "tree_streamed": _tree_streamed_msa,
+}
+
+
+def homology_columns(rows: Dict[str, str]) -> List[Tuple[Tuple[str, int], ...]]:
+    """
+    The columns of an alignment as tuples of (leaf, index of the residue in the leaf),
+    sorted and without all-gap columns.
+
+    Raises:
+        ValueError: if the rows are not all of the same length
+    """
+    names = sorted(rows)
+    lengths = {len(rows[name]) for name in names}
+    if len(lengths) > 1:
+        raise ValueError(f"rows of different lengths {sorted(lengths)}")
+    residues = dict.fromkeys(names, 0)
+    columns = []
+    for column in zip(*(rows[name] for name in names)):
+        sites = []
+        for name, character in zip(names, column):
+            if character != "-":
+                sites.append((name, residues[name]))
+                residues[name] += 1
+        if sites:
+            columns.append(tuple(sites))
+    return sorted(columns)
+
+
+def _compare_alignments(expected: Dict[str, str], found: Dict[str, str]) -> Optional[str]:
+    if sorted(found) != sorted(expected):
+        return f"rows {sorted(found)}, expected {sorted(expected)}"
+    for name in sorted(expected):
+        residues = len(found[name]) - found[name].count("-")
+        expected_residues = len(expected[name]) - expected[name].count("-")
+        if residues != expected_residues:
+            return f"leaf {name} has {residues} residues, expected {expected_residues}"
+    try:
+        columns = homology_columns(found)
+    except ValueError as e:
+        return str(e)
+    expected_columns = homology_columns(expected)
+    if columns != expected_columns:
+        missing = sorted(set(expected_columns) - set(columns))
+        return f"{len(missing)} homology columns differ, e.g. {missing[:1] or sorted(set(columns))[:1]}"
+    return None
+
+
+def check_tree_case(case: TreeCase, builders: Optional[Sequence[str]] = None) -> List[Discrepancy]:
+    """Align the case with every builder (default: all of MSA_BUILDERS) and return their disagreements with the oracle."""
+    builders = [builder for builder in (MSA_BUILDERS if builders is None else builders) if builder != ORACLE]
+    expected = MSA_BUILDERS[ORACLE](case)
+    discrepancies = []
+    for builder in builders:
+        try:
+            message = _compare_alignments(expected, MSA_BUILDERS[builder](case))
+        except Exception as e:
+            message = f"raised {e!r}"
+        if message is not None:
+            discrepancies.append(Discrepancy("msa", builder, message, case))
+    return discrepancies
+
+
+def _branch_event_cases(case: TreeCase) -> Iterator[EventCase]:
+    tree = Tree(case.newick, format=1)
+    lengths = {tree.name: case.root_length}
+    for node in tree.traverse("preorder"):
+        if node.is_root():
+            continue
+        events = case.events.get(node.name, [])
+        lengths[node.name] = _sequence_length_after(lengths[node.up.name], events)
+        if events and lengths[node.up.name] > 0:
+            yield EventCase(lengths[node.up.name], events)
+
+
+def _pruned(case: TreeCase, leaf_name: str) -> Optional[TreeCase]:
+    """The case without a leaf; its sibling takes the place of their parent, after the parent's events."""
+    tree = Tree(case.newick, format=1)
+    leaf = tree & leaf_name
+    parent = leaf.up
+    events = {name: list(branch) for name, branch in case.events.items()}
+    leaf.detach()
+    sibling = parent.children[0]
+    if parent.is_root():
+        if sibling.is_leaf():
+            return None
+        # The sibling becomes the root, its events would change the root sequence
+        sibling.detach()
+        sibling.dist = 0.0
+        events.pop(sibling.name, None)
+        tree = sibling
+    else:
+        events[sibling.name] = events.get(parent.name, []) + events.get(sibling.name, [])
+        sibling.dist += parent.dist
+        parent.delete()
+    events.pop(leaf_name, None)
+    events.pop(parent.name, None)
+    return _normalize_tree_case(tree, case.root_length, events)
+
+
+def shrink_tree_case(discrepancy: Discrepancy, max_checks: int = 2_000) -> Discrepancy:
+    """
+    Reduce the case of an MSA discrepancy. When an engine disagrees with the oracle on one of
+    the branches, the event stream of that branch is shrunk instead, as the smaller reproducer.
+    """
+    for event_case in _branch_event_cases(discrepancy.case):
+        engine_discrepancies = check_event_case(event_case)
+        if engine_discrepancies:
+            return shrink_event_case(engine_discrepancies[0])
+
+    builder = discrepancy.name
+
+    def candidates(case: TreeCase) -> Iterator[TreeCase]:
+        tree = Tree(case.newick, format=1)
+        for leaf in tree.get_leaf_names():
+            pruned = _pruned(case, leaf)
+            if pruned is not None:
+                yield pruned
+        for root_length in _smaller_numbers(case.root_length, 1):
+            yield _normalize_tree_case(tree, root_length, case.events)
+        for name, branch_events in case.events.items():
+            for events in _event_list_candidates(branch_events):
+                yield _normalize_tree_case(tree, case.root_length, {**case.events, name: events})
+
+    def fails(case: TreeCase) -> bool:
+        return bool(check_tree_case(case, [builder]))
+
+    case = _shrink(discrepancy.case, candidates, fails, max_checks)
+    return check_tree_case(case, [builder])[0]
+
+
+def run_fuzz(iterations: int = 1000, seed: int = 0, engines: Optional[Sequence[str]] = None,
+             builders: Optional[Sequence[str]] = None, time_budget: Optional[float] = None,
+             max_leaves: int = 6, shrink: bool = True) -> FuzzResult:
+    """
+    Fuzz the engines and MSA builders against the naive oracle, stopping at the first discrepancy.
+
+    Args:
+        iterations: Number of iterations; each checks one event stream and one tree
+        seed: Seed of the cases, the same seed draws the same cases
+        engines: Engines of ENGINES to check (default: all)
+        builders: Builders of MSA_BUILDERS to check (default: all), an empty list checks engines only
+        time_budget: Stop after this many seconds, even before `iterations`
+        max_leaves: Maximum number of leaves of the trees
+        shrink: Shrink a failing case to a minimal reproducer
+    """
+    for engine in engines or []:
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {sorted(ENGINES)}")
+    for builder in builders or []:
+        if builder not in MSA_BUILDERS:
+            raise ValueError(f"Unknown MSA builder '{builder}', expected one of {sorted(MSA_BUILDERS)}")
+    check_trees = builders is None or len(builders) > 0
+
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    result = FuzzResult(iterations=0, event_cases=0, tree_cases=0, seconds=0.0)
+    for _ in range(iterations):
+        if time_budget is not None and time.perf_counter() - start > time_budget:
+            break
+        result.iterations += 1
+
+        discrepancies = check_event_case(random_event_case(rng), engines)
+        result.event_cases += 1
+        if discrepancies:
+            result.failure = shrink_event_case(discrepancies[0]) if shrink else discrepancies[0]
+            break
+
+        if check_trees:
+            discrepancies = check_tree_case(random_tree_case(rng, max_leaves), builders)
+            result.tree_cases += 1
+            if discrepancies:
+                result.failure = shrink_tree_case(discrepancies[0]) if shrink else discrepancies[0]
+                break
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def _create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Fuzz the indel engines and MSA builders against the naive engine",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Check everything on 2000 event streams and trees
+  indel-bench-fuzz --iterations 2000 --seed 1
+
+  # Run a single engine for ten minutes, without trees
+  indel-bench-fuzz --iterations 100000000 --time_budget 600 --engines tree --builders
+        """
+    )
+    parser.add_argument("--iterations", type=int, default=1000,
+                        help="Number of event streams and trees to check (default: 1000)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random cases (default: 0)")
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=None,
+                        help="Engines to check against the naive engine (default: all)")
+    parser.add_argument("--builders", nargs="*", choices=sorted(MSA_BUILDERS), default=None,
+                        help="MSA builders to check against the naive alignment (default: all, none skips trees)")
+    parser.add_argument("--time_budget", type=float, default=None, help="Stop after this many seconds")
+    parser.add_argument("--max_leaves", type=int, default=6, help="Maximum number of leaves of the trees (default: 6)")
+    parser.add_argument("--no_shrink", action="store_true", help="Report failing cases as found, without shrinking")
+    return parser
+
+
+def main():
+    args = _create_parser().parse_args()
+    try:
+        result = run_fuzz(args.iterations, args.seed, args.engines, args.builders, args.time_budget,
+                          args.max_leaves, shrink=not args.no_shrink)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"{result.iterations} iterations ({result.event_cases} event streams, {result.tree_cases} trees) "
+          f"in {result.seconds:.1f}s")
+    if result.failure is not None:
+        failure = result.failure
+        print(f"The {failure.kind} '{failure.name}' disagrees with the naive oracle: {failure.message}",
+              file=sys.stderr)
+        print("Reproducer:\n", file=sys.stderr)
+        print(failure.reproducer(), file=sys.stderr)
+        sys.exit(1)
+    print("No discrepancies")
+
+
+if __name__ == "__main__":
+    main()
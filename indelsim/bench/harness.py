@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Named benchmark cases with warmup, repetitions and stored baselines.
+
+A ``BenchmarkCase`` separates an untimed ``setup`` from the timed ``run``, so
+that each case measures one thing: event generation, one indel engine, MSA
+rendering, one substitution algorithm, or one engine on a synthetic event
+stream (see ``indelsim.bench.engines``). Every repetition gets a fresh setup.
+The default cases (``CASES``) run on a 64-leaf Yule tree with a root of 1000
+sites; further cases can be added with ``register_case``.
+
+Every case runs its warmup repetitions, then its timed repetitions with the
+garbage collector off, and reports the median and interquartile range. A run
+is saved as a baseline tagged by the git revision of the tree it was measured
+on, and two baselines are compared case by case with a Mann-Whitney U test
+(Holm-adjusted over the cases), so that only significant changes are reported
+as regressions or speedups:
+
+    indel-bench run --output baselines/
+    indel-bench compare baselines/3f2c1d0.json baselines/9a7e5b2.json
+"""
+
+import argparse
+import fnmatch
+import gc
+import json
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from ete3 import Tree
+
+from indelsim.bench.engines import DEFAULT_STREAMS, ENGINES, generate_events
+from indelsim.bench.trees import generate_tree
+from indelsim.classes.models import get_model
+from indelsim.classes.sim_config import SimConfiguration
+from indelsim.classes.simulation import Simulation
+from indelsim.classes.substitution import SubstitutionEvolver, sample_root_sequence
+
+__all__ = ["BenchmarkCase", "CaseResult", "Comparison", "CASES", "register_case", "select_cases", "run_case",
+           "run_cases", "git_revision", "save_results", "load_results", "compare_results"]
+
+
+@dataclass
+class BenchmarkCase:
+    """
+    A named measurement.
+
+    Args:
+        name: Unique name, "/"-separated by group (e.g. "indels/tree")
+        run: Timed function, called with the result of `setup`
+        setup: Untimed preparation, called before every repetition
+        description: One line on what is measured
+    """
+    name: str
+    run: Callable[[Any], Any]
+    setup: Callable[[], Any] = lambda: None
+    description: str = ""
+
+
+@dataclass
+class CaseResult:
+    """Timed repetitions of one case, in seconds."""
+    name: str
+    samples: List[float] = field(default_factory=list)
+
+    @property
+    def median(self) -> float:
+        return float(np.median(self.samples))
+
+    @property
+    def q1(self) -> float:
+        return float(np.percentile(self.samples, 25))
+
+    @property
+    def q3(self) -> float:
+        return float(np.percentile(self.samples, 75))
+
+    @property
+    def iqr(self) -> float:
+        return self.q3 - self.q1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"median": self.median, "q1": self.q1, "q3": self.q3, "iqr": self.iqr, "samples": self.samples}
+
+
+CASES: Dict[str, BenchmarkCase] = {}
+
+
+def register_case(case: BenchmarkCase) -> BenchmarkCase:
+    """Add a case to CASES."""
+    if case.name in CASES:
+        raise ValueError(f"Benchmark case '{case.name}' is already registered")
+    CASES[case.name] = case
+    return case
+
+
+# Workload of the simulation cases
+_LEAVES = 64
+_ROOT_LENGTH = 1000
+_MEAN_BRANCH_LENGTH = 0.05
+_SEED = 42
+
+
+@lru_cache(maxsize=None)
+def _workload_newick() -> str:
+    return generate_tree("yule", _LEAVES, total_length=_MEAN_BRANCH_LENGTH * (2 * _LEAVES - 2),
+                         seed=_SEED).to_newick()
+
+
+def _workload_config() -> SimConfiguration:
+    return SimConfiguration(original_sequence_length=_ROOT_LENGTH, indel_length_alpha=2.0, indel_truncated_length=50,
+                            rate_ins=0.03, rate_del=0.09, deletion_extra_edge_length=49, seed=_SEED)
+
+
+def _workload_simulation() -> Simulation:
+    return Simulation(Tree(_workload_newick()), _workload_config())
+
+
+def _rendering_setup() -> Simulation:
+    simulation = _workload_simulation()
+    simulation.msa_from_blocktree()
+    return simulation
+
+
+# Parsed once, so that the substitution cases keep the transition matrices cached on the tree after the warmup
+@lru_cache(maxsize=None)
+def _substitution_tree() -> Tree:
+    return Tree(_workload_newick())
+
+
+def _substitution_case(algorithm: str) -> BenchmarkCase:
+    def setup():
+        model = get_model("jtt")
+        evolver = SubstitutionEvolver(substitution_rate=1.0, seed=_SEED, model=model)
+        return evolver, sample_root_sequence(_ROOT_LENGTH, _SEED, model)
+
+    def run(state):
+        evolver, root_sequence = state
+        for _ in evolver.evolve_tree(_substitution_tree(), root_sequence, algorithm, recycle_buffers=True):
+            pass
+
+    return BenchmarkCase(f"substitution/{algorithm}", run, setup,
+                         f"{algorithm} substitutions of {_ROOT_LENGTH} sites along the {_LEAVES}-leaf tree")
+
+
+def _engine_stream_case(engine: str, stream) -> BenchmarkCase:
+    events = []
+
+    def setup():
+        if not events:
+            events.extend(generate_events(stream))
+        return ENGINES[engine](stream.sequence_length)
+
+    def run(node):
+        calculate_event = node.calculate_event
+        for event in events:
+            calculate_event(event)
+
+    return BenchmarkCase(f"engine_stream/{engine}/{stream.name}", run, setup,
+                         f"{stream.events} synthetic '{stream.name}' events on one sequence")
+
+
+def _register_default_cases() -> None:
+    register_case(BenchmarkCase("events", lambda tree: Simulation(tree, _workload_config()),
+                                lambda: Tree(_workload_newick()),
+                                f"Indel events of all branches of a {_LEAVES}-leaf Yule tree"))
+    for engine, method in (("naive", "msa_from_naive"), ("list", "msa_from_blocklist"),
+                           ("tree", "msa_from_blocktree")):
+        register_case(BenchmarkCase(f"indels/{engine}", getattr(Simulation, method), _workload_simulation,
+                                    f"{engine} engine applying the events of the {_LEAVES}-leaf tree"))
+    register_case(BenchmarkCase("render/tree", lambda simulation: simulation.msa.compute_msa(), _rendering_setup,
+                                "Rendering the gap template MSA of the block tree engine"))
+    for algorithm in ("matrix", "gillespie"):
+        register_case(_substitution_case(algorithm))
+    for stream in DEFAULT_STREAMS:
+        for engine in ENGINES:
+            register_case(_engine_stream_case(engine, stream))
+
+
+_register_default_cases()
+
+
+def select_cases(patterns: Optional[Sequence[str]] = None) -> List[BenchmarkCase]:
+    """Cases whose name matches one of the glob `patterns` (all cases if None)."""
+    if not patterns:
+        return list(CASES.values())
+    selected = [case for name, case in CASES.items() if any(fnmatch.fnmatchcase(name, p) for p in patterns)]
+    if not selected:
+        raise ValueError(f"No benchmark case matches {list(patterns)}")
+    return selected
+
+
+def run_case(case: BenchmarkCase, warmup: int = 1, repetitions: int = 10) -> CaseResult:
+    """Run the warmup repetitions of a case, then time `repetitions` more."""
+    if warmup < 0 or repetitions < 1:
+        raise ValueError("Warmup must be non-negative and repetitions positive")
+    for _ in range(warmup):
+        case.run(case.setup())
+
+    result = CaseResult(case.name)
+    gc_was_enabled = gc.isenabled()
+    for _ in range(repetitions):
+        state = case.setup()
+        gc.collect()
+        gc.disable()
+        try:
+            start_time = time.perf_counter()
+            case.run(state)
+            result.samples.append(time.perf_counter() - start_time)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+    return result
+
+
+def run_cases(cases: Sequence[BenchmarkCase], warmup: int = 1, repetitions: int = 10,
+              progress: Optional[Callable[[CaseResult], None]] = None) -> List[CaseResult]:
+    results = []
+    for case in cases:
+        results.append(run_case(case, warmup, repetitions))
+        if progress is not None:
+            progress(results[-1])
+    return results
+
+
+def git_revision(path: Optional[Path] = None) -> str:
+    """Short git revision of the checkout at `path` (this package by default), "-dirty" with local changes."""
+    cwd = Path(path) if path is not None else Path(__file__).resolve().parent
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=cwd, capture_output=True,
+                                  text=True, check=True).stdout.strip()
+        changes = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=cwd,
+                                 capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{revision}-dirty" if changes else revision
+
+
+def save_results(results: List[CaseResult], path: Path | str, warmup: int, repetitions: int) -> Path:
+    """
+    Save a run as a baseline. A directory `path` gets a file named after the git revision.
+    """
+    from indelsim.benchmark_report import host_info
+
+    revision = git_revision()
+    path = Path(path)
+    if path.suffix != ".json":
+        path = path / f"{revision}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "revision": revision,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "host": host_info(),
+        "warmup": warmup,
+        "repetitions": repetitions,
+        "cases": {result.name: result.as_dict() for result in results},
+    }
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2)
+    return path
+
+
+def load_results(path: Path | str) -> Dict[str, Any]:
+    """Read a baseline written by `save_results`."""
+    with open(path) as f:
+        return json.load(f)
+
+
+@dataclass
+class Comparison:
+    """Change of one case between two baselines."""
+    name: str
+    old_median: float
+    new_median: float
+    p_value: float  # Holm-adjusted
+    verdict: str
+
+    @property
+    def change(self) -> float:
+        """Relative change of the median, positive when slower."""
+        return self.new_median / self.old_median - 1
+
+
+def compare_results(old: Dict[str, Any], new: Dict[str, Any], alpha: float = 0.05,
+                    min_change: float = 0.02) -> List[Comparison]:
+    """
+    Compare the cases two baselines have in common.
+
+    A case is a "regression" or a "speedup" when a two-sided Mann-Whitney U test on the
+    samples rejects equality at level `alpha` (p-values Holm-adjusted over all compared
+    cases) and the median changed by more than `min_change` (a fraction); otherwise it
+    is "unchanged".
+    """
+    from scipy.stats import mannwhitneyu
+
+    comparisons = []
+    for name, new_case in new["cases"].items():
+        old_case = old["cases"].get(name)
+        if old_case is None:
+            continue
+        p_value = float(mannwhitneyu(old_case["samples"], new_case["samples"], alternative="two-sided").pvalue)
+        comparisons.append(Comparison(name, old_case["median"], new_case["median"], p_value, "unchanged"))
+
+    # Holm's step-down adjustment, so that comparing many cases does not produce false alarms
+    adjusted = 0.0
+    ranked = sorted(comparisons, key=lambda comparison: comparison.p_value)
+    for rank, comparison in enumerate(ranked):
+        adjusted = max(adjusted, min(1.0, (len(ranked) - rank) * comparison.p_value))
+        comparison.p_value = adjusted
+
+    for comparison in comparisons:
+        if comparison.p_value < alpha and abs(comparison.change) > min_change:
+            comparison.verdict = "regression" if comparison.change > 0 else "speedup"
+    return comparisons
+
+
+def print_results(results: List[CaseResult]) -> None:
+    for result in results:
+        print(f"  {result.name:<36} median {result.median * 1000:10.3f} ms  IQR {result.iqr * 1000:8.3f} ms")
+
+
+def print_comparison(comparisons: List[Comparison], old_revision: str, new_revision: str) -> None:
+    print(f"{'case':<36} {old_revision:>12} {new_revision:>12} {'change':>8} {'p':>8}")
+    for comparison in comparisons:
+        marker = "" if comparison.verdict == "unchanged" else f"  {comparison.verdict}"
+        print(f"{comparison.name:<36} {comparison.old_median * 1000:10.3f}ms {comparison.new_median * 1000:10.3f}ms "
+              f"{comparison.change:+8.1%} {comparison.p_value:8.4f}{marker}")
+
+
+def _create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Run the benchmark cases of the simulator and compare stored baselines",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Time all cases and store them as baselines/<revision>.json
+  indel-bench run --output baselines/
+
+  # Only the indel engines, more repetitions
+  indel-bench run --cases "indels/*" "engine_stream/*" --repetitions 30 --output baselines/
+
+  # Significant changes between two revisions; exits with status 1 on regressions
+  indel-bench compare baselines/3f2c1d0.json baselines/9a7e5b2.json
+        """
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List the benchmark cases")
+
+    run_parser = commands.add_parser("run", help="Run benchmark cases")
+    run_parser.add_argument("--cases", nargs="+", default=None,
+                            help="Glob patterns of the cases to run (default: all)")
+    run_parser.add_argument("--warmup", type=int, default=1, help="Untimed repetitions per case (default: 1)")
+    run_parser.add_argument("--repetitions", type=int, default=10, help="Timed repetitions per case (default: 10)")
+    run_parser.add_argument("--output", type=str, default=None,
+                            help="Baseline file, or directory for <revision>.json")
+
+    compare_parser = commands.add_parser("compare", help="Compare two baselines")
+    compare_parser.add_argument("old", type=str, help="Reference baseline")
+    compare_parser.add_argument("new", type=str, help="Baseline to check")
+    compare_parser.add_argument("--alpha", type=float, default=0.05,
+                                help="Significance level of the Mann-Whitney U test (default: 0.05)")
+    compare_parser.add_argument("--min_change", type=float, default=0.02,
+                                help="Smallest relative change of the median reported (default: 0.02)")
+    return parser
+
+
+def main():
+    args = _create_parser().parse_args()
+    try:
+        if args.command == "list":
+            for case in CASES.values():
+                print(f"{case.name:<36} {case.description}")
+            return
+
+        if args.command == "run":
+            cases = select_cases(args.cases)
+            print(f"Running {len(cases)} cases at revision {git_revision()} "
+                  f"({args.warmup} warmup, {args.repetitions} repetitions):")
+            results = run_cases(cases, args.warmup, args.repetitions, progress=lambda result: print_results([result]))
+            if args.output:
+                print(f"Baseline written to {save_results(results, args.output, args.warmup, args.repetitions)}")
+            return
+
+        old, new = load_results(args.old), load_results(args.new)
+        comparisons = compare_results(old, new, args.alpha, args.min_change)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print_comparison(comparisons, old["revision"], new["revision"])
+    regressions = sum(1 for comparison in comparisons if comparison.verdict == "regression")
+    speedups = sum(1 for comparison in comparisons if comparison.verdict == "speedup")
+    print(f"{regressions} regressions, {speedups} speedups, {len(comparisons) - regressions - speedups} unchanged")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+How runtime and memory of the simulators scale with the size and shape of the tree.
+
+The benchmark simulates on synthetic trees (``indelsim.bench.trees``) of every
+requested shape and leaf count, and measures each phase separately:
+
+- the indel phase (events, blocks and the gap template MSA) with every engine
+- the substitution phase along the same tree with every substitution algorithm,
+  on a root sequence of the configured length
+
+The phases are independent, so every engine and every algorithm is measured
+once per tree instead of in all combinations. Times are the fastest of the
+repetitions, memory is the tracemalloc peak of a separate, untimed replicate.
+By default every branch has the same mean length whatever the leaf count, so
+the number of events grows with the tree; ``--total_length`` fixes the tree
+length instead. For every shape, phase and method a power law
+``value = coefficient * leaves ** exponent`` is fitted to time and memory:
+
+    indel-bench-scaling --shapes yule caterpillar --leaves 100 1000 10000 --engines list tree --output scaling.csv
+"""
+
+import argparse
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from indelsim.api import ENGINE_TYPES, simulate
+from indelsim.bench.trees import TREE_SHAPES, generate_tree
+from indelsim.classes.sim_config import SimConfiguration
+from indelsim.sweep import write_rows
+
+__all__ = ["SUBSTITUTION_ALGORITHMS", "ScalingFit", "fit_power_law", "run_scaling_benchmark", "fit_scaling"]
+
+SUBSTITUTION_ALGORITHMS = ("matrix", "gillespie")
+
+
+def fit_power_law(x: Sequence[float], y: Sequence[float]) -> Tuple[float, float]:
+    """
+    Least-squares fit of ``y = coefficient * x ** exponent`` in log-log space.
+
+    Returns:
+        (coefficient, exponent)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    usable = (x > 0) & (y > 0)
+    if len(np.unique(x[usable])) < 2:
+        raise ValueError("A power law needs positive values at two different sizes at least")
+    exponent, intercept = np.polyfit(np.log(x[usable]), np.log(y[usable]), 1)
+    return float(np.exp(intercept)), float(exponent)
+
+
+@dataclass
+class ScalingFit:
+    """Fitted time and memory curves of one method on one tree shape."""
+    shape: str
+    phase: str
+    method: str
+    time_coefficient: float
+    time_exponent: float
+    memory_coefficient: Optional[float] = None
+    memory_exponent: Optional[float] = None
+
+
+def _traced_peak(run) -> int:
+    started_tracemalloc = not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start()
+    try:
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if started_tracemalloc:
+            tracemalloc.stop()
+    return max(0, peak - current)
+
+
+def run_scaling_benchmark(shapes: Sequence[str] = tuple(TREE_SHAPES), leaf_counts: Sequence[int] = (16, 64, 256),
+                          engines: Sequence[str] = tuple(ENGINE_TYPES),
+                          algorithms: Sequence[str] = SUBSTITUTION_ALGORITHMS, sequence_length: int = 1000,
+                          mean_branch_length: float = 0.05, total_length: Optional[float] = None,
+                          insertion_rate: float = 0.03, deletion_rate: float = 0.09, repeats: int = 3,
+                          measure_memory: bool = True, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """
+    Yield one row per tree and method: shape, leaves, tree length, phase ("indel" or
+    "substitution"), method (engine or algorithm), seconds, peak_bytes and MSA length.
+
+    Args:
+        shapes: Tree shapes of TREE_SHAPES
+        leaf_counts: Numbers of leaves
+        engines: Indel engines to measure
+        algorithms: Substitution algorithms to measure
+        sequence_length: Root sequence length
+        mean_branch_length: Mean branch length, used when `total_length` is None
+        total_length: Sum of all branch lengths of every tree
+        insertion_rate: Insertion rate per site
+        deletion_rate: Deletion rate per site
+        repeats: Timed runs of the same replicate per tree and method, the fastest one is reported
+        measure_memory: Also measure the peak memory of every tree and method
+        seed: Seed of the trees and the simulations
+    """
+    if repeats < 1:
+        raise ValueError("Number of repeats must be positive")
+    for shape in shapes:
+        for leaves in leaf_counts:
+            tree_length = total_length if total_length is not None else mean_branch_length * (2 * leaves - 2)
+            tree = generate_tree(shape, leaves, total_length=tree_length, seed=seed).to_ete3()
+            methods = [("indel", engine) for engine in engines] + \
+                      [("substitution", algorithm) for algorithm in algorithms]
+            for phase, method in methods:
+                config = SimConfiguration(original_sequence_length=sequence_length, indel_length_alpha=2.0,
+                                          indel_truncated_length=50, rate_ins=insertion_rate,
+                                          rate_del=deletion_rate, deletion_extra_edge_length=49, seed=seed,
+                                          enable_substitutions=phase == "substitution",
+                                          substitution_algorithm=method if phase == "substitution" else "matrix")
+                engine = method if phase == "indel" else None
+                runtime_key = "indel_runtime_seconds" if phase == "indel" else "substitution_runtime_seconds"
+
+                # Every repeat runs the same replicate, so that they time the same workload
+                seconds = None
+                msa_length = None
+                for _ in range(repeats):
+                    [result] = simulate(tree, config, n=1, engine=engine, first_simulation=0)
+                    if seconds is None or result[runtime_key] < seconds:
+                        seconds = result[runtime_key]
+                        msa_length = result["msa_length"]
+                peak_bytes = None
+                if measure_memory:
+                    peak_bytes = _traced_peak(lambda: list(simulate(tree, config, n=1, engine=engine)))
+                yield {
+                    "shape": shape,
+                    "leaves": leaves,
+                    "tree_length": tree_length,
+                    "phase": phase,
+                    "method": method,
+                    "seconds": seconds,
+                    "peak_bytes": peak_bytes,
+                    "msa_length": msa_length,
+                }
+
+
+def fit_scaling(rows: List[Dict[str, Any]]) -> List[ScalingFit]:
+    """Fit the time and memory curves of every shape, phase and method against the number of leaves."""
+    groups: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault((row["shape"], row["phase"], row["method"]), []).append(row)
+
+    fits = []
+    for (shape, phase, method), group in groups.items():
+        leaves = [row["leaves"] for row in group]
+        if len(set(leaves)) < 2:
+            continue
+        fit = ScalingFit(shape, phase, method, *fit_power_law(leaves, [row["seconds"] for row in group]))
+        if all(row["peak_bytes"] for row in group):
+            fit.memory_coefficient, fit.memory_exponent = fit_power_law(leaves, [row["peak_bytes"] for row in group])
+        fits.append(fit)
+    return fits
+
+
+def print_fits(fits: List[ScalingFit]) -> None:
+    print("Fitted curves (value = coefficient * leaves ^ exponent):")
+    for fit in fits:
+        line = (f"  {fit.shape} {fit.phase} {fit.method}: time {fit.time_coefficient:.3g} s * n^{fit.time_exponent:.2f}")
+        if fit.memory_exponent is not None:
+            line += f", memory {fit.memory_coefficient:.3g} B * n^{fit.memory_exponent:.2f}"
+        print(line)
+
+
+def _create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Measure how the simulators scale with the number of leaves and the shape of the tree",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # All shapes, engines and algorithms up to 256 leaves
+  indel-bench-scaling --output scaling.csv
+
+  # Block engines on large Yule trees of a fixed total length, timings only
+  indel-bench-scaling --shapes yule --leaves 1000 10000 100000 --engines list tree --algorithms matrix
+                      --total_length 50 --skip_memory
+        """
+    )
+    parser.add_argument("--shapes", nargs="+", choices=sorted(TREE_SHAPES), default=list(TREE_SHAPES),
+                        help="Tree shapes (default: all)")
+    parser.add_argument("--leaves", nargs="+", type=int, default=[16, 64, 256],
+                        help="Numbers of leaves (default: 16 64 256)")
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINE_TYPES), default=list(ENGINE_TYPES),
+                        help="Indel engines (default: all)")
+    parser.add_argument("--algorithms", nargs="+", choices=SUBSTITUTION_ALGORITHMS,
+                        default=list(SUBSTITUTION_ALGORITHMS), help="Substitution algorithms (default: both)")
+    parser.add_argument("--sequence_length", type=int, default=1000, help="Root sequence length (default: 1000)")
+    parser.add_argument("--mean_branch_length", type=float, default=0.05,
+                        help="Mean branch length of every tree (default: 0.05)")
+    parser.add_argument("--total_length", type=float, default=None,
+                        help="Sum of the branch lengths of every tree, instead of a mean branch length")
+    parser.add_argument("--insertion_rate", type=float, default=0.03, help="Insertion rate (default: 0.03)")
+    parser.add_argument("--deletion_rate", type=float, default=0.09, help="Deletion rate (default: 0.09)")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs of the same replicate per tree and method (default: 3)")
+    parser.add_argument("--skip_memory", action="store_true", help="Do not measure the peak memory")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    parser.add_argument("--output", type=str, default=None, help="Also write the measurements as CSV or .parquet")
+    return parser
+
+
+def main():
+    args = _create_parser().parse_args()
+    try:
+        rows = []
+        for row in run_scaling_benchmark(args.shapes, args.leaves, args.engines, args.algorithms,
+                                         sequence_length=args.sequence_length,
+                                         mean_branch_length=args.mean_branch_length, total_length=args.total_length,
+                                         insertion_rate=args.insertion_rate, deletion_rate=args.deletion_rate,
+                                         repeats=args.repeats, measure_memory=not args.skip_memory, seed=args.seed):
+            memory = "" if row["peak_bytes"] is None else f", peak {row['peak_bytes'] / 1024 / 1024:.2f} MiB"
+            print(f"{row['shape']} {row['leaves']} leaves, {row['phase']} {row['method']}: "
+                  f"{row['seconds']:.4f}s{memory}")
+            rows.append(row)
+        if args.output:
+            write_rows(rows, Path(args.output))
+        print_fits(fit_scaling(rows))
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Synthetic phylogenies of any size and shape.
+
+    newick = generate_tree("yule", 100_000, total_length=500.0, seed=1).to_newick()
+
+Shapes (``TREE_SHAPES``):
+
+- ``yule``: pure-birth tree, the reconstructed tree of a constant-rate process
+- ``birth_death``: reconstructed tree of a birth-death process (extinct
+  lineages pruned), parameters ``birth_rate`` (1) and ``death_rate`` (0.5)
+- ``balanced``: every internal node splits its leaves in halves, depth log2(n)
+- ``caterpillar``: every internal node has a leaf child, depth n - 1
+
+Trees are built as child lists and written to newick without recursion, so
+that trees of a million leaves (and caterpillars as deep) can be produced.
+Branch lengths are in the units of the process (yule, birth_death) or all 1
+(balanced, caterpillar), unless ``total_length`` rescales the sum of all branch
+lengths. Leaves are named ``t1`` ... ``tn`` in newick order.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from ete3 import Tree
+
+__all__ = ["SyntheticTree", "TREE_SHAPES", "generate_tree", "birth_death_tree", "yule_tree", "balanced_tree",
+           "caterpillar_tree"]
+
+# Separates two children on the newick stack
+_COMMA = -1
+
+
+class SyntheticTree:
+    """A rooted tree as child lists; node 0 is the root and children have larger ids than their parent."""
+    children: List[List[int]]
+    branch_lengths: List[float]
+
+    def __init__(self):
+        self.children = [[]]
+        self.branch_lengths = [0.0]
+
+    def add_child(self, parent: int, branch_length: float) -> int:
+        node = len(self.children)
+        self.children.append([])
+        self.branch_lengths.append(branch_length)
+        self.children[parent].append(node)
+        return node
+
+    @property
+    def number_of_leaves(self) -> int:
+        return sum(1 for children in self.children if not children)
+
+    @property
+    def total_length(self) -> float:
+        """Sum of all branch lengths."""
+        return sum(self.branch_lengths)
+
+    def scale_to(self, total_length: float) -> "SyntheticTree":
+        """Rescale all branch lengths so that they sum up to `total_length`."""
+        if total_length <= 0:
+            raise ValueError("Total tree length must be positive")
+        factor = total_length / self.total_length
+        self.branch_lengths = [length * factor for length in self.branch_lengths]
+        return self
+
+    def to_newick(self, precision: int = 8) -> str:
+        parts = []
+        leaves = 0
+        stack: List[Any] = [0]
+        while stack:
+            item = stack.pop()
+            if item == _COMMA:
+                parts.append(",")
+                continue
+            if isinstance(item, tuple):
+                node = item[0]
+                parts.append(")" if node == 0 else f"):{self.branch_lengths[node]:.{precision}g}")
+                continue
+            children = self.children[item]
+            if not children:
+                leaves += 1
+                parts.append(f"t{leaves}:{self.branch_lengths[item]:.{precision}g}")
+                continue
+            parts.append("(")
+            stack.append((item,))
+            for idx, child in enumerate(reversed(children)):
+                if idx:
+                    stack.append(_COMMA)
+                stack.append(child)
+        parts.append(";")
+        return "".join(parts)
+
+    def to_ete3(self) -> Tree:
+        return Tree(self.to_newick())
+
+
+def birth_death_tree(n_leaves: int, rng: np.random.Generator, birth_rate: float = 1.0,
+                     death_rate: float = 0.0) -> SyntheticTree:
+    """
+    Reconstructed tree of a birth-death process run until `n_leaves` lineages are alive.
+
+    The process restarts when all lineages die. The living lineages are extended by the
+    waiting time to the next event, so that the last split does not leave two zero-length leaves.
+    """
+    if n_leaves < 2:
+        raise ValueError("A tree needs at least 2 leaves")
+    if birth_rate <= 0 or not 0 <= death_rate < birth_rate:
+        raise ValueError("Rates must satisfy 0 <= death_rate < birth_rate")
+    total_rate = birth_rate + death_rate
+    birth_probability = birth_rate / total_rate
+
+    while True:
+        parents = [-1]
+        starts = [0.0]
+        ends = [0.0]
+        alive = [0]
+        now = 0.0
+        while 0 < len(alive) < n_leaves:
+            now += rng.exponential(1.0 / (len(alive) * total_rate))
+            idx = int(rng.integers(len(alive)))
+            lineage = alive[idx]
+            ends[lineage] = now
+            alive[idx] = alive[-1]
+            alive.pop()
+            if rng.random() < birth_probability:
+                for _ in range(2):
+                    alive.append(len(parents))
+                    parents.append(lineage)
+                    starts.append(now)
+                    ends.append(now)
+        if alive:
+            break
+
+    now += rng.exponential(1.0 / (n_leaves * total_rate))
+    for lineage in alive:
+        ends[lineage] = now
+
+    # Keep the lineages with living descendants; children always have larger ids than their parent
+    survives = [False] * len(parents)
+    for lineage in alive:
+        survives[lineage] = True
+    lineage_children: List[List[int]] = [[] for _ in parents]
+    for lineage in range(len(parents) - 1, 0, -1):
+        if survives[lineage]:
+            survives[parents[lineage]] = True
+            lineage_children[parents[lineage]].append(lineage)
+
+    def collapse(lineage: int, length: float):
+        # Lineages with a single surviving child are merged into that child
+        while len(lineage_children[lineage]) == 1:
+            lineage = lineage_children[lineage][0]
+            length += ends[lineage] - starts[lineage]
+        return length, lineage_children[lineage]
+
+    tree = SyntheticTree()
+    _, root_children = collapse(0, 0.0)
+    stack = [(0, root_children)]
+    while stack:
+        node, children = stack.pop()
+        for child in reversed(children):
+            length, grandchildren = collapse(child, ends[child] - starts[child])
+            child_node = tree.add_child(node, length)
+            if grandchildren:
+                stack.append((child_node, grandchildren))
+    return tree
+
+
+def yule_tree(n_leaves: int, rng: np.random.Generator, birth_rate: float = 1.0) -> SyntheticTree:
+    """Pure-birth tree with `n_leaves` leaves."""
+    return birth_death_tree(n_leaves, rng, birth_rate, 0.0)
+
+
+def balanced_tree(n_leaves: int, rng: Optional[np.random.Generator] = None) -> SyntheticTree:
+    """Tree whose internal nodes split their leaves as evenly as possible, with unit branch lengths."""
+    if n_leaves < 2:
+        raise ValueError("A tree needs at least 2 leaves")
+    tree = SyntheticTree()
+    stack = [(0, n_leaves)]
+    while stack:
+        node, leaves = stack.pop()
+        if leaves == 1:
+            continue
+        for half in (leaves - leaves // 2, leaves // 2):
+            stack.append((tree.add_child(node, 1.0), half))
+    return tree
+
+
+def caterpillar_tree(n_leaves: int, rng: Optional[np.random.Generator] = None) -> SyntheticTree:
+    """Tree whose internal nodes all have a leaf child, with unit branch lengths."""
+    if n_leaves < 2:
+        raise ValueError("A tree needs at least 2 leaves")
+    tree = SyntheticTree()
+    spine = 0
+    for _ in range(n_leaves - 2):
+        tree.add_child(spine, 1.0)
+        spine = tree.add_child(spine, 1.0)
+    tree.add_child(spine, 1.0)
+    tree.add_child(spine, 1.0)
+    return tree
+
+
+def _supercritical_birth_death_tree(n_leaves: int, rng: np.random.Generator, birth_rate: float = 1.0,
+                                   death_rate: float = 0.5) -> SyntheticTree:
+    return birth_death_tree(n_leaves, rng, birth_rate, death_rate)
+
+
+TREE_SHAPES: Dict[str, Callable[..., SyntheticTree]] = {
+    "yule": yule_tree,
+    "birth_death": _supercritical_birth_death_tree,
+    "balanced": balanced_tree,
+    "caterpillar": caterpillar_tree,
+}
+
+
+def generate_tree(shape: str, n_leaves: int, total_length: Optional[float] = None, seed: int = 0,
+                  **parameters) -> SyntheticTree:
+    """
+    Build a synthetic tree.
+
+    Args:
+        shape: One of TREE_SHAPES
+        n_leaves: Number of leaves
+        total_length: Sum of all branch lengths; the shape's own lengths if None
+        seed: Seed of the random shapes
+        **parameters: Parameters of the shape, e.g. ``death_rate`` of birth_death
+    """
+    if shape not in TREE_SHAPES:
+        raise ValueError(f"Unknown tree shape '{shape}', expected one of {sorted(TREE_SHAPES)}")
+    tree = TREE_SHAPES[shape](n_leaves, np.random.default_rng(seed), **parameters)
+    if total_length is not None:
+        tree.scale_to(total_length)
+    return tree
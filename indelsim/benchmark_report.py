@@ -0,0 +1,132 @@
+"""
+Machine-readable benchmark results of the command-line tools.
+
+With ``--benchmark_json PATH`` a CLI appends one JSON line per finished replicate
+to the replicate log next to ``PATH`` (``results.json`` -> ``results.jsonl``)
+while it runs, and writes a summary document to ``PATH`` once the run is over:
+the tool, the host, the parameters of the run, its wall time and the records of
+all replicates. A resumed run (``--resume``) keeps the log of the interrupted run,
+so its summary also covers the replicates finished before the interruption. A
+replicate record holds every measurement of the replicate's
+result (runtimes, event and block counts, MSA length, number of leaves, engine,
+seed, worker and memory figures), without the alignment itself.
+"""
+
+import json
+import os
+import pathlib
+import platform
+import socket
+from datetime import datetime
+from typing import Any, Dict, List
+
+import numpy as np
+
+__all__ = ["BenchmarkReport", "host_info", "run_arguments", "replicate_record"]
+
+# Result fields holding alignments rather than measurements
+_ALIGNMENT_KEYS = ("msa", "final_msa", "node_blocks")
+
+
+def host_info() -> Dict[str, Any]:
+    """Describe the machine and software versions, so runs can be compared across hosts."""
+    from indelsim import __version__
+
+    return {
+        "hostname": socket.gethostname(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "indelsim": __version__,
+    }
+
+
+def run_arguments(args: Any) -> Dict[str, Any]:
+    """Return all arguments of a run, including those that do not change its replicates (e.g. jobs)."""
+    return {key: value if isinstance(value, (bool, int, float, type(None))) else str(value)
+            for key, value in sorted(vars(args).items())}
+
+
+def replicate_record(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the measurements of a replicate result."""
+    return {key: value for key, value in result.items() if key not in _ALIGNMENT_KEYS}
+
+
+class BenchmarkReport:
+    """
+    Writes the benchmark results of one run.
+
+    Args:
+        path: File of the summary document
+        tool: Name of the CLI ("indel", "substitution" or "combined")
+        args: Parsed arguments of the run
+        resume: Keep the replicate log of the interrupted run and append to it
+    """
+    path: pathlib.Path
+    replicates_path: pathlib.Path
+
+    def __init__(self, path: pathlib.Path | str, tool: str, args: Any, resume: bool = False):
+        self.path = pathlib.Path(path)
+        if self.path.suffix == ".json":
+            self.replicates_path = self.path.with_suffix(".jsonl")
+        else:
+            self.replicates_path = self.path.with_name(self.path.name + ".jsonl")
+        self.tool = tool
+        self.parameters = run_arguments(args)
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Records of the interrupted run, by simulation number
+        self._earlier_records: Dict[int, Dict[str, Any]] = {}
+        if resume and self.replicates_path.exists():
+            self._load_earlier_records()
+        else:
+            self.replicates_path.write_text("")
+
+    def _load_earlier_records(self) -> None:
+        with open(self.replicates_path) as f:
+            for line in f:
+                # A line cut short by the crash is dropped
+                if not line.endswith("\n"):
+                    break
+                record = json.loads(line)
+                self._earlier_records[record["simulation_number"]] = record
+        # Rewrite the log without a possibly truncated last line
+        with open(self.replicates_path, 'w') as f:
+            for record in self._earlier_records.values():
+                f.write(json.dumps(record) + "\n")
+
+    def record(self, result: Dict[str, Any]) -> None:
+        """Append the record of a finished replicate to the replicate log."""
+        with open(self.replicates_path, 'a') as f:
+            f.write(json.dumps(replicate_record(result), default=str) + "\n")
+
+    def finish(self, results: List[Dict[str, Any]], wall_time: float) -> pathlib.Path:
+        """
+        Write the summary document of the run.
+
+        Args:
+            results: Results of the replicates run in this session
+            wall_time: Wall time of this session
+        """
+        records = {record["simulation_number"]: record for record in map(replicate_record, results)}
+        # Replicates run again after the interruption count once, with their new record
+        earlier = [record for number, record in self._earlier_records.items() if number not in records]
+        replicates = sorted(earlier + list(records.values()), key=lambda record: record["simulation_number"])
+        summary = {
+            "tool": self.tool,
+            "started_at": self.started_at,
+            "host": host_info(),
+            "parameters": self.parameters,
+            "wall_time_seconds": wall_time,
+            "number_of_replicates": len(replicates),
+            "resumed_replicates": len(earlier),
+            "rejected_replicates": sum(1 for record in replicates if record.get("rejected")),
+            "replicates": replicates,
+        }
+        with open(self.path, 'w') as f:
+            json.dump(summary, f, indent=2, default=str)
+        return self.path
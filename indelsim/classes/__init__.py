@@ -1,5 +1,5 @@
 from .simulation import Simulation
-from .sim_config import SimConfiguration
+from .sim_config import SimConfiguration, SimulationBudgetExceeded
 from .avl_node import AVLNode
 from .avl_tree import AVLTree
 from .block import Block
@@ -10,9 +10,10 @@ from .seq_node_naive import SequenceNodeNaive
 from .super_sequence import SuperSequence
 from .sequence import Sequence
 from .msa import Msa
+from .subtree_scheduler import SubtreeScheduler
 
 __all__ = [
-    "Simulation", "SimConfiguration", "AVLNode", "AVLTree", "Block",
+    "Simulation", "SimConfiguration", "SimulationBudgetExceeded", "AVLNode", "AVLTree", "Block",
     "IndelEvent", "SequenceNodeAsList", "SequenceNodeAsTree", 
-    "SequenceNodeNaive", "SuperSequence", "Sequence", "Msa"
+    "SequenceNodeNaive", "SuperSequence", "Sequence", "Msa", "SubtreeScheduler"
 ]
\ No newline at end of file
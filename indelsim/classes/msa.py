@@ -1,6 +1,7 @@
 from pathlib import Path
 from indelsim.classes.super_sequence import SuperSequence
 from indelsim.classes.sequence import Sequence
+from indelsim.tracing import span
 
 
 class Msa:
@@ -10,13 +11,15 @@ class Msa:
     _number_of_sequences: int
     _sequences_to_save: list[Sequence]
     _is_from_naive: bool
+    _pending_rows: dict[int, Sequence]
 
 
     def __init__(self, super_seq: SuperSequence=None):
         if super_seq is not None:
             self._number_of_sequences = super_seq.get_number_of_sequences()
             self._msa_length = super_seq.get_msa_length()
-            super_seq.set_absolute_positions()
+            with span("set absolute positions", "indel"):
+                super_seq.set_absolute_positions()
             self._is_from_naive = False
         else:
             self._is_from_naive = True
@@ -32,44 +35,14 @@ class Msa:
         """
         if self._is_from_naive:
             for idx, seq in self._aligned_sequences.items():
-                seq_str = "".join(["X" if (site != -1) else "-" for site in seq])
+                seq_str = self._render_naive_row(seq)
                 self._aligned_sequences[idx] = seq_str
                 self._msa_length = len(seq_str)
                 self._number_of_sequences = len(self._aligned_sequences)
             return
 
         for idx,seq in enumerate(self._sequences_to_save):
-            sequence_node_id = seq.get_sequence_node_id()
-            
-            # Initialize the aligned sequence for this ID if not exists
-            if sequence_node_id not in self._aligned_sequences:
-                self._aligned_sequences[sequence_node_id] = []
-            
-            # Handle empty sequence (only gaps)
-            if len(seq) == 0:
-                self._aligned_sequences[sequence_node_id].append(-self._msa_length)
-                continue
-            
-            previous_absolute_position = -1
-            seq_str = []
-            positions_counter = 0
-            for site in seq[1:]:
-                current_absolute_position = (site()).absolute_position
-                position_difference = current_absolute_position-previous_absolute_position
-                if (position_difference) > 1:
-                    seq_str.append(("-" * ((position_difference) - 1)))
-                    seq_str.append("X")
-                    positions_counter += position_difference
-                else:
-                    seq_str.append("X")
-                    positions_counter += 1
-
-                previous_absolute_position = current_absolute_position
-            if (self._msa_length - positions_counter)  >  0:
-                seq_str.append(("-" * (self._msa_length - positions_counter)))
-
-
-            self._aligned_sequences[sequence_node_id] = ''.join(seq_str)
+            self._aligned_sequences[seq.get_sequence_node_id()] = self._render_row(seq)
             self._sequences_to_save[idx] = 0
         self._sequences_to_save.clear()
 
@@ -87,7 +60,7 @@ class Msa:
             with open(output_path, 'a') as f:
 
                 for idx, seq in self._aligned_sequences.items():
-                    seq_str = "".join(["X" if (site != -1) else "-" for site in seq])
+                    seq_str = self._render_naive_row(seq)
                     fasta_line_str = f">{self._id_to_name[idx]}\n{seq_str}\n"
                     f.write(fasta_line_str)
             self._msa_length = len(seq_str)
@@ -103,41 +76,60 @@ class Msa:
                 seq_name = self._id_to_name.get(sequence_node_id, str(sequence_node_id))
                 f.write(f">{seq_name}\n")
                 
-                # Handle empty sequence (only gaps)
-                if len(seq) == 0:
-                    f.write("-" * self._msa_length + "\n")
-                    continue
-                
-                # Build sequence string (same logic as original compute_msa)
-                previous_absolute_position = -1
-                positions_counter = 0
-
-                for site in seq[1:]:
-                    current_absolute_position = (site()).absolute_position
-                    position_difference = current_absolute_position - previous_absolute_position
-                    
-                    if position_difference > 1:
-                        f.write("-" * (position_difference - 1) + "X")
-                        positions_counter += position_difference
-                    else:
-                        f.write("X")
-                        positions_counter += 1
-
-                    previous_absolute_position = current_absolute_position
-                
-                # Add trailing gaps if needed
-                if (self._msa_length - positions_counter) > 0:
-                    f.write("-" * (self._msa_length - positions_counter))
-                
-                # Write sequence directly to file instead of storing in _aligned_sequences
-                f.write("\n")
-
+                f.write(self._render_row(seq) + "\n")
                 self._sequences_to_save[idx] = 0
 
             self._sequences_to_save.clear()
             self._aligned_sequences.clear()
         return output_path
 
+    def index_rows(self) -> None:
+        """
+        Prepare rendering the rows one leaf at a time with `pop_row`.
+
+        Nothing is rendered yet; only the MSA length of a naive MSA is computed.
+        """
+        if self._is_from_naive:
+            self._msa_length = len(next(iter(self._aligned_sequences.values()), []))
+            self._number_of_sequences = len(self._aligned_sequences)
+            return
+        self._pending_rows = {seq.get_sequence_node_id(): seq for seq in self._sequences_to_save}
+        self._sequences_to_save.clear()
+
+    def pop_row(self, node_id: int) -> str:
+        """Render the aligned row of leaf `node_id` (after `index_rows`) and release its sequence."""
+        if self._is_from_naive:
+            return self._render_naive_row(self._aligned_sequences.pop(node_id))
+        return self._render_row(self._pending_rows.pop(node_id))
+
+    @staticmethod
+    def _render_naive_row(sites: list[int]) -> str:
+        """Render a row of the naive MSA, where -1 marks a gap."""
+        return "".join(["X" if (site != -1) else "-" for site in sites])
+
+    def _render_row(self, seq: Sequence) -> str:
+        """Render the aligned row of `seq` from the absolute positions of its sites."""
+        # Handle empty sequence (only gaps)
+        if len(seq) == 0:
+            return "-" * self._msa_length
+
+        previous_absolute_position = -1
+        seq_str = []
+        positions_counter = 0
+        for site in seq[1:]:
+            current_absolute_position = (site()).absolute_position
+            position_difference = current_absolute_position - previous_absolute_position
+            if position_difference > 1:
+                seq_str.append("-" * (position_difference - 1) + "X")
+                positions_counter += position_difference
+            else:
+                seq_str.append("X")
+                positions_counter += 1
+            previous_absolute_position = current_absolute_position
+        if (self._msa_length - positions_counter) > 0:
+            seq_str.append("-" * (self._msa_length - positions_counter))
+        return ''.join(seq_str)
+
     def get_aligned_sequence(self):
         """Return the aligned sequence dictionary"""
         return self._aligned_sequence
@@ -0,0 +1,346 @@
+"""
+Time-reversible substitution models sharing one eigendecomposition engine.
+
+A model is defined by its alphabet, a symmetric exchangeability matrix S and
+equilibrium frequencies π. The rate matrix Q_ij = S_ij * π_j is scaled to one
+expected substitution per unit time, symmetrized with sqrt(π) and
+eigendecomposed once, after which P(t) = Y * exp(Λt) * Y^(-1) for any time t.
+
+# Subclasses only provide their data
+class MyModel(ReversibleModel):
+    alphabet = "ACGT"
+    def _initialize_data(self):
+        self._pi_data = ...
+        self._exchangeabilities = ...
+"""
+
+import warnings
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from scipy.linalg import expm
+
+__all__ = ["ModelConfig", "ReversibleModel", "SubstitutionModelError"]
+
+
+@dataclass(frozen=True)
+class ModelConfig:
+    """Numerical parameters of a substitution model."""
+
+    # Numerical tolerances
+    ZERO_TOLERANCE: float = 1e-8
+    BALANCE_TOLERANCE: float = 1e-8
+    RECONSTRUCTION_TOLERANCE: float = 1e-10
+
+    # Time limits for calculations
+    MIN_TIME: float = 1e-10
+    MAX_TIME: float = 1000.0
+
+    # Cache size for transition matrices
+    CACHE_SIZE: int = 128
+
+
+class SubstitutionModelError(Exception):
+    """Base exception for substitution model errors."""
+    pass
+
+
+class ReversibleModel:
+    """
+    Time-reversible substitution model over a fixed alphabet.
+
+    Subclasses set `alphabet` and implement `_initialize_data`, which stores the
+    equilibrium frequencies in `_pi_data` and the symmetric exchangeabilities in
+    `_exchangeabilities` (or overrides `_build_substitution_matrix`).
+    """
+
+    name: str = "reversible"
+    alphabet: str = ""
+    error_class: type = SubstitutionModelError
+
+    def __init__(self, config: Optional[ModelConfig] = None):
+        """
+        Initialize the model.
+
+        Args:
+            config: Configuration parameters (uses defaults if None)
+        """
+        self.config = config or ModelConfig()
+        self._is_computed = False
+
+        # Model components (initialized when computed)
+        self._Q: Optional[np.ndarray] = None
+        self._eigenvalues: Optional[np.ndarray] = None
+        self._Y: Optional[np.ndarray] = None
+        self._Y_inv: Optional[np.ndarray] = None
+        self._pi: Optional[np.ndarray] = None
+        self._v_matrix: Optional[np.ndarray] = None
+
+        # Initialize model data
+        self._initialize_data()
+
+        # ASCII code of every state, the gap code `num_states` last
+        self._byte_table = np.frombuffer(f"{self.alphabet}-".encode("ascii"), dtype=np.uint8)
+
+    @property
+    def num_states(self) -> int:
+        """Number of states (residues) of the alphabet."""
+        return len(self.alphabet)
+
+    def residue_bytes(self, states: np.ndarray) -> bytes:
+        """Return the ASCII row of `states`, the gap code `num_states` being written as '-'."""
+        return self._byte_table[states].tobytes()
+
+    def _initialize_data(self) -> None:
+        """Set `_pi_data` and `_exchangeabilities`."""
+        raise NotImplementedError
+
+    def _build_substitution_matrix(self) -> np.ndarray:
+        """Return the symmetric substitution matrix S."""
+        return self._exchangeabilities
+
+    def compute_model(self) -> None:
+        """
+        Compute the model components.
+
+        This method builds the rate matrix Q, performs eigendecomposition,
+        and validates the resulting model.
+        """
+        if self._is_computed:
+            return
+
+        try:
+            # Build the symmetric substitution matrix S
+            S = self._build_substitution_matrix()
+
+            # Construct the rate matrix Q
+            Q = self._build_rate_matrix(S)
+
+            # Scale Q to evolutionary time units
+            Q_scaled = self._scale_rate_matrix(Q)
+
+            # Perform eigendecomposition
+            eigenvalues, Y, Y_inv, v_matrix = self._eigendecomposition(Q_scaled)
+
+            # Validate the decomposition
+            self._validate_decomposition(Q_scaled, eigenvalues, Y, Y_inv)
+
+            # Store results
+            self._Q = Q_scaled
+            self._eigenvalues = eigenvalues
+            self._Y = Y
+            self._Y_inv = Y_inv
+            self._pi = self._pi_data.copy()
+            self._v_matrix = v_matrix
+
+            self._is_computed = True
+
+        except Exception as e:
+            raise self.error_class(f"Failed to compute {self.name} model: {str(e)}") from e
+
+    def _build_rate_matrix(self, S: np.ndarray) -> np.ndarray:
+        """Build the rate matrix Q from the substitution matrix S."""
+        # Q_ij = S_ij * π_j for i ≠ j
+        Q = S * self._pi_data[np.newaxis, :]
+
+        # Set diagonal to zero initially
+        np.fill_diagonal(Q, 0.0)
+
+        # Set diagonal elements to ensure row sums are zero
+        Q -= np.diag(Q.sum(axis=1))
+
+        return Q
+
+    def _scale_rate_matrix(self, Q: np.ndarray) -> np.ndarray:
+        """Scale the rate matrix Q to evolutionary time units."""
+        # Calculate the average substitution rate
+        rate = -(self._pi_data * np.diag(Q)).sum()
+
+        if rate <= 0:
+            raise self.error_class(f"Invalid substitution rate: {rate}")
+
+        # Scale Q so that the average rate is 1.0
+        Q_scaled = Q / rate
+
+        return Q_scaled
+
+    def _eigendecomposition(self, Q: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Perform eigendecomposition of the rate matrix Q."""
+        # Use symmetrization for numerical stability
+        sqrt_pi = np.sqrt(self._pi_data)
+
+        # Avoid division by very small numbers
+        min_sqrt_pi = np.min(sqrt_pi)
+        if min_sqrt_pi < 1e-10:
+            warnings.warn(f"Very small equilibrium frequency detected: {min_sqrt_pi**2:.2e}")
+
+        # Build transformation matrices
+        T = np.diag(sqrt_pi)
+        T_inv = np.diag(1.0 / sqrt_pi)
+
+        # Symmetrize: M = T * Q * T^(-1)
+        M = T @ Q @ T_inv
+
+        # Eigendecomposition of symmetric matrix
+        eigenvalues, v_matrix = np.linalg.eigh(M)
+
+        # Sort eigenvalues and eigenvectors in descending order
+        idx = np.argsort(eigenvalues)[::-1]
+        eigenvalues = eigenvalues[idx]
+        v_matrix = v_matrix[:, idx]
+
+        # Transform back to original space
+        Y = T_inv @ v_matrix
+        Y_inv = v_matrix.T @ T
+
+        return eigenvalues, Y, Y_inv, v_matrix
+
+    def _validate_decomposition(self, Q: np.ndarray, eigenvalues: np.ndarray, Y: np.ndarray, Y_inv: np.ndarray) -> None:
+        """Validate the eigendecomposition results."""
+        # Check reconstruction
+        lambda_matrix = np.diag(eigenvalues)
+        Q_reconstructed = Y @ lambda_matrix @ Y_inv
+
+        if not np.allclose(Q, Q_reconstructed, atol=self.config.RECONSTRUCTION_TOLERANCE):
+            raise self.error_class("Eigendecomposition reconstruction failed")
+
+        # Check eigenvalue structure
+        zero_evals = np.abs(eigenvalues) < self.config.ZERO_TOLERANCE
+        neg_evals = eigenvalues < -self.config.ZERO_TOLERANCE
+
+        if np.sum(zero_evals) != 1:
+            raise self.error_class(f"Expected 1 zero eigenvalue, found {np.sum(zero_evals)}")
+
+        if np.sum(neg_evals) != self.num_states - 1:
+            raise self.error_class(f"Expected {self.num_states - 1} negative eigenvalues, found {np.sum(neg_evals)}")
+
+    def transition_probability(self, t: float) -> np.ndarray:
+        """
+        Calculate the transition probability matrix P(t) = exp(Qt).
+
+        Nothing is cached; the matrices of many branches are computed together
+        with `transition_probabilities`, e.g. by `TransitionCache`.
+
+        Args:
+            t: Evolutionary time (must be positive)
+
+        Returns:
+            Transition probability matrix P(t)
+
+        Raises:
+            SubstitutionModelError: If time is invalid or model not computed
+        """
+        # Validate time parameter
+        if not isinstance(t, (int, float)) or np.isnan(t) or np.isinf(t):
+            raise self.error_class(f"Invalid time value: {t}")
+
+        if t < self.config.MIN_TIME:
+            raise self.error_class(f"Time {t} is too small (minimum: {self.config.MIN_TIME})")
+
+        return self.transition_probabilities([t])[0]
+
+    def transition_probabilities(self, times: np.ndarray) -> np.ndarray:
+        """
+        Calculate the transition probability matrices of many times in one batch.
+
+        Times are quantized to 10 decimal places, and every matrix equals that
+        of `transition_probability` for the same time.
+
+        Args:
+            times: Evolutionary times, each at least MIN_TIME
+
+        Returns:
+            Array of shape (len(times), n, n) holding P(t) for every time
+        """
+        if not self._is_computed:
+            self.compute_model()
+
+        times = np.array([round(float(t), 10) for t in times])
+        if len(times) and (np.any(np.isnan(times)) or np.any(np.isinf(times))):
+            raise self.error_class(f"Invalid time values: {times[~np.isfinite(times)]}")
+        if np.any(times < self.config.MIN_TIME):
+            raise self.error_class(f"Times {times[times < self.config.MIN_TIME]} are too small "
+                                   f"(minimum: {self.config.MIN_TIME})")
+        if np.any(times > self.config.MAX_TIME):
+            warnings.warn(f"Large time values {times[times > self.config.MAX_TIME]} may cause numerical issues")
+
+        # P(t) = Y * exp(Λt) * Y^(-1), scaling the columns of Y instead of building diagonals
+        exp_lambda_t = np.exp(np.outer(times, self._eigenvalues))
+        P = np.matmul(self._Y[np.newaxis] * exp_lambda_t[:, np.newaxis, :], self._Y_inv)
+        self._validate_transition_matrix(P)
+        return P
+
+    def _validate_transition_matrix(self, P: np.ndarray) -> None:
+        """Validate a transition probability matrix, or a stack of them."""
+        # Check row sums
+        row_sums = P.sum(axis=-1)
+        if not np.allclose(row_sums, 1.0, atol=self.config.ZERO_TOLERANCE):
+            raise self.error_class(f"Transition matrix rows don't sum to 1.0: {row_sums}")
+
+        # Check bounds
+        if np.any(P < -self.config.ZERO_TOLERANCE) or np.any(P > 1.0 + self.config.ZERO_TOLERANCE):
+            raise self.error_class("Transition matrix contains invalid probabilities")
+
+    def validate_model_properties(self) -> Dict[str, bool]:
+        """
+        Validate all mathematical properties of the model.
+
+        Returns:
+            Dictionary of validation results
+        """
+        if not self._is_computed:
+            self.compute_model()
+
+        results = {}
+
+        # Test 1: Q row sums should be zero
+        results['q_row_sums'] = np.allclose(self._Q.sum(axis=1), 0, atol=self.config.ZERO_TOLERANCE)
+
+        # Test 2: Detailed balance
+        left = self._pi[:, None] * self._Q
+        right = left.T
+        results['detailed_balance'] = np.allclose(left, right, atol=self.config.BALANCE_TOLERANCE)
+
+        # Test 3: Eigenvalue structure
+        zero_evals = np.abs(self._eigenvalues) < self.config.ZERO_TOLERANCE
+        neg_evals = self._eigenvalues < -self.config.ZERO_TOLERANCE
+        results['eigenvalue_structure'] = (np.sum(zero_evals) == 1 and np.sum(neg_evals) == self.num_states - 1)
+
+        # Test 4: Eigenvector orthogonality
+        results['orthogonality'] = np.allclose(self._v_matrix.T @ self._v_matrix, np.eye(self.num_states),
+                                               atol=self.config.ZERO_TOLERANCE)
+
+        # Test 5: Stationarity
+        P_test = self.transition_probability(1.0)
+        results['stationarity'] = np.allclose(self._pi @ P_test, self._pi, atol=self.config.ZERO_TOLERANCE)
+
+        # Test 6: Comparison with matrix exponential
+        P_direct = expm(self._Q * 1.0)
+        results['expm_comparison'] = np.allclose(P_test, P_direct, atol=self.config.ZERO_TOLERANCE)
+
+        return results
+
+    @property
+    def rate_matrix(self) -> np.ndarray:
+        """Get the rate matrix Q."""
+        if not self._is_computed:
+            self.compute_model()
+        return self._Q.copy()
+
+    @property
+    def equilibrium_frequencies(self) -> np.ndarray:
+        """Get the normalised equilibrium frequencies."""
+        return (self._pi_data / self._pi_data.sum()).copy()
+
+    @property
+    def eigenvalues(self) -> np.ndarray:
+        """Get the eigenvalues of the rate matrix."""
+        if not self._is_computed:
+            self.compute_model()
+        return self._eigenvalues.copy()
+
+    def __repr__(self) -> str:
+        """String representation of the model."""
+        status = "computed" if self._is_computed else "not computed"
+        return f"{type(self).__name__}(status={status}, states={self.num_states})"
@@ -63,6 +63,13 @@ class SequenceNodeAsList:
             return EventSubTypes.DELETION_OF_INSERTED, cb_index, seq_length_with_block
 
     def calculate_event(self, event: IndelEvent):
+        if not self.blck_list:
+            # Everything was deleted: only an insertion at 0 is inside the sequence
+            if event.is_insertion and event.place == 0 and event.length > 0:
+                self.blck_list.append(Block(index_in_predecessor=0, copy_sites_count=0,
+                                            inserted_seq_count=event.length))
+                self.my_length += event.length
+            return
         event_type, cb_index, seq_length_with_block = self.find_event_sub_type(event)
         if event_type == EventSubTypes.OUT_OF_SEQUENCE:
             return
@@ -52,6 +52,13 @@ class SequenceNodeAsTree:
             return EventSubTypes.DELETION_OF_INSERTED, node_at_inx, position_in_block
 
     def calculate_event(self, event: IndelEvent):
+        if self.block_tree.root is None:
+            # Everything was deleted: only an insertion at 0 is inside the sequence
+            if event.is_insertion and event.place == 0 and event.length > 0:
+                self.block_tree = AVLTree(bl=Block(index_in_predecessor=-1, copy_sites_count=0,
+                                                   inserted_seq_count=event.length))
+                self.my_length += event.length
+            return
         event_type, avl_node, seq_length_with_block = self.find_event_sub_type(event)
         if event_type == EventSubTypes.OUT_OF_SEQUENCE:
             return
@@ -9,7 +9,7 @@ class SequenceNodeNaive:
     def __init__(self, seq_id: int, original_sequence: list[int]):
         self.id = seq_id
         self.seq: list[int] = original_sequence.copy()
-        self.max_count = max(original_sequence)
+        self.max_count = max(original_sequence, default=-1)
 
     def calculate_event(self, event: IndelEvent):
         if event.length < 0 or event.place > self.get_length():
@@ -1,3 +1,27 @@
+BUDGETS = ("max_sequence_length", "max_events_per_branch", "max_msa_length", "max_total_events")
+
+
+class SimulationBudgetExceeded(Exception):
+    """Raised as soon as a replicate exceeds one of the budgets of its configuration."""
+    budget: str
+    limit: int
+    value: int
+    node_id: int | None
+
+    def __init__(self, budget: str, limit: int, value: int, node_id: int | None = None):
+        self.budget = budget
+        self.limit = limit
+        self.value = value
+        self.node_id = node_id
+        where = f" on branch {node_id}" if node_id is not None else ""
+        super().__init__(f"{budget} of {limit} exceeded{where} (reached {value})")
+
+    def as_dict(self) -> dict:
+        """Structured description of the rejection, as reported in simulation results."""
+        return {"budget": self.budget, "limit": self.limit, "value": self.value, "node_id": self.node_id,
+                "reason": str(self)}
+
+
 class SimConfiguration:
     original_sequence_length: int
     indel_length_alpha: float
@@ -10,12 +34,25 @@ class SimConfiguration:
     enable_substitutions: bool
     substitution_rate: float = 1.0
     substitution_model: str = "jtt"
+    # Parameters of the substitution model, e.g. {"kappa": 4.0} for HKY
+    substitution_model_parameters: dict | None = None
     substitution_algorithm: str = "gillespie"
+    matrix_sampler: str = "dense"
+
+    # Budgets of a replicate, None means unlimited. A replicate exceeding any of
+    # them is rejected with SimulationBudgetExceeded during event generation.
+    max_sequence_length: int | None = None
+    max_events_per_branch: int | None = None
+    max_msa_length: int | None = None
+    max_total_events: int | None = None
 
     def __init__(self, original_sequence_length: int, indel_length_alpha: float, indel_truncated_length: int,
                  rate_ins: float, rate_del: float, deletion_extra_edge_length: int, seed: int,
                  enable_substitutions: bool = False, substitution_model: str = "jtt", 
-                 substitution_algorithm = "gillespie", substitution_rate: float = 1.0):
+                 substitution_algorithm = "gillespie", substitution_rate: float = 1.0,
+                 matrix_sampler: str = "dense", substitution_model_parameters: dict | None = None,
+                 max_sequence_length: int | None = None, max_events_per_branch: int | None = None,
+                 max_msa_length: int | None = None, max_total_events: int | None = None):
 
         self.rate_ins = rate_ins
         self.rate_del = rate_del
@@ -28,4 +65,11 @@ class SimConfiguration:
         self.substitution_rate = substitution_rate
         self.enable_substitutions = enable_substitutions
         self.substitution_model = substitution_model
+        self.substitution_model_parameters = substitution_model_parameters
         self.substitution_algorithm = substitution_algorithm
+        self.matrix_sampler = matrix_sampler
+
+        self.max_sequence_length = max_sequence_length
+        self.max_events_per_branch = max_events_per_branch
+        self.max_msa_length = max_msa_length
+        self.max_total_events = max_total_events
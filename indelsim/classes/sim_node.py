@@ -1,8 +1,9 @@
+import math
 import numpy as np
 import random as rnd
 
 from indelsim.classes.indel_event import IndelEvent
-from indelsim.classes.sim_config import SimConfiguration
+from indelsim.classes.sim_config import SimConfiguration, SimulationBudgetExceeded
 from indelsim.utils import calc_trunc_zipf
 
 
@@ -11,7 +12,8 @@ class SimulatedNode:
     branch_length: float
     list_of_events: list[IndelEvent]
 
-    def __init__(self, node_id: int, parent_id: int, number_of_children: int, branch_length: float, config: SimConfiguration, father_seq_length: int):
+    def __init__(self, node_id: int, parent_id: int, number_of_children: int, branch_length: float, config: SimConfiguration, father_seq_length: int,
+                 rng: np.random.Generator | None = None, events_before: int = 0):
 
         self.id = node_id
         self.parent_id = parent_id
@@ -22,9 +24,27 @@ class SimulatedNode:
         self.length_of_sequence_after_events = -1
         # rnd.seed(config.random_seed)
         # np.random.seed(config.random_seed)
-        self.list_of_events = self.create_events(config, father_seq_length)
+        self.list_of_events = self.create_events(config, father_seq_length, rng, events_before)
 
-    def create_events(self, config: SimConfiguration, father_seq_length: int) -> list[IndelEvent]:
+    def create_events(self, config: SimConfiguration, father_seq_length: int,
+                      rng: np.random.Generator | None = None, events_before: int = 0) -> list[IndelEvent]:
+        """
+        Sample the indel events of this branch.
+
+        Draws come from the global `random`/`numpy.random` state, unless a
+        dedicated generator `rng` is given for this branch. `events_before` is the
+        number of events already generated on other branches of the replicate;
+        it counts towards `config.max_total_events`.
+
+        Raises:
+            SimulationBudgetExceeded: as soon as the branch exceeds the maximum
+                sequence length, events per branch or total events of `config`
+        """
+        exponential = np.random.exponential if rng is None else rng.exponential
+        uniform = rnd.uniform if rng is None else rng.uniform
+        max_length = math.inf if config.max_sequence_length is None else config.max_sequence_length
+        max_events = math.inf if config.max_events_per_branch is None else config.max_events_per_branch
+        max_total_events = math.inf if config.max_total_events is None else config.max_total_events
         events: list[IndelEvent] = []
         current_time: float = 0
         current_running_length: int = father_seq_length
@@ -35,25 +55,34 @@ class SimulatedNode:
         self.hybrid_factor = self.branch_length * total_rate_across_entire_sequence
         while True:
             total_rate_across_entire_sequence = config.rate_ins * (current_running_length + 1) + config.rate_del * (current_running_length + config.deletion_extra_edge_length)
-            event_time = np.random.exponential(1.0/ total_rate_across_entire_sequence)
+            event_time = exponential(1.0/ total_rate_across_entire_sequence)
             current_time += event_time
             if current_time > self.branch_length:
                 break
             insertion_prob = config.rate_ins * (current_running_length + 1) / total_rate_across_entire_sequence
-            sampled_uniform = rnd.uniform(0, 1)
+            sampled_uniform = uniform(0, 1)
             is_insert = sampled_uniform < insertion_prob
             # print(is_insert, insertion_prob, sampled_uniform)
             if is_insert:
-                event: IndelEvent = insertion_event(config, current_running_length)
+                event: IndelEvent = insertion_event(config, current_running_length, rng)
                 events.append(event)
                 current_running_length += event.length
+                if current_running_length > max_length:
+                    raise SimulationBudgetExceeded("max_sequence_length", config.max_sequence_length,
+                                                   current_running_length, self.id)
             else:
-                event: IndelEvent | None = deletion_event(config, current_running_length)
+                event: IndelEvent | None = deletion_event(config, current_running_length, rng)
                 if event is not None:
                     events.append(event)
                     current_running_length -= event.length
                 if current_running_length < 0:
                     raise "Negative sequence length"
+            if len(events) > max_events:
+                raise SimulationBudgetExceeded("max_events_per_branch", config.max_events_per_branch,
+                                               len(events), self.id)
+            if events_before + len(events) > max_total_events:
+                raise SimulationBudgetExceeded("max_total_events", config.max_total_events,
+                                               events_before + len(events), self.id)
         self.length_of_sequence_after_events = current_running_length
         # print("length after events:", current_running_length)
 
@@ -66,15 +95,23 @@ class SimulatedNode:
 
 
 
-def insertion_event(config: SimConfiguration, current_running_length: int) -> IndelEvent:
-    place: int = rnd.randint(0, current_running_length)
-    insertion_size: int = calc_trunc_zipf(config.indel_length_alpha, config.indel_truncated_length)
+def insertion_event(config: SimConfiguration, current_running_length: int,
+                    rng: np.random.Generator | None = None) -> IndelEvent:
+    if rng is None:
+        place: int = rnd.randint(0, current_running_length)
+    else:
+        place: int = int(rng.integers(0, current_running_length + 1))
+    insertion_size: int = calc_trunc_zipf(config.indel_length_alpha, config.indel_truncated_length, rng)
     return IndelEvent(True, place, insertion_size)
 
-def deletion_event(config: SimConfiguration, current_running_length: int) -> IndelEvent | None:
+def deletion_event(config: SimConfiguration, current_running_length: int,
+                   rng: np.random.Generator | None = None) -> IndelEvent | None:
     start: int = -config.deletion_extra_edge_length
-    place: int = rnd.randint(start, current_running_length - 1)
-    deletion_size: int = calc_trunc_zipf(config.indel_length_alpha, config.indel_truncated_length)
+    if rng is None:
+        place: int = rnd.randint(start, current_running_length - 1)
+    else:
+        place: int = int(rng.integers(start, current_running_length))
+    deletion_size: int = calc_trunc_zipf(config.indel_length_alpha, config.indel_truncated_length, rng)
     if place + deletion_size > current_running_length:
         deletion_size = current_running_length - place
     if place + deletion_size > 0:
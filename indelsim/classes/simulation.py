@@ -3,15 +3,17 @@ import random as rnd
 from ete3 import Tree, TreeNode
 import numpy as np
 
-from indelsim.classes.sim_config import SimConfiguration
+from indelsim.classes.sim_config import SimConfiguration, SimulationBudgetExceeded
 from indelsim.classes.sim_node import SimulatedNode
 from indelsim.classes.super_sequence import SuperSequence
 from indelsim.classes.sequence import Sequence
 from indelsim.classes.msa import Msa
+from indelsim.classes.block import Block
 from indelsim.utils import calc_msa_from_naive_nodes
 from indelsim.classes.seq_node_as_list import SequenceNodeAsList
 from indelsim.classes.seq_node_as_tree import SequenceNodeAsTree
 from indelsim.classes.seq_node_naive import SequenceNodeNaive
+from indelsim.tracing import span
 
 class Simulation:
     tree: Tree
@@ -20,9 +22,22 @@ class Simulation:
     nodes_to_align: set[int]
     id_to_name: dict[int, str]
     msa: Msa | str
-
-    def __init__(self, input_tree: Path|str, config: SimConfiguration):
-        self.tree = Tree(input_tree)
+    node_blocks: dict[int, list[tuple[int, int, int]]] | None
+
+    def __init__(self, input_tree: Path|str|Tree, config: SimConfiguration, record_blocks: bool = False):
+        """
+        Parse the tree and generate the indel events of every branch.
+
+        With `record_blocks`, the block engines keep the block list of every node
+        in `node_blocks` as (index in parent, copied sites, inserted sites) tuples,
+        describing each sequence in terms of its parent's sequence.
+
+        Raises:
+            SimulationBudgetExceeded: if the replicate exceeds a budget of `config`.
+                Event generation stops right away, before any sequence is built.
+        """
+        # An already parsed tree can be passed to avoid re-parsing it for every replicate
+        self.tree = input_tree if isinstance(input_tree, Tree) else Tree(input_tree)
         self.config = config
         self.nodes_to_align = set()
         self.nodes_to_align.add(0)
@@ -30,9 +45,15 @@ class Simulation:
         self.sim_nodes = [None]
         node: TreeNode = None
         self.id_to_name = {}
+        self.node_blocks = {} if record_blocks else None
         rnd.seed(config.random_seed)
         np.random.seed(config.random_seed)
-
+        self.total_events = 0
+        # Blocks of all branches, counted by the block engines
+        self.total_blocks = None
+        if config.max_sequence_length is not None and config.original_sequence_length > config.max_sequence_length:
+            raise SimulationBudgetExceeded("max_sequence_length", config.max_sequence_length,
+                                           config.original_sequence_length, 0)
 
         for idx, node in enumerate(self.tree.traverse("preorder")):
             node.add_features(id=idx)  # Assigning an ID based on index
@@ -43,30 +64,51 @@ class Simulation:
             if node.is_leaf():
                 self.nodes_to_align.add(node.id)
 
-            simulatedNode = SimulatedNode(node.id, node.up.id, len(node.children), node.dist, self.config, node.up.sequence_length)
+            with span("branch events", "indel", node=node.id):
+                simulatedNode = SimulatedNode(node.id, node.up.id, len(node.children), node.dist, self.config,
+                                              node.up.sequence_length, events_before=self.total_events)
             node.add_features(sequence_length=simulatedNode.length_of_sequence_after_events)
+            self.total_events += len(simulatedNode.list_of_events)
+            # Every leaf sequence occupies its own columns, so a leaf longer than
+            # the budget already proves the MSA will be too long
+            if node.is_leaf():
+                self._check_msa_length(simulatedNode.length_of_sequence_after_events, node.id)
 
 
             self.sim_nodes.append(simulatedNode)
         self.number_of_nodes = idx
 
+    def _check_msa_length(self, msa_length: int, node_id: int | None = None) -> None:
+        if self.config.max_msa_length is not None and msa_length > self.config.max_msa_length:
+            raise SimulationBudgetExceeded("max_msa_length", self.config.max_msa_length, msa_length, node_id)
+
+    def _record_blocks(self, node_id: int, blocks: list[Block]) -> None:
+        if self.node_blocks is not None:
+            self.node_blocks[node_id] = [(block.index_in_predecessor, block.copy_sites_count, block.inserted_seq_count)
+                                         for block in blocks]
+
     def msa_from_blocklist(self):
         super_seq = SuperSequence(self.sim_nodes[1].length_of_sequence_before, len(self.nodes_to_align))
         parent_seq = Sequence(super_seq, True, 0, 3)
         parent_seq.init_root_seq()
         sequences = {0: parent_seq}
+        self.total_blocks = 0
 
         sequences_to_save = []
         for node in self.sim_nodes[1:]:
             # print("node id:", node.id)
-            node.seq_node_as_list = SequenceNodeAsList(node.id, node.length_of_sequence_before)
+            with span("block updates", "indel", node=node.id):
+                node.seq_node_as_list = SequenceNodeAsList(node.id, node.length_of_sequence_before)
 
-            for event in node.list_of_events:
-                node.seq_node_as_list.calculate_event(event)
+                for event in node.list_of_events:
+                    node.seq_node_as_list.calculate_event(event)
             # print("done with events!")
             current_seq = Sequence(super_seq, node.id in self.nodes_to_align, node.id, node.number_of_children)
             blocks = node.seq_node_as_list.blocks_iterator()
-            current_seq.generate_sequence(blocks, sequences[node.parent_id])
+            self._record_blocks(node.id, blocks)
+            self.total_blocks += len(blocks)
+            with span("generate sequence", "indel", node=node.id):
+                current_seq.generate_sequence(blocks, sequences[node.parent_id])
 
             sequences[node.parent_id]._number_of_children -= 1
             if sequences[node.parent_id]._number_of_children == 0:
@@ -77,6 +119,7 @@ class Simulation:
                 continue
             sequences[node.id] = current_seq
 
+        self._check_msa_length(super_seq.get_msa_length())
         self.msa = Msa(super_seq)
         self.msa._id_to_name = self.id_to_name
         self.msa._sequences_to_save = sequences_to_save
@@ -87,16 +130,21 @@ class Simulation:
         parent_seq = Sequence(super_seq, True, 0, 2)
         parent_seq.init_root_seq()
         sequences = {0: parent_seq}
+        self.total_blocks = 0
 
         sequences_to_save = []
         for node in self.sim_nodes[1:]:
-            seq_node_as_list = SequenceNodeAsTree(node.id, node.length_of_sequence_before)
-            for event in node.list_of_events:
-                seq_node_as_list.calculate_event(event)
+            with span("block updates", "indel", node=node.id):
+                seq_node_as_list = SequenceNodeAsTree(node.id, node.length_of_sequence_before)
+                for event in node.list_of_events:
+                    seq_node_as_list.calculate_event(event)
 
             current_seq = Sequence(super_seq, node.id in self.nodes_to_align, node.id, node.number_of_children)
             blocks = seq_node_as_list.blocks_iterator()
-            current_seq.generate_sequence(blocks, sequences[node.parent_id])
+            self._record_blocks(node.id, blocks)
+            self.total_blocks += len(blocks)
+            with span("generate sequence", "indel", node=node.id):
+                current_seq.generate_sequence(blocks, sequences[node.parent_id])
 
             sequences[node.parent_id]._number_of_children -= 1
             if sequences[node.parent_id]._number_of_children == 0:
@@ -107,6 +155,7 @@ class Simulation:
                 continue
             sequences[node.id] = current_seq
 
+        self._check_msa_length(super_seq.get_msa_length())
         self.msa = Msa(super_seq)
         self.msa._id_to_name = self.id_to_name
         self.msa._sequences_to_save = sequences_to_save
@@ -122,10 +171,11 @@ class Simulation:
         ids_to_save = []
         parent_ids_to_save = [-1]
         for node in self.sim_nodes[1:]:
-            node.seq_node_naive = SequenceNodeNaive(node.id, sequences[node.parent_id])
-        
-            for event in node.list_of_events:
-                node.seq_node_naive.calculate_event(event)
+            with span("naive updates", "indel", node=node.id):
+                node.seq_node_naive = SequenceNodeNaive(node.id, sequences[node.parent_id])
+
+                for event in node.list_of_events:
+                    node.seq_node_naive.calculate_event(event)
             current_seq = node.seq_node_naive.seq
             sequences.append(current_seq)
 
@@ -133,8 +183,10 @@ class Simulation:
             ids_to_save.append(node.id)
             parent_ids_to_save.append(node.parent_id)
 
-        msa: list[list[int]] = calc_msa_from_naive_nodes(sequences, parent_ids_to_save)
+        with span("naive alignment", "indel"):
+            msa: list[list[int]] = calc_msa_from_naive_nodes(sequences, parent_ids_to_save)
         msa = {idx:seq for idx,seq in enumerate(msa) if idx in (self.nodes_to_align - {0})}
+        self._check_msa_length(len(next(iter(msa.values()), [])))
         # Create MSA object instead of string
         self.msa = Msa()  # Use alternative constructor
         self.msa._aligned_sequences = msa
@@ -2,108 +2,336 @@
 """
 Implements both a Gillespie-style CTMC sampler (`evolve_branch_substitutions_gillespie`)
 and a matrix-exponential sampler (`evolve_branch_substitutions_jtt`)
-under the JTT model.
+under a reversible substitution model (JTT by default, see `indelsim.classes.models`).
 """
 
 from __future__ import annotations
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional
 
 
 import numpy as np
+from ete3 import Tree, TreeNode
 from indelsim.classes.jtt import get_jtt_model
+from indelsim.classes.reversible_model import ReversibleModel
 from indelsim.enums import amino_acid_to_index, index_to_amino_acid
+from indelsim.tracing import span
 
 # Constants for validation
 MAX_BRANCH_LENGTH = 1000.0
 MIN_SUBSTITUTION_RATE = 1e-10
 
+MATRIX_SAMPLERS = ("dense", "sparse", "auto")
+# With "auto", branches on which at most this share of sites is expected to
+# change use the sparse sampler (both samplers cost the same at about 0.5)
+SPARSE_CHANGE_THRESHOLD = 0.4
+
+
+def _sample_rows(cumprob: np.ndarray, states: np.ndarray, u: np.ndarray,
+                 out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Draw the next state of every site by inverting the CDF row of its current state.
+
+    Sites are grouped by state (a stable sort of small integers is a linear radix
+    sort) and each group is resolved with one searchsorted on its row. `states`
+    is only read before the first write, so `out` may be `states` itself.
+    """
+    num_states = len(cumprob)
+    order = np.argsort(states, kind='stable')
+    bounds = np.concatenate(([0], np.cumsum(np.bincount(states, minlength=num_states))))
+    drawn = out if out is not None else np.empty(len(states), dtype=np.uint8)
+    for aa in range(num_states):
+        sites = order[bounds[aa]:bounds[aa + 1]]
+        if len(sites):
+            drawn[sites] = cumprob[aa].searchsorted(u[sites], side='right')
+    # A row summing to slightly less than 1 must not map u past the last residue
+    np.minimum(drawn, num_states - 1, out=drawn)
+    return drawn
+
+
+class _BufferPool:
+    """Free list of uint8 sequence buffers of one length."""
+
+    def __init__(self, length: int):
+        self.length = length
+        self._free: List[np.ndarray] = []
+
+    def acquire(self) -> np.ndarray:
+        return self._free.pop() if self._free else np.empty(self.length, dtype=np.uint8)
+
+    def release(self, buffer: np.ndarray) -> None:
+        self._free.append(buffer)
+
+
+class _Packed2Bit:
+    """A sequence over at most 4 states stored with 2 bits per site, four sites per byte."""
+    __slots__ = ("data", "length")
+
+    def __init__(self, sequence: np.ndarray):
+        self.length = len(sequence)
+        whole = self.length // 4
+        quads = sequence[:whole * 4].reshape(whole, 4)
+        self.data = np.empty(-(-self.length // 4), dtype=np.uint8)
+        data = self.data[:whole]
+        np.left_shift(quads[:, 0], 6, out=data)
+        for column, shift in ((1, 4), (2, 2), (3, 0)):
+            data |= quads[:, column] << shift
+        if whole < len(self.data):
+            self.data[whole] = sum(int(site) << (6 - 2 * k) for k, site in enumerate(sequence[whole * 4:]))
+
+    def unpack(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Return the uint8 sequence, written into `out` if given."""
+        if out is None:
+            out = np.empty(self.length, dtype=np.uint8)
+        whole = self.length // 4
+        sites = out[:whole * 4].reshape(whole, 4)
+        for column, shift in ((0, 6), (1, 4), (2, 2), (3, 0)):
+            np.right_shift(self.data[:whole], shift, out=sites[:, column])
+            sites[:, column] &= 3
+        for k in range(self.length - whole * 4):
+            out[whole * 4 + k] = (self.data[whole] >> (6 - 2 * k)) & 3
+        return out
+
+class _SumTree:
+    """
+    Binary sum tree over per-site rates: O(log L) updates and proportional sampling.
+
+    Leaves hold the rates of the sites, padded with zeros to a power of two, and
+    every internal node holds the sum of its two children, so the root is the
+    total rate. Parents are recomputed from their children on every update,
+    which keeps the sums free of accumulated rounding drift.
+    """
+
+    def __init__(self, rates: np.ndarray):
+        self.size = 1 << max(0, int(len(rates) - 1).bit_length())
+        self.length = len(rates)
+        self.tree = np.zeros(2 * self.size)
+        self.tree[self.size:self.size + len(rates)] = rates
+        level = self.size
+        while level > 1:
+            self.tree[level // 2:level] = self.tree[level:2 * level:2] + self.tree[level + 1:2 * level:2]
+            level //= 2
+
+    @property
+    def total(self) -> float:
+        return self.tree[1]
+
+    def update(self, site: int, rate: float) -> None:
+        tree = self.tree
+        node = site + self.size
+        tree[node] = rate
+        node >>= 1
+        while node:
+            tree[node] = tree[2 * node] + tree[2 * node + 1]
+            node >>= 1
+
+    def find(self, x: float) -> int:
+        """Return the first site whose cumulative rate exceeds `x` (0 <= x < total)."""
+        tree = self.tree
+        node = 1
+        while node < self.size:
+            left = 2 * node
+            if x < tree[left]:
+                node = left
+            else:
+                x -= tree[left]
+                node = left + 1
+        # Rounding can only push `x` past the last site, never into it
+        return min(node - self.size, self.length - 1)
+
+
+class TransitionCache:
+    """
+    Transition matrices of all branches of one tree, computed together.
+
+    The distinct branch lengths of the tree are collected once. For a
+    substitution rate, the P(t) matrices of all of them and their row-cumulative
+    forms (used by the dense sampler) are computed in one batched product over
+    the eigendecomposition of the model. They are kept per rate, for the last
+    MAX_RATES rates used, so replicates of a run and sweeps alternating between
+    rates only look their matrices up.
+    Matrices equal those of `ReversibleModel.transition_probability`.
+    """
+
+    MAX_RATES = 8
+
+    def __init__(self, tree: Tree, model: Optional[ReversibleModel] = None):
+        self.model = model if model is not None else get_jtt_model()
+        self.branch_lengths = tuple(node.dist for node in tree.traverse("preorder"))
+        self._lengths = sorted({float(dist) for dist in self.branch_lengths if dist > 0})
+        # Rate -> (index of every branch length, P(t) stack, cumulative P(t) stack)
+        self._compiled: Dict[float, tuple[Dict[float, int], np.ndarray, np.ndarray]] = {}
+
+    @classmethod
+    def for_tree(cls, tree: Tree, model: Optional[ReversibleModel] = None) -> "TransitionCache":
+        """Return the cache stored on `tree`, building it if missing or if the model or branch lengths changed."""
+        model = model if model is not None else get_jtt_model()
+        cache = getattr(tree, "transition_cache", None)
+        if (cache is None or cache.model is not model
+                or cache.branch_lengths != tuple(node.dist for node in tree.traverse("preorder"))):
+            cache = cls(tree, model)
+            tree.transition_cache = cache
+        return cache
+
+    def _compile(self, rate: float) -> tuple[Dict[float, int], np.ndarray, np.ndarray]:
+        lengths = [length for length in self._lengths if length * rate >= self.model.config.MIN_TIME]
+        P = self.model.transition_probabilities(np.array(lengths) * rate)
+        if len(self._compiled) >= self.MAX_RATES:
+            # Dictionaries keep insertion order: drop the least recently used rate
+            del self._compiled[next(iter(self._compiled))]
+        compiled = {length: i for i, length in enumerate(lengths)}, P, np.cumsum(P, axis=2)
+        self._compiled[rate] = compiled
+        return compiled
+
+    def lookup(self, branch_length: float, rate: float) -> Optional[tuple[np.ndarray, np.ndarray]]:
+        """Return (P(t), its row-cumulative form) of a branch, or None if it is not in the tree."""
+        compiled = self._compiled.pop(rate, None)
+        if compiled is None:
+            compiled = self._compile(rate)
+        else:
+            self._compiled[rate] = compiled
+        index, P, cumprob = compiled
+        i = index.get(branch_length)
+        if i is None:
+            return None
+        return P[i], cumprob[i]
+
+
+def sample_root_sequence(length: int, seed: Optional[int] = None,
+                         model: Optional[ReversibleModel] = None) -> np.ndarray:
+    """Sample a root sequence of `length` residues from the equilibrium frequencies of `model` (JTT by default)."""
+    model = model if model is not None else get_jtt_model()
+    rng = np.random.default_rng(seed)
+    return rng.choice(model.num_states, size=length, p=model.equilibrium_frequencies).astype(np.uint8)
+
+
 class SubstitutionEvolver:
     """
-    Evolves amino-acid sequences along a branch under the JTT model.
+    Evolves sequences along a branch under a reversible substitution model.
     
     Parameters
     ----------
     substitution_rate
-        Scalar multiplier applied to JTT's normalised rate matrix.
+        Scalar multiplier applied to the model's normalised rate matrix.
     seed
         If given, a NumPy PCG64 RNG is created with this seed;
         otherwise a fresh unpredictable RNG is used.
+    matrix_sampler
+        How the matrix algorithm samples a branch: "dense" redraws every site,
+        "sparse" only draws the sites that change, "auto" picks per branch.
+    model
+        Substitution model (see `indelsim.classes.models.get_model`), JTT if None.
+        Ancestral sequences of models with at most 4 states (DNA) are kept
+        2-bit packed while `evolve_tree` holds them across a subtree.
     """
     
-    def __init__(self, substitution_rate: float = 1.0, seed: Optional[int] = None):
+    def __init__(self, substitution_rate: float = 1.0, seed: Optional[int] = None,
+                 matrix_sampler: str = "dense", model: Optional[ReversibleModel] = None):
         if substitution_rate < MIN_SUBSTITUTION_RATE:
             raise ValueError(f"substitution_rate must be >= {MIN_SUBSTITUTION_RATE}")
+        if matrix_sampler not in MATRIX_SAMPLERS:
+            raise ValueError(f"matrix_sampler must be one of {MATRIX_SAMPLERS}")
             
         self.substitution_rate = float(substitution_rate)
-        self.jtt_model = get_jtt_model()
+        self.matrix_sampler = matrix_sampler
+        self.model = model if model is not None else get_jtt_model()
+        self.transition_cache: Optional[TransitionCache] = None
+        self._uniform_buffer = np.empty(0)
+
+        # Jump chain of the Gillespie sampler: row a holds the cumulative
+        # distribution of the new residue given that residue a is left.
+        # Scaling Q by the substitution rate does not change it.
+        jumps = self.model.rate_matrix.copy()
+        np.fill_diagonal(jumps, 0.0)
+        self._jump_cdf = np.cumsum(jumps, axis=1)
+        self._jump_cdf /= self._jump_cdf[:, -1:]
 
         if seed is not None:
             self.rng = np.random.default_rng(seed)
         else:
             self.rng = np.random.default_rng()
     
+    def _transition(self, branch_length: float) -> tuple[np.ndarray, np.ndarray]:
+        """Return P(t) of a branch and its row-cumulative form, from the tree's cache when possible."""
+        if self.transition_cache is not None:
+            cached = self.transition_cache.lookup(branch_length, self.substitution_rate)
+            if cached is not None:
+                return cached
+        P_t = self.model.transition_probabilities([branch_length * self.substitution_rate])[0]
+        return P_t, np.cumsum(P_t, axis=1)
+
+    def _uniforms(self, size: int) -> np.ndarray:
+        """Draw `size` uniforms into a reused buffer; valid until the next call."""
+        if len(self._uniform_buffer) < size:
+            self._uniform_buffer = np.empty(size)
+        return self.rng.random(out=self._uniform_buffer[:size])
+
     def evolve_branch_substitutions_gillespie(
         self,
         sequence: List[int],
-        branch_length: float
+        branch_length: float,
+        out: Optional[np.ndarray] = None
     ) -> np.ndarray:
         """
         Simulate substitutions along a branch with the Gillespie algorithm.
 
+        Exit rates are kept in a sum tree, so each substitution costs O(log L)
+        for choosing its site and O(log n) for choosing its new residue.
+
         Parameters
         ----------
         sequence
-            List of length L with integer amino-acid codes 0-19.
+            List of length L with integer residue codes 0 to n-1.
         branch_length
             Time units for this branch (must be non-negative).
+        out
+            Optional uint8 buffer of length L receiving the result; may be
+            `sequence` itself to evolve it in place.
 
         Returns
         -------
         list[int]
-            New list (length L) after substitutions.
+            New list (length L) after substitutions, or `out`.
         """
         self._validate_inputs(sequence, branch_length)
 
-        Q: np.ndarray = self.jtt_model.rate_matrix * self.substitution_rate
-        L: int = len(sequence)
-        seq: list[int] = sequence.copy()
+        if out is None:
+            seq: list[int] = sequence.copy()
+        else:
+            seq = out
+            if out is not sequence:
+                out[:] = sequence
 
         # Pre-compute exit rates λ_i = −Q_ii
-        exit_rates = -Q[seq, seq]
-        total_rate: float = exit_rates.sum()
+        residue_exit_rates = -np.diag(self.model.rate_matrix) * self.substitution_rate
+        exit_rates = _SumTree(residue_exit_rates[seq])
+        jump_cdf = self._jump_cdf
 
         t: float = 0.0
         rng = self.rng
 
-        while t < branch_length and total_rate > 0.0:
+        while t < branch_length and exit_rates.total > 0.0:
             # 1. waiting time to next event
-            t += rng.exponential(1.0 / total_rate)
+            t += rng.exponential(1.0 / exit_rates.total)
             if t >= branch_length:
                 break
 
             # 2. choose site, proportional to exit rate
-            site = rng.choice(L, p=exit_rates / total_rate)
+            site = exit_rates.find(rng.random() * exit_rates.total)
 
-            old_aa = seq[site]
-
-            # 3. draw target residue conditional on leaving old_aa
-            probs = Q[old_aa].copy()
-            probs[old_aa] = 0.0
-            probs /= exit_rates[site]          # normalise row
-            new_aa = rng.choice(20, p=probs)
+            # 3. draw target residue conditional on leaving the old one
+            new_aa = int(jump_cdf[seq[site]].searchsorted(rng.random(), side='right'))
 
             # 4. update sequence and rates
             seq[site] = new_aa
-            new_exit = -Q[new_aa, new_aa]
-            total_rate += new_exit - exit_rates[site]
-            exit_rates[site] = new_exit
+            exit_rates.update(site, residue_exit_rates[new_aa])
 
         return seq
     
     def evolve_branch_substitutions_jtt(
         self,
         sequence: np.ndarray,
-        branch_length: float
+        branch_length: float,
+        out: Optional[np.ndarray] = None
     ) -> np.ndarray:
         """
         Simulate substitutions via pre-computed transition matrix exp(Q t).
@@ -111,19 +339,215 @@ class SubstitutionEvolver:
         Faster for long sequences / many sites, but incurs one matrix
         exponential per distinct branch length.
 
-        Returns a fresh list with evolved residues.
+        Returns a fresh array with evolved residues, or writes them into `out`,
+        which may be `sequence` itself.
         """
 
         # self._validate_inputs(sequence, branch_length)
 
-        eff_time = branch_length * self.substitution_rate
-        P_t: np.ndarray = self.jtt_model.transition_probability(eff_time)
-        probs = P_t[sequence]          # shape (L, 20)
-        cumprob = np.cumsum(probs, axis=1)
-        u = self.rng.random((len(sequence), 1))
-        evolved = np.argmax(u < cumprob, axis=1).astype(np.uint8)
+        P_t, cumprob = self._transition(branch_length)          # shape (n, n) each
+        u = self._uniforms(len(sequence))
+        return _sample_rows(cumprob, np.asarray(sequence, dtype=np.uint8), u, out)
+
+    def evolve_branch_substitutions_sparse(
+        self,
+        sequence: np.ndarray,
+        branch_length: float,
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Sample the same distribution as `evolve_branch_substitutions_jtt`, drawing only the sites that change.
+
+        A site in residue a changes with probability c_a = 1 - P_aa(t). Candidate
+        sites are picked uniformly with the largest of these probabilities, c_max,
+        and a candidate in residue a is kept with probability c_a / c_max, which
+        thins the candidates to exactly the changing sites. Kept sites draw their
+        new residue from the off-diagonal part of their P(t) row. The work beyond
+        copying is proportional to c_max * L.
+
+        Without `out` the parent array is never modified. When no site changes it
+        is returned as is (copy-on-write), so callers must not modify evolved
+        sequences in place. With `out` (which may be `sequence` itself) the
+        result is always written there.
+        """
+        P_t, _ = self._transition(branch_length)
+        sequence = np.asarray(sequence, dtype=np.uint8)
+        if out is not None and out is not sequence:
+            out[:] = sequence
+            sequence = out
+        change = 1.0 - np.diag(P_t)
+        max_change = change.max()
+        if len(sequence) == 0 or max_change <= 0.0:
+            return sequence
+
+        rng = self.rng
+        candidates = rng.choice(len(sequence), size=rng.binomial(len(sequence), max_change), replace=False)
+        residues = sequence[candidates]
+        kept = rng.random(len(candidates)) * max_change < change[residues]
+        sites, residues = candidates[kept], residues[kept]
+        if len(sites) == 0:
+            return sequence
+
+        off_diagonal = P_t.copy()
+        np.fill_diagonal(off_diagonal, 0.0)
+        cumprob = np.cumsum(off_diagonal, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # Rows of residues that never change are never used
+            cumprob /= cumprob[:, -1:]
+
+        evolved = sequence if out is not None else sequence.copy()
+        evolved[sites] = _sample_rows(cumprob, residues, rng.random(len(sites)))
         return evolved
+
+    def evolve_branch_substitutions_matrix(
+        self,
+        sequence: np.ndarray,
+        branch_length: float,
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Evolve a branch with the matrix algorithm, using the configured `matrix_sampler`."""
+        sampler = self.matrix_sampler
+        if sampler == "auto":
+            stay = np.diag(self._transition(branch_length)[0])
+            sampler = "sparse" if 1.0 - stay.min() <= SPARSE_CHANGE_THRESHOLD else "dense"
+        if sampler == "sparse":
+            return self.evolve_branch_substitutions_sparse(sequence, branch_length, out)
+        return self.evolve_branch_substitutions_jtt(sequence, branch_length, out)
     
+    def _evolve_branch(self, sequence: np.ndarray, branch_length: float, algorithm: str,
+                       out: Optional[np.ndarray] = None) -> np.ndarray:
+        if algorithm == "gillespie":
+            return self.evolve_branch_substitutions_gillespie(sequence, branch_length, out)
+        return self.evolve_branch_substitutions_matrix(sequence, branch_length, out)
+
+    def evolve_branch_with_blocks(
+        self,
+        parent_sequence: np.ndarray,
+        blocks: List[tuple[int, int, int]],
+        branch_length: float,
+        algorithm: str = "matrix"
+    ) -> np.ndarray:
+        """
+        Evolve only the sites a child inherits from its parent and add its inserted sites.
+
+        `blocks` describe the child in terms of its parent, as (index in parent,
+        copied sites, inserted sites) tuples of the indel phase. Copied sites
+        evolve over the whole branch; inserted sites are drawn from the
+        equilibrium frequencies, which is where a site that appeared anywhere on
+        the branch ends up under a stationary model.
+        """
+        copied_parts = []
+        number_inserted = 0
+        for index, copied, inserted in blocks:
+            if copied > 0 and index >= 0:
+                copied_parts.append(parent_sequence[index:index + copied])
+            number_inserted += inserted
+        copied_sequence = np.concatenate(copied_parts) if copied_parts else np.empty(0, dtype=np.uint8)
+        if len(copied_sequence):
+            copied_sequence = self._evolve_branch(copied_sequence, branch_length, algorithm)
+        inserted_sequence = self.rng.choice(self.model.num_states, size=number_inserted,
+                                            p=self.model.equilibrium_frequencies).astype(np.uint8)
+
+        child = np.empty(len(copied_sequence) + number_inserted, dtype=np.uint8)
+        child_pos = copied_pos = inserted_pos = 0
+        for index, copied, inserted in blocks:
+            if copied > 0 and index >= 0:
+                child[child_pos:child_pos + copied] = copied_sequence[copied_pos:copied_pos + copied]
+                child_pos += copied
+                copied_pos += copied
+            child[child_pos:child_pos + inserted] = inserted_sequence[inserted_pos:inserted_pos + inserted]
+            child_pos += inserted
+            inserted_pos += inserted
+        return child
+
+    def evolve_tree(
+        self,
+        tree: Tree,
+        root_sequence: np.ndarray,
+        algorithm: str = "matrix",
+        node_blocks: Optional[Dict[int, List[tuple[int, int, int]]]] = None,
+        recycle_buffers: bool = False
+    ) -> Iterator[tuple[int, TreeNode, np.ndarray]]:
+        """
+        Evolve `root_sequence` down `tree` in preorder and yield every leaf.
+
+        Yields tuples of (preorder index, leaf node, evolved sequence). Sequences of
+        internal nodes are dropped as soon as their last child has been evolved,
+        and leaf sequences are not attached to the tree, so a parsed tree can be
+        reused across replicates without accumulating arrays. With the sparse
+        matrix sampler a yielded sequence may be shared with other nodes, so it
+        must not be modified in place.
+
+        Without `node_blocks` every node evolves a sequence as long as
+        `root_sequence`, e.g. the whole MSA. With the block lists of the indel
+        phase (see `Simulation(record_blocks=True)`), keyed by preorder index,
+        `root_sequence` is the real root sequence and every node only evolves the
+        sites it actually has (see `evolve_branch_with_blocks`).
+
+        The matrix algorithm takes its transition matrices from the tree's
+        `TransitionCache`, which is built on first use and kept on the tree.
+        For models with at most 4 states, a parent waiting for its other
+        children while the subtree of one of them is evolved is held 2-bit
+        packed, and unpacked once when the traversal returns to it. Only the
+        sequences of the current branch are kept as uint8.
+
+        With `recycle_buffers`, sequences live in a pool of uint8 buffers: the
+        last child of a node evolves in place in its parent's buffer, the other
+        children take a buffer from the pool, and leaf buffers return to it
+        once the generator resumes. No array is allocated per branch and at
+        most one buffer per node of the traversal frontier is alive. A yielded
+        leaf sequence is then only valid until the next leaf is requested.
+        Buffers are not recycled with `node_blocks`, whose sequence lengths
+        differ per node.
+        """
+        if algorithm != "gillespie":
+            self.transition_cache = TransitionCache.for_tree(tree, self.model)
+        packed = self.model.num_states <= 4
+        pool = None
+        if recycle_buffers and node_blocks is None:
+            pool = _BufferPool(len(root_sequence))
+        for idx, node in enumerate(tree.traverse("preorder")):
+            node.references = len(node.children)
+            if node.is_root():
+                if pool is not None:
+                    # The caller's array must not be evolved in place
+                    node.sequence = pool.acquire()
+                    node.sequence[:] = root_sequence
+                else:
+                    node.sequence = root_sequence
+                continue
+
+            parent = node.up
+            with span("substitute branch", "substitution", node=idx):
+                if isinstance(parent.sequence, _Packed2Bit):
+                    # Back from the subtree of a sibling: unpack once for all remaining children
+                    parent.sequence = parent.sequence.unpack(pool.acquire() if pool is not None else None)
+                parent_sequence = parent.sequence
+                if node_blocks is not None:
+                    evolved_sequence = self.evolve_branch_with_blocks(parent_sequence, node_blocks[idx], node.dist,
+                                                                      algorithm)
+                elif pool is not None:
+                    # The last child takes over its parent's buffer
+                    out = parent_sequence if parent.references == 1 else pool.acquire()
+                    evolved_sequence = self._evolve_branch(parent_sequence, node.dist, algorithm, out)
+                else:
+                    evolved_sequence = self._evolve_branch(parent_sequence, node.dist, algorithm)
+
+            if node.is_leaf():
+                yield idx, node, evolved_sequence
+                if pool is not None:
+                    pool.release(evolved_sequence)
+            else:
+                node.sequence = evolved_sequence
+            parent.references -= 1
+            if parent.references == 0:
+                del parent.sequence
+            elif packed and not node.is_leaf():
+                # The parent waits for its other children while the subtree of `node` is evolved
+                parent.sequence = _Packed2Bit(parent_sequence)
+                if pool is not None:
+                    pool.release(parent_sequence)
+
     def evolve_sequence_chars(self, sequence_chars: List[str], branch_length: float) -> List[str]:
         """Same as gillespie method, but with ACDE.. chars"""
         indices = [amino_acid_to_index(aa) for aa in sequence_chars]
@@ -0,0 +1,225 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from ete3 import Tree, TreeNode
+
+from indelsim.classes.block import Block
+from indelsim.classes.msa import Msa
+from indelsim.classes.seq_node_as_list import SequenceNodeAsList
+from indelsim.classes.seq_node_as_tree import SequenceNodeAsTree
+from indelsim.classes.sequence import Sequence
+from indelsim.classes.sim_config import SimConfiguration, SimulationBudgetExceeded
+from indelsim.classes.sim_node import SimulatedNode
+from indelsim.classes.super_sequence import SuperSequence
+from indelsim.enums import SimulationTypes
+from indelsim.utils import branch_rng
+
+BlockTuple = tuple[int, int, int]
+# Sequence length, blocks and number of events of a simulated branch
+Branch = tuple[int, list[BlockTuple], int]
+
+_ENGINES = {
+    SimulationTypes.BLOCK_LIST: SequenceNodeAsList,
+    SimulationTypes.BLOCK_TREE: SequenceNodeAsTree,
+}
+
+# Preorder nodes of the tree parsed once by every worker process, so that a
+# worker parses the tree only once however many subtrees it simulates.
+_WORKER_NODES: list[TreeNode] = []
+
+
+def _init_worker(newick: str) -> None:
+    _WORKER_NODES[:] = Tree(newick, format=1).traverse("preorder")
+    for idx, node in enumerate(_WORKER_NODES):
+        node.add_features(id=idx)
+
+
+def _simulate_branch(node_id: int, parent_id: int, number_of_children: int, branch_length: float,
+                     parent_length: int, config: SimConfiguration, sim_type: SimulationTypes,
+                     events_before: int) -> Branch:
+    """
+    Generate the events of one branch from its own RNG stream and reduce them to blocks.
+
+    `events_before` is the number of events known to precede the branch; it counts
+    towards `config.max_total_events`.
+    """
+    sim_node = SimulatedNode(node_id, parent_id, number_of_children, branch_length, config, parent_length,
+                             rng=branch_rng(config.random_seed, node_id), events_before=events_before)
+    seq_node = _ENGINES[sim_type](node_id, parent_length)
+    for event in sim_node.list_of_events:
+        seq_node.calculate_event(event)
+    blocks = [(block.index_in_predecessor, block.copy_sites_count, block.inserted_seq_count)
+              for block in seq_node.blocks_iterator()]
+    return sim_node.length_of_sequence_after_events, blocks, len(sim_node.list_of_events)
+
+
+def _simulate_subtree(subtree_root: TreeNode, parent_length: int, config: SimConfiguration,
+                      sim_type: SimulationTypes, events_before: int) -> dict[int, Branch]:
+    """
+    Simulate every branch of the subtree rooted at `subtree_root`, including its own branch.
+
+    Only the length of the parent sequence is needed to start, since the blocks of
+    a branch refer to positions of the parent sequence and never to its content.
+    The events of the subtree are added to `events_before` as they are generated.
+    """
+    lengths = {subtree_root.up.id: parent_length}
+    branches = {}
+    for node in subtree_root.traverse("preorder"):
+        branch = _simulate_branch(node.id, node.up.id, len(node.children), node.dist, lengths[node.up.id],
+                                  config, sim_type, events_before)
+        lengths[node.id] = branch[0]
+        branches[node.id] = branch
+        events_before += branch[2]
+    return branches
+
+
+def _simulate_subtree_in_worker(subtree_root_id: int, parent_length: int, config: SimConfiguration,
+                                sim_type: SimulationTypes, events_before: int) -> dict[int, Branch]:
+    """Worker entry point: resolve the subtree root by its preorder id and simulate it."""
+    return _simulate_subtree(_WORKER_NODES[subtree_root_id], parent_length, config, sim_type, events_before)
+
+
+class SubtreeScheduler:
+    """
+    Simulates a single replicate of a large tree by splitting it into independent subtrees.
+
+    Branches above `split_depth` are simulated in this process. Every node at depth
+    `split_depth` roots a subtree that is handed to a worker process together with
+    the length of its parent's sequence; the workers return the block lists of their
+    branches, which are finally stitched into one global super sequence in preorder.
+    Each branch draws its events from its own RNG stream (`branch_rng`), so the
+    resulting MSA depends neither on the number of workers nor on `split_depth`.
+
+    All budgets of the configuration are enforced, and whether a replicate is
+    rejected does not depend on the workers either. A worker counts the events
+    of its subtree on top of those above the split depth and stops as soon as
+    they exceed `max_total_events`; the events of sibling subtrees are added
+    up here as the workers finish.
+    """
+    tree: Tree
+    config: SimConfiguration
+    sim_type: SimulationTypes
+    split_depth: int
+    workers: int
+    id_to_name: dict[int, str]
+    total_events: int
+    msa: Msa
+
+    def __init__(self, input_tree: Path | str | Tree, config: SimConfiguration,
+                 sim_type: SimulationTypes = SimulationTypes.BLOCK_TREE, split_depth: int = 2, workers: int = 1):
+        if sim_type not in _ENGINES:
+            raise ValueError(f"Subtree scheduling requires a block engine, got {sim_type}")
+        if split_depth < 1:
+            raise ValueError("split_depth must be at least 1")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+
+        # An already parsed tree can be passed to avoid re-parsing it for every replicate
+        self.tree = input_tree if isinstance(input_tree, Tree) else Tree(str(input_tree))
+        self.config = config
+        self.sim_type = sim_type
+        self.split_depth = split_depth
+        self.workers = workers
+        self.id_to_name = {}
+        self.total_events = 0
+
+        self._nodes: list[TreeNode] = list(self.tree.traverse("preorder"))
+        self._depths: list[int] = []
+        for idx, node in enumerate(self._nodes):
+            node.add_features(id=idx)
+            self.id_to_name[idx] = node.name if node.name != "" else f"N{idx+1}"
+            self._depths.append(0 if node.up is None else self._depths[node.up.id] + 1)
+
+    def _simulate_top(self) -> tuple[dict[int, Branch], list[int]]:
+        """Simulate the branches above the split depth and collect the subtree roots."""
+        config = self.config
+        if config.max_sequence_length is not None and config.original_sequence_length > config.max_sequence_length:
+            raise SimulationBudgetExceeded("max_sequence_length", config.max_sequence_length,
+                                           config.original_sequence_length, 0)
+        lengths = {0: config.original_sequence_length}
+        branches = {}
+        subtree_roots = []
+        for node in self.tree.traverse("preorder", is_leaf_fn=lambda n: self._depths[n.id] >= self.split_depth):
+            if node.up is None:
+                continue
+            if self._depths[node.id] == self.split_depth:
+                subtree_roots.append(node.id)
+                continue
+            branch = _simulate_branch(node.id, node.up.id, len(node.children), node.dist, lengths[node.up.id],
+                                      config, self.sim_type, self.total_events)
+            lengths[node.id] = branch[0]
+            branches[node.id] = branch
+            self.total_events += branch[2]
+        return branches, subtree_roots
+
+    def _add_subtree(self, branches: dict[int, Branch], subtree: dict[int, Branch]) -> None:
+        branches.update(subtree)
+        self.total_events += sum(branch[2] for branch in subtree.values())
+        max_total_events = self.config.max_total_events
+        if max_total_events is not None and self.total_events > max_total_events:
+            raise SimulationBudgetExceeded("max_total_events", max_total_events, self.total_events)
+
+    def _simulate_subtrees(self, branches: dict[int, Branch], subtree_roots: list[int]) -> None:
+        def parent_length(root_id: int) -> int:
+            parent_id = self._nodes[root_id].up.id
+            return self.config.original_sequence_length if parent_id == 0 else branches[parent_id][0]
+
+        if self.workers == 1 or len(subtree_roots) <= 1:
+            for root_id in subtree_roots:
+                self._add_subtree(branches, _simulate_subtree(self._nodes[root_id], parent_length(root_id),
+                                                              self.config, self.sim_type, self.total_events))
+            return
+
+        # Every worker starts from the events above the split depth
+        events_above = self.total_events
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self.tree.write(format=1, dist_formatter="%0.17g"),)) as pool:
+            futures = [pool.submit(_simulate_subtree_in_worker, root_id, parent_length(root_id),
+                                   self.config, self.sim_type, events_above)
+                       for root_id in subtree_roots]
+            try:
+                for future in futures:
+                    self._add_subtree(branches, future.result())
+            except SimulationBudgetExceeded:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    def _stitch(self, branches: dict[int, Branch]) -> Msa:
+        """Replay all block lists in preorder onto a single super sequence."""
+        leaf_ids = {node.id for node in self._nodes if node.is_leaf()}
+        super_seq = SuperSequence(self.config.original_sequence_length, len(leaf_ids) + 1)
+        root_seq = Sequence(super_seq, True, 0, len(self._nodes[0].children))
+        root_seq.init_root_seq()
+        sequences = {0: root_seq}
+
+        sequences_to_save = []
+        for node in self._nodes[1:]:
+            parent_id = node.up.id
+            current_seq = Sequence(super_seq, node.id in leaf_ids, node.id, len(node.children))
+            blocks = (Block(*block) for block in branches.pop(node.id)[1])
+            current_seq.generate_sequence(blocks, sequences[parent_id])
+
+            sequences[parent_id]._number_of_children -= 1
+            if sequences[parent_id]._number_of_children == 0:
+                del sequences[parent_id]
+
+            if node.id in leaf_ids:
+                sequences_to_save.append(current_seq)
+                continue
+            sequences[node.id] = current_seq
+
+        if self.config.max_msa_length is not None and super_seq.get_msa_length() > self.config.max_msa_length:
+            raise SimulationBudgetExceeded("max_msa_length", self.config.max_msa_length, super_seq.get_msa_length())
+        msa = Msa(super_seq)
+        msa._id_to_name = self.id_to_name
+        msa._sequences_to_save = sequences_to_save
+        return msa
+
+    def run(self) -> Msa:
+        """Simulate the replicate and return its (not yet rendered) MSA."""
+        self.total_events = 0
+        branches, subtree_roots = self._simulate_top()
+        self._simulate_subtrees(branches, subtree_roots)
+        self.msa = self._stitch(branches)
+        return self.msa
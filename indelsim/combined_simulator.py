@@ -13,18 +13,29 @@ import sys
 import os
 import pathlib
 import traceback
-from typing import List, Dict, Any, Tuple
+from typing import Any, Dict, Iterator, List, Tuple
 import time
-from datetime import datetime
 import numpy as np
 
 # Import existing CLI classes to reuse their functionality
-from indelsim.indel_simulator import IndelSimulatorCLI, TEMP_FILE_NAME as TEMP_INDEL_FILE
+from indelsim.indel_simulator import IndelSimulatorCLI
 from indelsim.substitution_simulator import SubstitutionSimulatorCLI, TEMP_FILE_NAME as TEMP_SUBS_FILE
 from indelsim.classes import Msa
+from indelsim.classes.reversible_model import SubstitutionModelError
+from indelsim.classes.sim_config import BUDGETS
+from indelsim.parallel import _merge_replicate_output, print_worker_utilization, replicate_directory
+from indelsim.pipeline import ReplicatePipeline
+from indelsim.memory import print_memory_profiles
+from indelsim.simulator_cli import RUN_ARGUMENTS, SimulatorCLI, add_run_arguments, validate_run_arguments
+from indelsim.tracing import span
+from indelsim.run_manifest import RunManifest, RunManifestError
 
-class CombinedSimulatorCLI:
+class CombinedSimulatorCLI(SimulatorCLI):
     """Command-line interface for the combined indel and substitution simulator."""
+    tool = "combined"
+    temp_file_name = TEMP_SUBS_FILE
+    msa_key = "final_msa"
+    pipeline: ReplicatePipeline | None = None
     
     def __init__(self):
         self.indel_cli = IndelSimulatorCLI()
@@ -62,7 +73,7 @@ Examples:
         for action in indel_parser._actions:
             if action.dest not in ['help', 'output_directory', 'number_of_simulations', 'seed', 
                                    'output_type', 'verbose', 'benchmark', 'tree_file', 'original_sequence_length',
-                                   'keep_in_memory']:
+                                   'keep_in_memory', *RUN_ARGUMENTS]:
                 parser.add_argument(*action.option_strings, **{
                     'type': action.type,
                     'default': action.default,
@@ -73,7 +84,8 @@ Examples:
         
         # Add substitution-specific arguments (avoiding duplicates)
         for action in substitution_parser._actions:
-            if action.dest in ['substitution_rate', 'algorithm']:
+            if action.dest in ['substitution_rate', 'algorithm', 'matrix_sampler', 'substitution_model',
+                               'model_parameters']:
                 parser.add_argument(*action.option_strings, **{
                     'type': action.type,
                     'default': action.default,
@@ -101,6 +113,26 @@ Examples:
                 elif action.type is not None:
                     kwargs['type'] = action.type
                 parser.add_argument(*action.option_strings, **kwargs)
+
+        add_run_arguments(parser)
+        parser.add_argument(
+            '--gap_aware',
+            action='store_true',
+            help='Evolve substitutions only on the sites each node actually has, following the indel '
+                 'history of the list/tree algorithms, instead of on every MSA column (default: False)'
+        )
+        parser.add_argument(
+            '--pipeline',
+            action='store_true',
+            help='Overlap consecutive replicates: the indel, substitution and writing phases run in their '
+                 'own threads, connected by bounded queues (default: False)'
+        )
+        parser.add_argument(
+            '--queue_size',
+            type=int,
+            default=2,
+            help='Replicates that may wait between two phases with --pipeline (default: 2)'
+        )
         
         return parser
     
@@ -112,8 +144,6 @@ Examples:
         
         # Create output directory
         args.output_directory.mkdir(parents=True, exist_ok=True)
-        with open(args.output_directory / TEMP_INDEL_FILE, 'w') as f:
-            f.write("")
         with open(args.output_directory / TEMP_SUBS_FILE, 'w') as f:
             f.write("")
 
@@ -129,14 +159,17 @@ Examples:
         
         start_time = time.perf_counter()
         
-        # Use the existing indel simulator method
-        indel_result = self.indel_cli._run_single_simulation(args, sim_num)
+        # Use the existing indel simulator method. Without keep_in_memory the MSA
+        # is not written out: the substitution phase renders each leaf's row when
+        # it writes that leaf, so every row reaches the disk exactly once.
+        with span("indel phase", "cli", sim=sim_num):
+            indel_result = self.indel_cli._run_single_simulation(args, sim_num, render_msa=args.keep_in_memory)
         
         end_time = time.perf_counter()
         indel_runtime = end_time - start_time
         
         # Extract MSA length from the indel result
-        msa_length = indel_result["msa"]._msa_length
+        msa_length = indel_result["msa"]._msa_length if not indel_result["rejected"] else None
         
         if args.verbose:
             print(f"    Indel simulation completed in {indel_runtime:.3f} seconds")
@@ -144,22 +177,31 @@ Examples:
         
         return indel_result, msa_length
     
-    def _run_substitution_simulation(self, args: argparse.Namespace, template_msa: Msa, sim_num: int) -> Dict[str, Any]:
+    def _run_substitution_simulation(self, args: argparse.Namespace, indel_result: Dict[str, Any],
+                                     sim_num: int) -> Dict[str, Any]:
         """
         Run substitution simulation using existing SubstitutionSimulatorCLI.
         """
+        template_msa: Msa = indel_result["msa"]
         if args.verbose:
             print(f"  Step 2: Running substitution simulation on MSA length {template_msa._msa_length}...")
         
         # Create modified args for substitution simulation with the correct sequence length
         sub_args = argparse.Namespace(**vars(args))
         sub_args.output_directory = pathlib.Path(sub_args.output_directory)
-        sub_args.original_sequence_length = template_msa._msa_length
+        if args.gap_aware:
+            # The root keeps its real length and every node evolves its own sites
+            node_blocks = indel_result["node_blocks"]
+        else:
+            sub_args.original_sequence_length = template_msa._msa_length
+            node_blocks = None
         
         start_time = time.perf_counter()
         
         # Use the existing substitution simulator method
-        substitution_result = self.substitution_cli._run_single_simulation(sub_args, sim_num, template_msa)
+        with span("substitution phase", "cli", sim=sim_num):
+            substitution_result = self.substitution_cli._run_single_simulation(sub_args, sim_num, template_msa,
+                                                                               node_blocks)
         
         end_time = time.perf_counter()
         substitution_runtime = end_time - start_time
@@ -178,9 +220,27 @@ Examples:
         
         # Step 1: Run indel simulation
         indel_result, msa_length = self._run_indel_simulation(args, sim_num)
+        return self._complete_simulation(args, sim_num, indel_result, time.perf_counter() - total_start_time)
+
+    def _complete_simulation(self, args: argparse.Namespace, sim_num: int, indel_result: Dict[str, Any],
+                             indel_seconds: float) -> Dict[str, Any]:
+        """Run the substitution phase of a replicate whose indel phase took `indel_seconds`."""
+        total_start_time = time.perf_counter() - indel_seconds
+        if indel_result["rejected"]:
+            # A rejected indel phase leaves no template to put residues on
+            return {
+                "simulation_number": sim_num + 1,
+                "total_runtime_seconds": time.perf_counter() - total_start_time,
+                "indel_runtime_seconds": indel_result["runtime_seconds"],
+                "substitution_runtime_seconds": 0.0,
+                "indel_config": indel_result["config"],
+                "final_msa": None,
+                "indel_type": indel_result["simulation_type"],
+                "rejected": indel_result["rejected"],
+            }
         template_msa: Msa = indel_result["msa"]
         # Step 2: Run substitution simulation and merge with template
-        substitution_result = self._run_substitution_simulation(args, template_msa, sim_num)
+        substitution_result = self._run_substitution_simulation(args, indel_result, sim_num)
         merged_sequences = substitution_result["msa"]
 
         if args.keep_in_memory:
@@ -199,9 +259,13 @@ Examples:
             "indel_config": indel_result["config"],
             "substitution_config": substitution_result["config"],
             "final_msa": merged_sequences,
-            "indel_events": indel_result.get("events", []),
+            "total_events": indel_result["total_events"],
+            "total_blocks": indel_result["total_blocks"],
+            "msa_length": indel_result["msa_length"],
+            "number_of_leaves": indel_result["number_of_leaves"],
             "indel_type": indel_result["simulation_type"],
-            "substitution_algorithm": substitution_result["algorithm"]
+            "substitution_algorithm": substitution_result["algorithm"],
+            "rejected": None,
         }
         
         if args.verbose:
@@ -210,17 +274,20 @@ Examples:
             print(f"    Substitution time: {substitution_result['runtime_seconds']:.3f}s")
         
         return results
-    
-    
+
     def _save_multiple_files(self, result: List[Dict[str, Any]], args: argparse.Namespace, output_dir: pathlib.Path) -> None:
         """Save each simulation to a separate file."""
         sim_num = result["simulation_number"]
+        if result["rejected"]:
+            if args.verbose:
+                print(f"Simulation {sim_num} was rejected, no file written")
+            return
         
         output_msa_path = output_dir / f"combined_sim_{sim_num:04d}.fasta"
         (output_dir / TEMP_SUBS_FILE).rename(output_msa_path)
         
         if args.keep_in_memory:
-            self._write_fasta(result["final_msa"], output_msa_path)
+            self._write_fasta(result["final_msa"], output_msa_path, result)
 
         if args.verbose:
             print(f"Saved simulation {sim_num} to {output_msa_path}")
@@ -232,11 +299,18 @@ Examples:
         
 
         with open(temp_path, 'a') as f:
+            if result["rejected"]:
+                f.write(f"# Combined Simulation {result['simulation_number']}\n")
+                f.write(f"# Rejected: {result['rejected']['reason']}\n")
+                f.write(f"# Seed: {result['indel_config']['seed']}\n")
+                f.write("\n\n")
+                return
+
             if args.keep_in_memory:
                 msa = result["final_msa"]
                 for species_name, sequence in msa.items():
                     f.write(f">{species_name}\n")
-                    f.write(''.join(sequence))
+                    f.write(sequence.decode("ascii"))
                     f.write("\n")
 
             f.write(f"# Combined Simulation {result['simulation_number']}\n")
@@ -259,7 +333,7 @@ Examples:
 
                 
     
-    def _write_fasta(self, msa: Dict[str, str], filename: pathlib.Path, result: Dict[str, Any]) -> None:
+    def _write_fasta(self, msa: Dict[str, bytes], filename: pathlib.Path, result: Dict[str, Any]) -> None:
         """Write MSA in FASTA format with metadata."""
         with open(filename, 'w') as f:
             # Write metadata as comments
@@ -267,17 +341,60 @@ Examples:
             f.write(f"# Total Runtime: {result['total_runtime_seconds']:.3f}s\n")
             f.write(f"# Indel Runtime: {result['indel_runtime_seconds']:.3f}s\n")
             f.write(f"# Substitution Runtime: {result['substitution_runtime_seconds']:.3f}s\n")
-            f.write(f"# Merge Runtime: {result['merge_runtime_seconds']:.3f}s\n")
             f.write(f"# Indel Type: {result['indel_type']}\n")
             f.write(f"# Substitution Algorithm: {result['substitution_algorithm']}\n")
             
             # Write sequences
             for species_id, sequence in msa.items():
                 f.write(f">{species_id}\n")
-                f.write(sequence)
+                f.write(sequence.decode("ascii"))
                 f.write("\n")
     
-    def _print_benchmark_results(self, results: List[Dict[str, Any]], args: argparse.Namespace) -> None:
+    def _create_pipeline(self, args: argparse.Namespace, manifest: RunManifest) -> ReplicatePipeline:
+        """
+        Build the indel -> substitution -> writing pipeline of `--pipeline`.
+
+        Every replicate is simulated in its own scratch directory (as with --jobs)
+        and merged into the output directory by the writing stage, in order. The
+        writing stage also checkpoints the replicate in `manifest`, before the next
+        replicate is merged, so that its recorded offset ends at its own output.
+        """
+        def indel_stage(sim_num: int) -> Tuple[argparse.Namespace, int, Dict[str, Any], float]:
+            if args.verbose:
+                print(f"Running combined simulation {sim_num + 1}/{args.number_of_simulations}...")
+            stage_args = argparse.Namespace(**vars(args))
+            stage_args.output_directory = replicate_directory(args.output_directory, sim_num)
+            stage_args.output_directory.mkdir(parents=True, exist_ok=True)
+            self._init_output_file(stage_args)
+            start_time = time.perf_counter()
+            indel_result, _ = self._run_indel_simulation(stage_args, sim_num)
+            return stage_args, sim_num, indel_result, time.perf_counter() - start_time
+
+        def substitution_stage(item: Tuple[argparse.Namespace, int, Dict[str, Any], float]
+                               ) -> Tuple[argparse.Namespace, int, Dict[str, Any]]:
+            stage_args, sim_num, indel_result, indel_seconds = item
+            return stage_args, sim_num, self._complete_simulation(stage_args, sim_num, indel_result, indel_seconds)
+
+        def writing_stage(item: Tuple[argparse.Namespace, int, Dict[str, Any]]) -> Dict[str, Any]:
+            stage_args, sim_num, result = item
+            self._save_replicate(stage_args, result)
+            _merge_replicate_output(args, sim_num, TEMP_SUBS_FILE)
+            manifest.record(sim_num, args.output_directory / TEMP_SUBS_FILE)
+            return result
+
+        return ReplicatePipeline([("indel", indel_stage), ("substitution", substitution_stage),
+                                  ("writing", writing_stage)], args.queue_size)
+
+    def _iter_replicates(self, args: argparse.Namespace, manifest: RunManifest,
+                         pending: List[int]) -> Tuple[Iterator[Dict[str, Any]], bool]:
+        """Run the replicates through the pipeline with `--pipeline`, whose writing stage checkpoints them."""
+        if not args.pipeline:
+            return super()._iter_replicates(args, manifest, pending)
+        self.pipeline = self._create_pipeline(args, manifest)
+        return self.pipeline.run(pending), True
+
+    def _print_benchmark_results(self, results: List[Dict[str, Any]], args: argparse.Namespace,
+                                 wall_time: float, pipeline: ReplicatePipeline = None) -> None:
         """Print benchmarking statistics."""
         total_runtimes = [r["total_runtime_seconds"] for r in results]
         indel_runtimes = [r["indel_runtime_seconds"] for r in results]
@@ -289,6 +406,7 @@ Examples:
         print(f"Indel Algorithm: {args.type}")
         print(f"Substitution Algorithm: {args.algorithm}")
         print(f"Number of simulations: {len(results)}")
+        print(f"Rejected simulations: {sum(1 for r in results if r['rejected'])}")
         print(f"Original sequence length: {args.original_sequence_length}")
         print(f"Insertion rate: {args.insertion_rate}")
         print(f"Deletion rate: {args.deletion_rate}")
@@ -313,6 +431,11 @@ Examples:
         if len(total_runtimes) > 1:
             import statistics
             print(f"Std deviation: {statistics.stdev(total_runtimes):.3f}s")
+        print("-"*60)
+        print_worker_utilization(results, wall_time)
+        print_memory_profiles(results)
+        if pipeline is not None:
+            pipeline.print_throughput(wall_time)
         print("="*60)
     
     def run(self) -> None:
@@ -327,6 +450,40 @@ Examples:
         if args.number_of_simulations < 1:
             print("Error: Number of simulations must be at least 1.", file=sys.stderr)
             sys.exit(1)
+
+        for budget in BUDGETS:
+            if getattr(args, budget) is not None and getattr(args, budget) < 1:
+                print(f"Error: --{budget} must be at least 1.", file=sys.stderr)
+                sys.exit(1)
+
+        if args.queue_size < 1:
+            print("Error: Queue size must be at least 1.", file=sys.stderr)
+            sys.exit(1)
+
+        try:
+            validate_run_arguments(args)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
+        if args.pipeline and args.jobs > 1:
+            print("Error: --pipeline and --jobs cannot be combined.", file=sys.stderr)
+            sys.exit(1)
+
+        if args.pipeline and args.profile_memory:
+            print("Error: --profile_memory accounts one replicate at a time and cannot be combined with --pipeline.",
+                  file=sys.stderr)
+            sys.exit(1)
+
+        if args.gap_aware and args.type == "naive":
+            print("Error: --gap_aware requires the list or tree algorithm.", file=sys.stderr)
+            sys.exit(1)
+
+        try:
+            self.substitution_cli._get_model(args)
+        except (TypeError, SubstitutionModelError) as e:
+            print(f"Error: Invalid parameters for substitution model {args.substitution_model}: {e}", file=sys.stderr)
+            sys.exit(1)
         
         if args.verbose:
             print("Starting combined indel and substitution simulations...")
@@ -338,30 +495,16 @@ Examples:
             print()
         
         # Run simulations
-        results = []
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self._init_output_file(args)
-        combined_file_path = args.output_directory / f"combined_simulations_{timestamp}.fasta"
-
-        for i in range(args.number_of_simulations):
-            result = self._run_single_simulation(args, i)
-            results.append(result)
-            if args.output_type == "multiple_files":
-                self._save_multiple_files(result, args, args.output_directory)
-                self._init_output_file(args)
-
-            elif args.output_type == "single_file":
-                self._save_single_file(result, args, args.output_directory)
-                (args.output_directory / TEMP_INDEL_FILE).unlink(missing_ok=True)
-        
-        if args.output_type == "single_file":
-            (args.output_directory / TEMP_SUBS_FILE).rename(combined_file_path)
-        (args.output_directory / TEMP_SUBS_FILE).unlink(missing_ok=True)
-        (args.output_directory / TEMP_INDEL_FILE).unlink(missing_ok=True)
+        args.output_directory = pathlib.Path(args.output_directory)
+        try:
+            results, wall_time = self._run_replicates(args)
+        except RunManifestError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
 
         # Print benchmark results if requested
-        if args.benchmark:
-            self._print_benchmark_results(results, args)
+        if args.benchmark and results:
+            self._print_benchmark_results(results, args, wall_time, self.pipeline)
         
         if args.verbose:
             print(f"\nCompleted {len(results)} combined simulations successfully!")
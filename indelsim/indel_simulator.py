@@ -22,16 +22,21 @@ import os
 import pathlib
 from typing import List, Dict, Any
 import time
-from datetime import datetime
 
 from indelsim.classes.simulation import Simulation
-from indelsim.classes.sim_config import SimConfiguration
+from indelsim.classes.sim_config import BUDGETS, SimConfiguration, SimulationBudgetExceeded
 from indelsim.enums import SimulationTypes
+from indelsim.parallel import print_worker_utilization
+from indelsim.memory import print_memory_profiles
+from indelsim.simulator_cli import SimulatorCLI, add_run_arguments, validate_run_arguments
+from indelsim.tracing import span
 
 TEMP_FILE_NAME = "_temp_indels.fasta"
 
-class IndelSimulatorCLI:
+class IndelSimulatorCLI(SimulatorCLI):
     """Command-line interface for the indel simulator."""
+    tool = "indel"
+    temp_file_name = TEMP_FILE_NAME
     
     def __init__(self):
         self.parser = self._create_parser()
@@ -130,6 +135,35 @@ Examples:
             help="Extra positions before sequence start for deletion events (default: 49)"
         )
         
+        # Budgets
+        parser.add_argument(
+            "--max_sequence_length",
+            type=int,
+            default=None,
+            help="Reject a simulation as soon as any sequence grows beyond this length (default: unlimited)"
+        )
+
+        parser.add_argument(
+            "--max_events_per_branch",
+            type=int,
+            default=None,
+            help="Reject a simulation with more indel events on a single branch (default: unlimited)"
+        )
+
+        parser.add_argument(
+            "--max_msa_length",
+            type=int,
+            default=None,
+            help="Reject a simulation whose MSA would be longer (default: unlimited)"
+        )
+
+        parser.add_argument(
+            "--max_total_events",
+            type=int,
+            default=None,
+            help="Reject a simulation with more indel events in total (default: unlimited)"
+        )
+        
         parser.add_argument(
             "--number_of_simulations",
             type=int,
@@ -177,6 +211,8 @@ Examples:
             help="Keep the MSA in memory till the end of the simulation"
         )
 
+        add_run_arguments(parser)
+
         return parser
     
     def _validate_args(self, args: argparse.Namespace) -> None:
@@ -207,6 +243,13 @@ Examples:
         # Validate number of simulations
         if args.number_of_simulations <= 0:
             raise ValueError("Number of simulations must be positive")
+
+        validate_run_arguments(args)
+
+        # Validate budgets
+        for budget in BUDGETS:
+            if getattr(args, budget) is not None and getattr(args, budget) <= 0:
+                raise ValueError(f"--{budget} must be positive")
     
     def _create_sim_config(self, args: argparse.Namespace) -> SimConfiguration:
         """Create simulation configuration from arguments."""
@@ -217,7 +260,8 @@ Examples:
             deletion_extra_edge_length=args.deletion_extra_edge_length,
             rate_ins=args.insertion_rate,
             rate_del=args.deletion_rate,
-            seed=args.seed
+            seed=args.seed,
+            **{budget: getattr(args, budget) for budget in BUDGETS}
         )
     
     def _get_simulation_type(self, sim_type: str) -> SimulationTypes:
@@ -240,9 +284,16 @@ Examples:
         with open(output_dir / TEMP_FILE_NAME, 'w') as f:
             f.write("")
 
-    
-    def _run_single_simulation(self, args: argparse.Namespace, sim_num: int) -> Dict[str, Any]:
-        """Run a single simulation and return results."""
+
+    def _run_single_simulation(self, args: argparse.Namespace, sim_num: int,
+                               render_msa: bool = True) -> Dict[str, Any]:
+        """
+        Run a single simulation and return results.
+
+        Without `keep_in_memory` the MSA is written to the temporary file, unless
+        `render_msa` is False: then the caller renders its rows one at a time
+        (see `Msa.pop_row`), as the combined simulator does.
+        """
         if args.verbose:
             print(f"Running simulation {sim_num + 1}/{args.number_of_simulations}...")
         
@@ -251,23 +302,47 @@ Examples:
         config.random_seed = args.seed + sim_num
         
         start_time = time.perf_counter()
-        # Create events list
-        simulation = Simulation(args.tree_file, config)
-        
-        # Choose simulation method based on type and run simulation
         sim_type = args.type
-        if sim_type == "naive":
-            simulation.msa_from_naive()
-        elif sim_type == "list":
-            simulation.msa_from_blocklist()
-        elif sim_type == "tree":
-            simulation.msa_from_blocktree()
-        
-        if args.keep_in_memory:
-            simulation.msa.compute_msa()
-        else:
-            temp_output_path = pathlib.Path(args.output_directory) / TEMP_FILE_NAME
-            simulation.msa.compute_msa_to_disk(temp_output_path)
+        try:
+            # Create events list
+            with span("generate events", "indel"):
+                simulation = Simulation(self._get_tree(args.tree_file), config,
+                                        record_blocks=getattr(args, "gap_aware", False))
+
+            # Choose simulation method based on type and run simulation
+            with span("build MSA", "indel", engine=sim_type):
+                if sim_type == "naive":
+                    simulation.msa_from_naive()
+                elif sim_type == "list":
+                    simulation.msa_from_blocklist()
+                elif sim_type == "tree":
+                    simulation.msa_from_blocktree()
+        except SimulationBudgetExceeded as e:
+            # Nothing has been rendered or written for a rejected simulation
+            if args.verbose:
+                print(f"  Rejected: {e}")
+            return {
+                "simulation_number": sim_num + 1,
+                "runtime_seconds": time.perf_counter() - start_time,
+                "simulation_type": sim_type,
+                "config": {
+                    "insertion_rate": args.insertion_rate,
+                    "deletion_rate": args.deletion_rate,
+                    "original_sequence_length": args.original_sequence_length,
+                    "seed": config.random_seed
+                },
+                "msa": None,
+                "rejected": e.as_dict(),
+            }
+        
+        with span("render MSA", "msa"):
+            if args.keep_in_memory:
+                simulation.msa.compute_msa()
+            elif not render_msa:
+                simulation.msa.index_rows()
+            else:
+                temp_output_path = pathlib.Path(args.output_directory) / TEMP_FILE_NAME
+                simulation.msa.compute_msa_to_disk(temp_output_path)
         
         end_time = time.perf_counter()
         runtime = end_time - start_time
@@ -284,17 +359,27 @@ Examples:
                 "original_sequence_length": args.original_sequence_length,
                 "seed": config.random_seed
             },
+            "total_events": simulation.total_events,
+            "total_blocks": simulation.total_blocks,
+            "msa_length": simulation.msa._msa_length,
+            "number_of_leaves": len(simulation.nodes_to_align) - 1,
             "msa": simulation.msa,
+            "node_blocks": simulation.node_blocks,
+            "rejected": None,
         }
         
         if args.verbose:
             print(f"  Completed in {runtime:.3f} seconds")
         
         return results
-        
+
     def _save_multiple_files(self, result: List[Dict[str, Any]], args: argparse.Namespace, output_dir: pathlib.Path) -> None:
         """Save each simulation to a separate file."""
         sim_num = result["simulation_number"]
+        if result["rejected"]:
+            if args.verbose:
+                print(f"Simulation {sim_num} was rejected, no file written")
+            return
         
         output_msa_path = output_dir / f"simulation_{sim_num:04d}.fasta"
         (output_dir / TEMP_FILE_NAME).rename(output_msa_path)
@@ -310,10 +395,12 @@ Examples:
         
         temp_path = output_dir / TEMP_FILE_NAME
         with open(temp_path , 'a') as f:
-            if args.keep_in_memory:
+            if args.keep_in_memory and not result["rejected"]:
                 f.write(str(result["msa"]))
 
             f.write(f"# Simulation {result['simulation_number']}\n")
+            if result["rejected"]:
+                f.write(f"# Rejected: {result['rejected']['reason']}\n")
             f.write(f"# Runtime: {result['runtime_seconds']:.3f}s\n")
             f.write(f"# Simulation type: {result['simulation_type']}\n")
             f.write(f"# Insertion rate: {result['config']['insertion_rate']}\n")
@@ -333,7 +420,8 @@ Examples:
             else:
                 f.write(str(msa))
     
-    def _print_benchmark_results(self, results: List[Dict[str, Any]], args: argparse.Namespace) -> None:
+    def _print_benchmark_results(self, results: List[Dict[str, Any]], args: argparse.Namespace,
+                                 wall_time: float) -> None:
         """Print benchmarking statistics."""
         runtimes = [r["runtime_seconds"] for r in results]
         
@@ -342,6 +430,7 @@ Examples:
         print("="*50)
         print(f"Simulation type: {args.type}")
         print(f"Number of simulations: {len(results)}")
+        print(f"Rejected simulations: {sum(1 for r in results if r['rejected'])}")
         print(f"Original sequence length: {args.original_sequence_length}")
         print(f"Insertion rate: {args.insertion_rate}")
         print(f"Deletion rate: {args.deletion_rate}")
@@ -353,6 +442,9 @@ Examples:
         if len(runtimes) > 1:
             import statistics
             print(f"Std deviation: {statistics.stdev(runtimes):.3f}s")
+        print("-"*50)
+        print_worker_utilization(results, wall_time)
+        print_memory_profiles(results)
         print("="*50)
     
     def run(self) -> None:
@@ -368,40 +460,14 @@ Examples:
                 print(f"Output directory: {args.output_directory}")
             
             # Run simulations
-            results = []
-            total_start_time = time.perf_counter()
-
-            output_dir = pathlib.Path(args.output_directory)
-            # output_dir.mkdir(parents=True, exist_ok=True)
-
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            self._init_output_file(args)
-            combined_file_path = output_dir / f"combined_simulations_{timestamp}.fasta"
-
-            for i in range(args.number_of_simulations):
-                result = self._run_single_simulation(args, i)
-                results.append(result)
-                if args.output_type == "multiple_files":
-                    self._save_multiple_files(result, args, output_dir)
-                    self._init_output_file(args)
-
-                elif args.output_type == "single_file":
-                    self._save_single_file(result, args, output_dir)
-                
-            
-            if args.output_type == "single_file":
-                (output_dir / TEMP_FILE_NAME).rename(combined_file_path)
-            (output_dir / TEMP_FILE_NAME).unlink(missing_ok=True)
-
-
-            total_end_time = time.perf_counter()
+            results, wall_time = self._run_replicates(args)
                         
             # Print benchmark results if requested
-            if args.benchmark or args.verbose:
-                self._print_benchmark_results(results, args)
+            if (args.benchmark or args.verbose) and results:
+                self._print_benchmark_results(results, args, wall_time)
             
             if args.verbose:
-                print(f"\nAll simulations completed in {total_end_time - total_start_time:.3f}s")
+                print(f"\nAll simulations completed in {wall_time:.3f}s")
                 print(f"Results saved to: {args.output_directory}")
         
         except Exception as e:
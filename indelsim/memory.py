@@ -0,0 +1,114 @@
+"""
+Per-phase memory accounting of simulation replicates.
+
+While a ``MemoryProfile`` is active, every ``indelsim.tracing.span`` also
+measures memory: the tracemalloc peak reached inside the span above the memory
+traced when it started, the net memory it left allocated, and how much it raised
+the high-water mark of the process RSS (``ru_maxrss``). Spans of the same name
+(e.g. the per-branch "block updates") are aggregated into one phase. The CLIs
+profile each replicate separately with ``--profile_memory`` and print the
+phases with their ``--benchmark`` results.
+
+tracemalloc slows allocation-heavy code down severalfold, so timings of a
+profiled run are not representative.
+"""
+
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+__all__ = ["MemoryProfile", "PhaseMemory", "print_memory_profiles"]
+
+MIB = 1024 * 1024
+
+
+def max_rss_bytes() -> Optional[int]:
+    """High-water mark of the resident set size of this process, if the OS reports it."""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+@dataclass
+class PhaseMemory:
+    """Memory use of all spans of one name."""
+    name: str
+    calls: int = 0
+    peak_bytes: int = 0
+    net_bytes: int = 0
+    max_rss_growth_bytes: int = 0
+
+
+class MemoryProfile:
+    """Aggregates the memory use of spans by name, from creation until `close`."""
+    phases: Dict[str, PhaseMemory]
+
+    def __init__(self):
+        self.phases = {}
+        # [traced memory at entry, peak traced memory since entry] of the open spans
+        self._stack: List[List[int]] = []
+        self._started_tracemalloc = not tracemalloc.is_tracing()
+        if self._started_tracemalloc:
+            tracemalloc.start()
+
+    def _fold_peak(self, peak: int) -> None:
+        for entry in self._stack:
+            entry[1] = max(entry[1], peak)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        current, peak = tracemalloc.get_traced_memory()
+        # The peak is reset for this phase, so the enclosing ones keep what they reached so far
+        self._fold_peak(peak)
+        tracemalloc.reset_peak()
+        entry = [current, current]
+        self._stack.append(entry)
+        rss_before = max_rss_bytes()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            self._fold_peak(peak)
+            self._stack.pop()
+
+            stats = self.phases.get(name)
+            if stats is None:
+                stats = self.phases[name] = PhaseMemory(name)
+            stats.calls += 1
+            stats.peak_bytes = max(stats.peak_bytes, entry[1] - entry[0])
+            stats.net_bytes += current - entry[0]
+            if rss_before is not None:
+                stats.max_rss_growth_bytes += max_rss_bytes() - rss_before
+
+    def close(self) -> None:
+        """Stop tracemalloc if this profile started it."""
+        if self._started_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Phases in the order they first finished, as plain dictionaries."""
+        return [asdict(stats) for stats in self.phases.values()]
+
+
+def print_memory_profiles(results: List[Dict[str, Any]]) -> None:
+    """Print the per-phase memory of every replicate that was profiled."""
+    profiled = [result for result in results if result.get("memory")]
+    if not profiled:
+        return
+
+    print("Memory per replicate (peak above phase start, net allocated, growth of the max RSS):")
+    for result in profiled:
+        print(f"  Simulation {result['simulation_number']}:")
+        for phase in result["memory"]:
+            calls = f" ({phase['calls']} calls)" if phase["calls"] > 1 else ""
+            print(f"    {phase['name']}{calls}: peak {phase['peak_bytes'] / MIB:.2f} MiB, "
+                  f"net {phase['net_bytes'] / MIB:+.2f} MiB, max RSS +{phase['max_rss_growth_bytes'] / MIB:.2f} MiB")
@@ -0,0 +1,122 @@
+"""
+Process-pool execution of independent simulation replicates.
+
+Every replicate runs in a worker process inside its own scratch directory, so the
+temporary FASTA files of concurrent replicates never collide. The parent process
+merges the scratch outputs back into the run's output directory strictly in
+replicate order, which keeps the ``single_file`` and ``multiple_files`` outputs
+identical to those of a serial run. Seeds stay ``seed + sim_num`` regardless of
+which worker executes a replicate.
+"""
+
+import argparse
+import itertools
+import os
+import pathlib
+import shutil
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+REPLICATE_DIR_PREFIX = "_replicate_"
+
+
+def replicate_directory(output_dir: pathlib.Path, sim_num: int) -> pathlib.Path:
+    """Return the scratch directory used by a worker for replicate `sim_num`."""
+    return pathlib.Path(output_dir) / f"{REPLICATE_DIR_PREFIX}{sim_num:06d}"
+
+
+def _run_replicate_in_worker(cli_class: type, args: argparse.Namespace, sim_num: int) -> Dict[str, Any]:
+    """Worker entry point: run and save one replicate into its scratch directory."""
+    cli = cli_class()
+    worker_args = argparse.Namespace(**vars(args))
+    worker_args.output_directory = replicate_directory(args.output_directory, sim_num)
+    worker_args.output_directory.mkdir(parents=True, exist_ok=True)
+    cli._init_output_file(worker_args)
+
+    start_time = time.perf_counter()
+    result = cli._run_and_save_replicate(worker_args, sim_num)
+    result["worker_busy_seconds"] = time.perf_counter() - start_time
+    result["worker_pid"] = os.getpid()
+    return result
+
+
+def _merge_replicate_output(args: argparse.Namespace, sim_num: int, temp_file_name: str) -> None:
+    """Move the output of a finished replicate from its scratch directory into place."""
+    output_dir = pathlib.Path(args.output_directory)
+    scratch_dir = replicate_directory(output_dir, sim_num)
+
+    if args.output_type == "single_file":
+        with open(output_dir / temp_file_name, 'ab') as merged, \
+                open(scratch_dir / temp_file_name, 'rb') as part:
+            shutil.copyfileobj(part, merged)
+    elif args.output_type == "multiple_files":
+        for path in sorted(scratch_dir.glob("*.fasta")):
+            if not path.name.startswith("_"):
+                path.replace(output_dir / path.name)
+
+    shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def iter_replicates(cli: Any, args: argparse.Namespace, temp_file_name: str,
+                    sim_nums: Optional[Iterable[int]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Run replicates and yield their results in replicate order.
+
+    With ``args.jobs <= 1`` the replicates run serially in this process through
+    ``cli._run_and_save_replicate``. Otherwise they are spread over a process pool
+    and each result is yielded only after its output has been merged, so a
+    consumer always observes the same sequence of files as in a serial run.
+
+    Args:
+        cli: CLI instance providing ``_init_output_file`` and ``_run_and_save_replicate``
+        args: Parsed command-line arguments
+        temp_file_name: Name of the temporary FASTA file the CLI appends to
+        sim_nums: Replicate indices to run (default: all of them)
+    """
+    if sim_nums is None:
+        sim_nums = range(args.number_of_simulations)
+    jobs = getattr(args, "jobs", 1)
+
+    if jobs <= 1:
+        for sim_num in sim_nums:
+            yield cli._run_and_save_replicate(args, sim_num)
+        return
+
+    pathlib.Path(args.output_directory).mkdir(parents=True, exist_ok=True)
+    sim_num_iter = iter(sim_nums)
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        # Keep a bounded window of replicates in flight so memory does not grow
+        # with the number of simulations.
+        for sim_num in itertools.islice(sim_num_iter, 2 * jobs):
+            pending.append((sim_num, pool.submit(_run_replicate_in_worker, type(cli), args, sim_num)))
+
+        while pending:
+            sim_num, future = pending.popleft()
+            result = future.result()
+            _merge_replicate_output(args, sim_num, temp_file_name)
+
+            next_sim_num = next(sim_num_iter, None)
+            if next_sim_num is not None:
+                pending.append((next_sim_num,
+                                pool.submit(_run_replicate_in_worker, type(cli), args, next_sim_num)))
+            yield result
+
+
+def print_worker_utilization(results: List[Dict[str, Any]], wall_time: float) -> None:
+    """Print the wall time of a run and, for pooled runs, the busy share of every worker."""
+    print(f"Wall time: {wall_time:.3f}s")
+
+    busy_seconds: Dict[int, float] = {}
+    for result in results:
+        if "worker_pid" in result:
+            busy_seconds[result["worker_pid"]] = (busy_seconds.get(result["worker_pid"], 0.0)
+                                                  + result["worker_busy_seconds"])
+    if not busy_seconds or wall_time <= 0:
+        return
+
+    print(f"Worker utilization ({len(busy_seconds)} workers):")
+    for worker_num, (pid, busy) in enumerate(sorted(busy_seconds.items()), start=1):
+        print(f"  Worker {worker_num} (pid {pid}): {busy:.3f}s busy ({busy / wall_time * 100:.1f}%)")
@@ -0,0 +1,121 @@
+"""
+Thread pipeline overlapping the phases of consecutive simulation replicates.
+
+A replicate passes through a fixed sequence of stages (for the combined
+simulator: indels, substitutions, writing). Every stage runs in its own thread
+and hands its output to the next one through a bounded queue, so while one
+replicate is being written the next one is already evolving residues and the
+one after it is simulating indels. Each stage handles replicates strictly in
+the order it receives them, hence results come out in replicate order.
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, List, Tuple
+
+# Marks the end of the replicates on a queue
+_DONE = object()
+
+
+class _StageFailure:
+    """Carries the exception of a failed stage down to the consumer."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+@dataclass
+class StageStats:
+    """Work done by one stage of a pipeline."""
+    name: str
+    items: int = 0
+    busy_seconds: float = 0.0
+
+
+class ReplicatePipeline:
+    """
+    Runs items through named stages, one thread per stage.
+
+    Args:
+        stages: (name, function) pairs; each function maps the output of the previous stage to its own
+        queue_size: Number of items that may wait between two stages
+    """
+    stages: List[Tuple[str, Callable[[Any], Any]]]
+    queue_size: int
+    stats: List[StageStats]
+
+    def __init__(self, stages: List[Tuple[str, Callable[[Any], Any]]], queue_size: int = 2):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        self.stages = stages
+        self.queue_size = queue_size
+        self.stats = [StageStats(name) for name, _ in stages]
+
+    @staticmethod
+    def _feed(items: Iterable[Any], outbox: queue.Queue) -> None:
+        for item in items:
+            outbox.put(item)
+        outbox.put(_DONE)
+
+    @staticmethod
+    def _run_stage(function: Callable[[Any], Any], stats: StageStats,
+                   inbox: queue.Queue, outbox: queue.Queue) -> None:
+        failed = False
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                outbox.put(_DONE)
+                return
+            # After a failure the remaining items are drained, so that no stage
+            # upstream stays blocked on a full queue.
+            if failed:
+                continue
+            if isinstance(item, _StageFailure):
+                failed = True
+                outbox.put(item)
+                continue
+
+            start_time = time.perf_counter()
+            try:
+                result = function(item)
+            except BaseException as e:
+                failed = True
+                result = _StageFailure(e)
+            else:
+                stats.items += 1
+            stats.busy_seconds += time.perf_counter() - start_time
+            outbox.put(result)
+
+    def run(self, items: Iterable[Any]) -> Iterator[Any]:
+        """Yield the output of the last stage for every item, in order; re-raises the error of a failed stage."""
+        # The results of the last stage are consumed by the caller at its own pace
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages] + [queue.Queue()]
+        threads = [threading.Thread(target=self._feed, args=(items, queues[0]), daemon=True)]
+        for idx, ((name, function), stats) in enumerate(zip(self.stages, self.stats)):
+            threads.append(threading.Thread(target=self._run_stage, name=f"pipeline-{name}", daemon=True,
+                                            args=(function, stats, queues[idx], queues[idx + 1])))
+        for thread in threads:
+            thread.start()
+
+        while True:
+            result = queues[-1].get()
+            if result is _DONE:
+                break
+            if isinstance(result, _StageFailure):
+                raise result.error
+            yield result
+        for thread in threads:
+            thread.join()
+
+    def print_throughput(self, wall_time: float) -> None:
+        """Print how many replicates every stage processed and how busy it was."""
+        print(f"Pipeline stages (queue size {self.queue_size}):")
+        for stats in self.stats:
+            rate = stats.items / stats.busy_seconds if stats.busy_seconds > 0 else 0.0
+            share = stats.busy_seconds / wall_time * 100 if wall_time > 0 else 0.0
+            print(f"  {stats.name}: {stats.items} replicates, {stats.busy_seconds:.3f}s busy ({share:.1f}%), "
+                  f"{rate:.2f} replicates/s")
@@ -0,0 +1,136 @@
+"""
+Checkpoint manifest that makes long simulation runs resumable.
+
+The manifest is a JSON-lines file kept next to the run's temporary output. Its
+first line holds the parameters of the run; every further line records one
+finished replicate together with the size of the temporary output file once
+that replicate was written. Replicates finish strictly in order, so after a
+crash the temporary file is cut back to the last recorded size and the run
+continues with the first replicate that is not in the manifest. Seeds stay
+``seed + sim_num``, so the resumed output matches an uninterrupted run.
+"""
+
+import argparse
+import json
+import os
+import pathlib
+from typing import Any, Dict, List, Optional
+
+MANIFEST_FILE_NAME = "_run_manifest.jsonl"
+
+# Arguments that may change between the interrupted and the resumed run
+# without changing the simulated replicates.
+_RESUMABLE_ARGS = ("verbose", "benchmark", "jobs", "resume", "output_directory", "number_of_simulations",
+                   "pipeline", "queue_size", "trace", "profile_memory",
+                   "benchmark_json")
+
+
+class RunManifestError(Exception):
+    """Raised when a run cannot be resumed from its manifest."""
+    pass
+
+
+def run_parameters(args: argparse.Namespace) -> Dict[str, Any]:
+    """Return the arguments that determine the replicates of a run."""
+    return {key: value if isinstance(value, (bool, int, float, type(None))) else str(value)
+            for key, value in sorted(vars(args).items()) if key not in _RESUMABLE_ARGS}
+
+
+class RunManifest:
+    """Records the finished replicates of a run in `output_dir`."""
+    path: pathlib.Path
+    parameters: Dict[str, Any]
+    completed: List[int]
+
+    def __init__(self, output_dir: pathlib.Path, parameters: Dict[str, Any]):
+        self.path = pathlib.Path(output_dir) / MANIFEST_FILE_NAME
+        self.parameters = parameters
+        self.completed = []
+        self._records: List[Dict[str, int]] = []
+        self._last_offset = 0
+
+    def exists(self) -> bool:
+        """Whether an interrupted run left a manifest behind."""
+        return self.path.exists()
+
+    def start(self) -> None:
+        """Begin a new run, discarding any previous manifest."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.completed = []
+        self._records = []
+        self._last_offset = 0
+        with open(self.path, 'w') as f:
+            f.write(json.dumps({"parameters": self.parameters}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _load(self) -> None:
+        with open(self.path) as f:
+            lines = f.readlines()
+        header = json.loads(lines[0])
+        if header["parameters"] != self.parameters:
+            changed = sorted(key for key in set(header["parameters"]) | set(self.parameters)
+                             if header["parameters"].get(key) != self.parameters.get(key))
+            raise RunManifestError(f"Cannot resume run in {self.path.parent}: "
+                                   f"parameters differ from the interrupted run ({', '.join(changed)})")
+
+        for line in lines[1:]:
+            # A line cut short by the crash belongs to a replicate that was not
+            # recorded, so it is dropped together with everything after it.
+            if not line.endswith("\n"):
+                break
+            record = json.loads(line)
+            self._records.append(record)
+            self.completed.append(record["replicate"])
+            self._last_offset = record["offset"]
+
+    def resume(self, temp_file: pathlib.Path) -> None:
+        """
+        Reload the manifest and restore `temp_file` to its last checkpoint.
+
+        Args:
+            temp_file: Temporary output file the run appends its replicates to
+        """
+        self._load()
+
+        if temp_file.exists():
+            with open(temp_file, 'r+b') as f:
+                if os.fstat(f.fileno()).st_size < self._last_offset:
+                    raise RunManifestError(f"Cannot resume run: {temp_file} is shorter than its checkpoint")
+                f.truncate(self._last_offset)
+        elif self._last_offset > 0:
+            raise RunManifestError(f"Cannot resume run: {temp_file} is missing")
+
+        # Rewrite the manifest without a possibly truncated last line
+        with open(self.path, 'w') as f:
+            f.write(json.dumps({"parameters": self.parameters}) + "\n")
+            for record in self._records:
+                f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def pending(self, number_of_simulations: int) -> List[int]:
+        """Return the replicates still to be simulated, in order."""
+        done = set(self.completed)
+        return [sim_num for sim_num in range(number_of_simulations) if sim_num not in done]
+
+    def record(self, sim_num: int, temp_file: Optional[pathlib.Path] = None) -> None:
+        """Mark replicate `sim_num` as finished once its output is durably on disk."""
+        offset = 0
+        if temp_file is not None and temp_file.exists():
+            with open(temp_file, 'rb') as f:
+                os.fsync(f.fileno())
+                offset = os.fstat(f.fileno()).st_size
+
+        record = {"replicate": sim_num, "offset": offset}
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._records.append(record)
+        self.completed.append(sim_num)
+        self._last_offset = offset
+
+    def finish(self) -> None:
+        """Remove the manifest once the run's output has been finalized."""
+        self.path.unlink(missing_ok=True)
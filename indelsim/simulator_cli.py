@@ -0,0 +1,181 @@
+"""
+Behaviour shared by the command-line tools of the simulators.
+
+``SimulatorCLI`` is the base class of the indel, substitution and combined
+simulator CLIs. It runs the replicates of a run (serially, with ``--jobs`` in a
+process pool, or through a subclass's own iterator), checkpoints them for
+``--resume``, records traces and benchmark reports, and saves every replicate
+through the subclass's ``_save_single_file``/``_save_multiple_files``.
+``add_run_arguments`` adds the command-line options of these run features.
+"""
+
+import argparse
+import pathlib
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ete3 import Tree
+
+from indelsim.benchmark_report import BenchmarkReport
+from indelsim.parallel import iter_replicates
+from indelsim.run_manifest import RunManifest, run_parameters
+from indelsim.tracing import memory_profile, span, start_tracing, stop_tracing
+
+__all__ = ["RUN_ARGUMENTS", "SimulatorCLI", "add_run_arguments", "validate_run_arguments"]
+
+# Destinations of the arguments added by `add_run_arguments`
+RUN_ARGUMENTS = ("jobs", "resume", "trace", "benchmark_json", "profile_memory")
+
+
+def add_run_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options controlling how the replicates of a run are executed and measured."""
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes running replicates in parallel (default: 1)"
+    )
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume an interrupted run in the output directory, skipping finished replicates"
+    )
+
+    parser.add_argument(
+        "--trace",
+        type=str,
+        default=None,
+        help="Write timing spans of the run to this file in Chrome trace format (JSON)"
+    )
+
+    parser.add_argument(
+        "--benchmark_json",
+        type=str,
+        default=None,
+        help="Write machine-readable benchmark results to this JSON file, and one JSON line per replicate "
+             "to the .jsonl file next to it"
+    )
+
+    parser.add_argument(
+        "--profile_memory",
+        action="store_true",
+        help="Account the peak memory of every phase of each replicate (tracemalloc and the OS high-water "
+             "mark) and report it with the benchmark results; slows the simulation down"
+    )
+
+
+def validate_run_arguments(args: argparse.Namespace) -> None:
+    """Validate the arguments of `add_run_arguments`."""
+    if args.jobs <= 0:
+        raise ValueError("Number of jobs must be positive")
+
+    if args.trace is not None and args.jobs > 1:
+        raise ValueError("--trace records this process only and cannot be combined with --jobs")
+
+
+class SimulatorCLI:
+    """
+    Base class of the simulator command-line interfaces.
+
+    Subclasses provide `_run_single_simulation`, `_init_output_file` and the
+    `_save_single_file`/`_save_multiple_files` writers, and set:
+
+    Args:
+        tool: Name of the tool in benchmark reports
+        temp_file_name: Temporary FASTA file in the output directory the replicates are appended to
+        msa_key: Key of the alignment in the result of a replicate, dropped once it is saved
+    """
+    tool: str
+    temp_file_name: str
+    msa_key: str = "msa"
+
+    def _get_tree(self, tree_file: str) -> Tree:
+        """Parse the tree file once and reuse it for all replicates of the run."""
+        if getattr(self, "_tree_file", None) != tree_file:
+            self._tree = Tree(tree_file)
+            self._tree_file = tree_file
+        return self._tree
+
+    def _run_and_save_replicate(self, args: argparse.Namespace, sim_num: int) -> Dict[str, Any]:
+        """Run a single simulation and write it to the configured output."""
+        with memory_profile(args.profile_memory) as memory:
+            with span("replicate", "cli", sim=sim_num):
+                result = self._run_single_simulation(args, sim_num)
+            self._save_replicate(args, result)
+        if memory is not None:
+            result["memory"] = memory.report()
+        return result
+
+    def _save_replicate(self, args: argparse.Namespace, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Write a finished replicate to the configured output."""
+        output_dir = pathlib.Path(args.output_directory)
+        with span("save replicate", "io", sim=result["simulation_number"] - 1):
+            if args.output_type == "multiple_files":
+                self._save_multiple_files(result, args, output_dir)
+                self._init_output_file(args)
+
+            elif args.output_type == "single_file":
+                self._save_single_file(result, args, output_dir)
+        # The alignment is on disk now, only keep the small per-replicate summary
+        result.pop(self.msa_key, None)
+        return result
+
+    def _iter_replicates(self, args: argparse.Namespace, manifest: RunManifest,
+                         pending: List[int]) -> Tuple[Iterator[Dict[str, Any]], bool]:
+        """
+        Start the `pending` replicates and return their results in order.
+
+        Also returns whether every replicate is already checkpointed in `manifest`
+        when its result comes out; otherwise the run loop checkpoints it.
+        """
+        return iter_replicates(self, args, self.temp_file_name, pending), False
+
+    def _run_replicates(self, args: argparse.Namespace) -> Tuple[List[Dict[str, Any]], float]:
+        """
+        Run all replicates of a run and finalize its output.
+
+        Starts a new run in the output directory, or continues the interrupted one
+        with ``--resume``. Returns the results of the replicates run now and the
+        wall time of the run.
+        """
+        results = []
+        total_start_time = time.perf_counter()
+
+        output_dir = pathlib.Path(args.output_directory)
+        temp_path = output_dir / self.temp_file_name
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        manifest = RunManifest(output_dir, run_parameters(args))
+        if args.resume and manifest.exists():
+            manifest.resume(temp_path)
+        else:
+            self._init_output_file(args)
+            manifest.start()
+        combined_file_path = output_dir / f"combined_simulations_{timestamp}.fasta"
+
+        pending = manifest.pending(args.number_of_simulations)
+        replicates, checkpointed = self._iter_replicates(args, manifest, pending)
+        report = None
+        if args.benchmark_json is not None:
+            report = BenchmarkReport(args.benchmark_json, self.tool, args, resume=args.resume)
+        if args.trace is not None:
+            start_tracing()
+        for sim_num, result in zip(pending, replicates):
+            if not checkpointed:
+                manifest.record(sim_num, temp_path)
+            results.append(result)
+            if report is not None:
+                report.record(result)
+        if args.trace is not None:
+            stop_tracing().write(args.trace)
+
+        if args.output_type == "single_file":
+            temp_path.rename(combined_file_path)
+        temp_path.unlink(missing_ok=True)
+        manifest.finish()
+
+        wall_time = time.perf_counter() - total_start_time
+        if report is not None:
+            report.finish(results, wall_time)
+        return results, wall_time
@@ -7,28 +7,68 @@ CLI tool to simulate substitutions in a sequence.
 """
 
 import argparse
+import json
 import sys
 import os
 import pathlib
-from typing import List, Dict, Any
+from typing import Any, Dict, List, Optional, Tuple
 import time
-from datetime import datetime
 import numpy as np
 
 from indelsim.classes.simulation import Simulation
 from indelsim.classes.sim_config import SimConfiguration
-from indelsim.classes.substitution import SubstitutionEvolver
-from indelsim.classes.jtt import get_jtt_model
+from indelsim.classes.substitution import MATRIX_SAMPLERS, SubstitutionEvolver, sample_root_sequence
+from indelsim.classes.models import SUBSTITUTION_MODELS, get_model
+from indelsim.classes.reversible_model import ReversibleModel, SubstitutionModelError
 from indelsim.classes import Msa
-from indelsim.enums import PROTEIN_ALPHABET
-from ete3 import Tree
+from indelsim.parallel import print_worker_utilization
+from indelsim.memory import print_memory_profiles
+from indelsim.simulator_cli import SimulatorCLI, add_run_arguments, validate_run_arguments
+from indelsim.tracing import span
 
 TEMP_FILE_NAME = "_temp_subs.fasta"
-AMINO_ACID_CHARS = np.array(PROTEIN_ALPHABET)
+# Gap template written by the indel phase of a combined run
+INDEL_TEMPLATE_FILE_NAME = "_temp_indels.fasta"
 
 
-class SubstitutionSimulatorCLI:
+class _GapTemplateFile:
+    """
+    Indel template FASTA of one replicate, indexed once by leaf name.
+
+    Every row is then read with a single seek, instead of scanning the file
+    from the top for every leaf.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self._file = open(path, 'rb')
+        self._rows: Dict[str, Tuple[int, int]] = {}
+        offset = 0
+        name = None
+        for line in self._file:
+            if line.startswith(b">"):
+                name = line[1:].rstrip(b"\n").decode()
+            elif name is not None:
+                self._rows.setdefault(name, (offset, len(line)))
+                name = None
+            offset += len(line)
+
+    def row(self, name: str) -> bytes:
+        """Return the template row of leaf `name`."""
+        try:
+            offset, length = self._rows[name]
+        except KeyError:
+            raise KeyError(f"Missing species in indel file: {name}")
+        self._file.seek(offset)
+        return self._file.read(length)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class SubstitutionSimulatorCLI(SimulatorCLI):
     """Command-line interface for the substitution simulator."""
+    tool = "substitution"
+    temp_file_name = TEMP_FILE_NAME
     
     def __init__(self):
         self.parser = self._create_parser()
@@ -64,11 +104,20 @@ Examples:
             help="Path to Newick format phylogenetic tree file"
         )
 
-        # TODO: add model
-        # parser.add_argument(
-        #     "--substitution_model",
-        #     type=str,
-        # )
+        parser.add_argument(
+            "--substitution_model",
+            choices=list(SUBSTITUTION_MODELS),
+            default="jtt",
+            help="Substitution model: jtt, wag, lg (proteins), hky, gtr (DNA) (default: jtt)"
+        )
+
+        parser.add_argument(
+            "--model_parameters",
+            type=json.loads,
+            default=None,
+            help='Model parameters as JSON, e.g. \'{"kappa": 4.0, "frequencies": [0.3, 0.2, 0.2, 0.3]}\' '
+                 'for hky or \'{"rates": [1, 2, 1, 1, 2, 1]}\' for gtr'
+        )
         
         # Algorithm selection
         parser.add_argument(
@@ -77,6 +126,14 @@ Examples:
             default="matrix",
             help="Substitution algorithm: gillespie (exact CTMC) or matrix (exponentiation)"
         )
+
+        parser.add_argument(
+            "--matrix_sampler",
+            choices=list(MATRIX_SAMPLERS),
+            default="dense",
+            help="Sampling of the matrix algorithm: dense (redraw every site), sparse (draw only the "
+                 "sites that change, faster on short branches) or auto (pick per branch) (default: dense)"
+        )
         
         # Simulation parameters
         parser.add_argument(
@@ -132,6 +189,8 @@ Examples:
             action="store_true",
             help="Keep the MSA in memory till the end of the simulation"
         )
+
+        add_run_arguments(parser)
         
         return parser
     
@@ -152,6 +211,14 @@ Examples:
         # Validate number of simulations
         if args.number_of_simulations <= 0:
             raise ValueError("Number of simulations must be positive")
+
+        validate_run_arguments(args)
+
+        # Validate the substitution model and its parameters
+        try:
+            self._get_model(args)
+        except (TypeError, SubstitutionModelError) as e:
+            raise ValueError(f"Invalid parameters for substitution model {args.substitution_model}: {e}")
         
         args.output_directory = pathlib.Path(args.output_directory)
         args.output_directory.mkdir(parents=True, exist_ok=True)
@@ -169,7 +236,9 @@ Examples:
             seed=args.seed,
             substitution_rate=args.substitution_rate,
             enable_substitutions=True,
-            substitution_algorithm=args.algorithm
+            substitution_model=args.substitution_model,
+            substitution_algorithm=args.algorithm,
+            substitution_model_parameters=args.model_parameters
         )
     
     def _init_output_file(self, args: argparse.Namespace) -> None:
@@ -181,107 +250,106 @@ Examples:
             f.write("")
     
     def _merge_with_gap_template_memory(self, args: argparse.Namespace, id: int,
-                                 sequence: np.ndarray, template_msa: Msa=None):
+                                 sequence: np.ndarray, template_msa: Msa=None, gap_index: int = 20) -> np.ndarray:
         if template_msa is None:
-            return
-        sequence_line = template_msa._aligned_sequences[id]
-        for idx,c in enumerate(sequence_line):
-            if c=="-":
-                sequence[idx] = 20
+            return sequence
+        return self._apply_gaps(sequence, template_msa._aligned_sequences[id], gap_index)
 
-    def _merge_with_gap_template(self, args: argparse.Namespace, name: str,
-                                 sequence: np.ndarray):
-            if not (args.output_directory / "_temp_indels.fasta").exists():
-                return
-            with open(args.output_directory / "_temp_indels.fasta", 'r') as indel_file:
-                species_line = indel_file.readline()
-                while name != species_line[1:-1]:
-                    next(indel_file)
-                    species_line = indel_file.readline()
-                    if not species_line:
-                        raise KeyError("Missing species in indel file")
+    def _apply_gaps(self, sequence: np.ndarray, sequence_line: str | bytes, gap_index: int = 20) -> np.ndarray:
+        """
+        Return the aligned row of `sequence` under its template row; `sequence` may be shared.
 
-                sequence_line = indel_file.readline()
-                for idx,c in enumerate(sequence_line):
-                    if c=="-":
-                        sequence[idx] = 20
+        `sequence` either spans the whole MSA, and its gap columns are masked, or
+        (gap-aware simulation) holds only the leaf's residues, which are laid
+        into the template's non-gap columns. Gaps get the code `gap_index`, the
+        number of states of the model.
+        """
+        if isinstance(sequence_line, str):
+            sequence_line = sequence_line.encode()
+        gaps = np.frombuffer(sequence_line.rstrip(b"\n"), dtype=np.uint8) == ord('-')
+        if len(sequence) == len(gaps):
+            return np.where(gaps, gap_index, sequence)
+        row = np.full(len(gaps), gap_index, dtype=np.uint8)
+        row[~gaps] = sequence
+        return row
+
+    def _merge_with_gap_template(self, templates: Optional["_GapTemplateFile"], name: str,
+                                 sequence: np.ndarray, gap_index: int = 20) -> np.ndarray:
+        if templates is None:
+            return sequence
+        return self._apply_gaps(sequence, templates.row(name), gap_index)
 
 
 
 
     
-    def _generate_root_sequence(self, length: int, seed: int) -> List[int]:
-        """Generate random amino acid sequence using JTT equilibrium frequencies."""
-        jtt_model = get_jtt_model()
-        equilibrium_freqs = jtt_model.equilibrium_frequencies
-        
-        # Create RNG with the provided seed
-        rng = np.random.default_rng(seed)
-        
-        # Sample amino acids according to equilibrium frequencies
-        root_sequence = rng.choice(20, size=length, p=equilibrium_freqs)
-        return root_sequence
-    
-    def _simulate_substitutions(self, args: argparse.Namespace, seed: int, template_msa: Msa=None) -> Dict[str, List[str]]:
-        """Run the complete substitution simulation workflow."""
+    def _generate_root_sequence(self, length: int, seed: int, model: ReversibleModel = None) -> List[int]:
+        """Generate a random sequence using the equilibrium frequencies of the model (JTT by default)."""
+        return sample_root_sequence(length, seed, model)
+
+    def _get_model(self, args: argparse.Namespace) -> ReversibleModel:
+        """Return the substitution model selected by the arguments."""
+        return get_model(args.substitution_model, **(args.model_parameters or {}))
+
+    def _simulate_substitutions(self, args: argparse.Namespace, seed: int, template_msa: Msa=None,
+                                node_blocks: Dict[int, list] = None) -> Dict[int, bytes]:
+        """
+        Run the complete substitution simulation workflow.
+
+        With the per-node `node_blocks` of the indel phase, only the sites present
+        at each node are evolved, starting from a root of `original_sequence_length`.
+        """
         # 1. Generate root sequence
-        root_sequence = self._generate_root_sequence(args.original_sequence_length, seed)
+        model = self._get_model(args)
+        with span("root sequence", "substitution"):
+            root_sequence = self._generate_root_sequence(args.original_sequence_length, seed, model)
         
         # 2. Parse phylogenetic tree
-        tree = Tree(args.tree_file)
+        tree = self._get_tree(args.tree_file)
         
         # 3. Create substitution evolver
         evolver = SubstitutionEvolver(
             substitution_rate=args.substitution_rate,
-            seed=seed
+            seed=seed,
+            matrix_sampler=args.matrix_sampler,
+            model=model
         )
         
         # 4. Evolve sequences along tree
         sequences = {}
-        
-        # Add root sequence (if tree has a name for root)
-        # if hasattr(tree, 'name') and tree.name:
-        #     sequences[tree.name] = [index_to_amino_acid(aa) for aa in root_sequence]
-        self.id_to_name = {}
-        # Traverse tree and evolve sequences
-        for idx, node in enumerate(tree.traverse("preorder")):
-            self.id_to_name[idx] = node.name
-            node.references = len(node.children)
-            if node.is_root():
-                # Set root sequence
-                node.sequence = root_sequence
-            else:
-                # Evolve from parent
-                parent_sequence = node.up.sequence
-                branch_length = node.dist
-                
-                # Choose evolution algorithm
-                if args.algorithm == "gillespie":
-                    evolved_sequence = evolver.evolve_branch_substitutions_gillespie(
-                        parent_sequence, branch_length
-                    )
-                else:  # matrix algorithm
-                    evolved_sequence = evolver.evolve_branch_substitutions_jtt(
-                        parent_sequence, branch_length
-                    )
-                
-                node.sequence = evolved_sequence
-                # If this is a leaf node, store the sequence
-                if node.is_leaf():
-                    if args.keep_in_memory:
-                        self._merge_with_gap_template_memory(args, idx, evolved_sequence, template_msa)
-                        sequences[idx] = AMINO_ACID_CHARS[evolved_sequence]
-                    else:
-                        self._merge_with_gap_template(args, node.name, evolved_sequence)
-                        # Add here a function to write directly the sequence while reading the _temp_indel.fasta
-                        # That way, there is now double pass, only a single one.
-                        with open(args.output_directory / TEMP_FILE_NAME, 'a') as f:
-                            f.write(f">{node.name}\n")
-                            f.write(''.join(AMINO_ACID_CHARS[evolved_sequence]))
-                            f.write("\n")
-                node.up.references -= 1
-                if node.up.references == 0:
-                    del node.up.sequence
+        self.id_to_name = {idx: node.name for idx, node in enumerate(tree.traverse("preorder"))}
+        # Without keep_in_memory each row is appended to the output as soon as it
+        # is evolved. The gap template of a leaf comes from the indel MSA when it
+        # is passed here (rendered one row at a time), else from its file.
+        templates = None
+        output = None
+        template_path = args.output_directory / INDEL_TEMPLATE_FILE_NAME
+        try:
+            if not args.keep_in_memory:
+                output = open(args.output_directory / TEMP_FILE_NAME, 'ab')
+                if template_msa is None and template_path.exists():
+                    templates = _GapTemplateFile(template_path)
+            for idx, node, evolved_sequence in evolver.evolve_tree(tree, root_sequence, args.algorithm, node_blocks,
+                                                                   recycle_buffers=True):
+                if args.keep_in_memory:
+                    evolved_sequence = self._merge_with_gap_template_memory(args, idx, evolved_sequence, template_msa,
+                                                                            model.num_states)
+                    sequences[idx] = model.residue_bytes(evolved_sequence)
+                    continue
+                if template_msa is not None:
+                    with span("render row", "msa", node=idx):
+                        template_row = template_msa.pop_row(idx)
+                    evolved_sequence = self._apply_gaps(evolved_sequence, template_row, model.num_states)
+                else:
+                    evolved_sequence = self._merge_with_gap_template(templates, node.name, evolved_sequence,
+                                                                     model.num_states)
+                with span("write row", "io", node=idx):
+                    output.write(b">%s\n%s\n" % (node.name.encode(), model.residue_bytes(evolved_sequence)))
+        finally:
+            if templates is not None:
+                templates.close()
+            if output is not None:
+                output.close()
         # Verify all sequences have equal length
         # self._verify_sequence_lengths(sequences, args.original_sequence_length)
         
@@ -298,7 +366,8 @@ Examples:
                     f"All sequences should have equal length in substitution-only simulation."
                 )
     
-    def _run_single_simulation(self, args: argparse.Namespace, sim_num: int, template_msa: Msa=None) -> Dict[str, Any]:
+    def _run_single_simulation(self, args: argparse.Namespace, sim_num: int, template_msa: Msa=None,
+                               node_blocks: Dict[int, list] = None) -> Dict[str, Any]:
         """Run a single simulation and return results."""
         if args.verbose:
             print(f"Running substitution simulation {sim_num + 1}/{args.number_of_simulations}...")
@@ -310,7 +379,7 @@ Examples:
         start_time = time.perf_counter()
         
         # Run substitution simulation
-        msa = self._simulate_substitutions(args, random_seed, template_msa)
+        msa = self._simulate_substitutions(args, random_seed, template_msa, node_blocks)
         
         end_time = time.perf_counter()
         runtime = end_time - start_time
@@ -325,6 +394,8 @@ Examples:
                 "original_sequence_length": args.original_sequence_length,
                 "seed": random_seed
             },
+            "msa_length": args.original_sequence_length,
+            "number_of_leaves": len(self._get_tree(args.tree_file)),
             "msa": msa
         }
         
@@ -332,8 +403,7 @@ Examples:
             print(f"  Completed in {runtime:.3f} seconds")
         
         return results
-    
-    
+
     def _save_multiple_files(self, result: Dict[str, Any], args: argparse.Namespace, output_dir: pathlib.Path) -> None:
         """Save each simulation to a separate file."""
         sim_num = result["simulation_number"]
@@ -357,7 +427,7 @@ Examples:
                 msa = result["msa"]
                 for species_name, sequence in msa.items():
                     f.write(f">{self.id_to_name[species_name]}\n")
-                    f.write(''.join(sequence))
+                    f.write(sequence.decode("ascii"))
                     f.write("\n")
 
             f.write(f"# Substitution Simulation {result['simulation_number']}\n")
@@ -372,15 +442,16 @@ Examples:
         if args.verbose:
             print(f"Saved {len(result)} simulations to {temp_path}")
     
-    def _write_fasta(self, msa: Dict[str, List[str]], filename: pathlib.Path) -> None:
+    def _write_fasta(self, msa: Dict[int, bytes], filename: pathlib.Path) -> None:
         """Write MSA in FASTA format."""
         with open(filename, 'w') as f:
             for species_name, sequence in msa.items():
                 f.write(f">{self.id_to_name[species_name]}\n")
-                f.write("".join(sequence))
+                f.write(sequence.decode("ascii"))
                 f.write("\n")
     
-    def _print_benchmark_results(self, results: List[Dict[str, Any]], args: argparse.Namespace) -> None:
+    def _print_benchmark_results(self, results: List[Dict[str, Any]], args: argparse.Namespace,
+                                 wall_time: float) -> None:
         """Print benchmarking statistics."""
         runtimes = [r["runtime_seconds"] for r in results]
         
@@ -399,6 +470,9 @@ Examples:
         if len(runtimes) > 1:
             import statistics
             print(f"Std deviation: {statistics.stdev(runtimes):.3f}s")
+        print("-"*50)
+        print_worker_utilization(results, wall_time)
+        print_memory_profiles(results)
         print("="*50)
     
     def run(self) -> None:
@@ -414,38 +488,14 @@ Examples:
                 print(f"Output directory: {args.output_directory}")
             
             # Run simulations
-            results = []
-            total_start_time = time.perf_counter()
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            self._init_output_file(args)
-            combined_file_path = args.output_directory / f"combined_simulations_{timestamp}.fasta"
-
-            for i in range(args.number_of_simulations):
-                result = self._run_single_simulation(args, i)
-                results.append(result)
-                if args.output_type == "multiple_files":
-                    self._save_multiple_files(result, args, args.output_directory)
-                    self._init_output_file(args)
-
-                elif args.output_type == "single_file":
-                    self._save_single_file(result, args, args.output_directory)
-                
-            
-            if args.output_type == "single_file":
-                (args.output_directory / TEMP_FILE_NAME).rename(combined_file_path)
-            (args.output_directory / TEMP_FILE_NAME).unlink(missing_ok=True)
-
-                
-            
-            total_end_time = time.perf_counter()
+            results, wall_time = self._run_replicates(args)
                         
             # Print benchmark results if requested
-            if args.benchmark or args.verbose:
-                self._print_benchmark_results(results, args)
+            if (args.benchmark or args.verbose) and results:
+                self._print_benchmark_results(results, args, wall_time)
             
             if args.verbose:
-                print(f"\nAll simulations completed in {total_end_time - total_start_time:.3f}s")
+                print(f"\nAll simulations completed in {wall_time:.3f}s")
                 print(f"Results saved to: {args.output_directory}")
         
         except Exception as e:
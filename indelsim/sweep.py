@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+In-process parameter sweeps.
+
+A sweep runs every point of a grid over insertion/deletion rates, the indel
+length parameter, the root length, the branch lengths and the indel engine, and
+reports one tidy row per replicate:
+
+    indel-sweep --tree_file tree.newick --engines list tree \\
+                --root_lengths 500 1000 --branch_scales 0.5 1 2 \\
+                --replicates 3 --output sweep.csv
+
+Unlike driving the command-line tools once per grid point, the tree is parsed
+once per process and only rescaled between points, the substitution model and
+its transition-matrix cache live for the whole sweep, and timings are measured
+directly instead of being scraped from stdout.
+"""
+
+import argparse
+import csv
+import itertools
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from ete3 import Tree
+
+from indelsim.api import ENGINE_TYPES, simulate
+from indelsim.classes.sim_config import BUDGETS, SimConfiguration
+
+# Grid axes and the value used when an axis is left out of the grid.
+# `branch_length` replaces every branch length of the tree when it is not None,
+# `branch_scale` multiplies the (original or replaced) branch lengths.
+SWEEP_AXES: Dict[str, List[Any]] = {
+    "engine": ["tree"],
+    "insertion_rate": [0.03],
+    "deletion_rate": [0.09],
+    "length_parameter": [2.0],
+    "root_length": [1000],
+    "branch_scale": [1.0],
+    "branch_length": [None],
+}
+
+
+def expand_grid(grid: Dict[str, Iterable[Any]]) -> List[Dict[str, Any]]:
+    """Return every combination of the grid values, in a fixed axis order."""
+    unknown = set(grid) - set(SWEEP_AXES)
+    if unknown:
+        raise ValueError(f"Unknown sweep axes {sorted(unknown)}, expected some of {list(SWEEP_AXES)}")
+    axes = {axis: list(grid.get(axis, default)) for axis, default in SWEEP_AXES.items()}
+    for engine in axes["engine"]:
+        if engine is not None and engine not in ENGINE_TYPES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {sorted(ENGINE_TYPES)} or None")
+    return [dict(zip(axes, values)) for values in itertools.product(*axes.values())]
+
+
+class _ScalableTree:
+    """A parsed tree whose branch lengths are rewritten in place between sweep points."""
+
+    def __init__(self, tree_source: str, newick_format: int):
+        self.tree = Tree(tree_source, format=newick_format)
+        self._nodes = [node for node in self.tree.traverse("preorder") if not node.is_root()]
+        self._original_lengths = [node.dist for node in self._nodes]
+        self._scaling = (1.0, None)
+
+    def get(self, branch_scale: float, branch_length: Optional[float]) -> Tree:
+        if (branch_scale, branch_length) != self._scaling:
+            for node, original in zip(self._nodes, self._original_lengths):
+                node.dist = (original if branch_length is None else branch_length) * branch_scale
+            self._scaling = (branch_scale, branch_length)
+        return self.tree
+
+
+# Tree of the current process, parsed once by `_init_worker` (or by the serial
+# sweep) and shared by all the points this process runs.
+_TREE: List[_ScalableTree] = []
+
+
+def _init_worker(tree_source: str, newick_format: int) -> None:
+    _TREE[:] = [_ScalableTree(tree_source, newick_format)]
+
+
+def _run_point(point: Dict[str, Any], settings: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Simulate all replicates of one grid point and return their rows."""
+    tree = _TREE[0].get(point["branch_scale"], point["branch_length"])
+    config = SimConfiguration(
+        original_sequence_length=point["root_length"],
+        indel_length_alpha=point["length_parameter"],
+        indel_truncated_length=settings["indel_truncated_length"],
+        rate_ins=point["insertion_rate"],
+        rate_del=point["deletion_rate"],
+        deletion_extra_edge_length=settings["deletion_extra_edge_length"],
+        seed=settings["seed"],
+        enable_substitutions=settings["enable_substitutions"],
+        substitution_rate=settings["substitution_rate"],
+        substitution_algorithm=settings["substitution_algorithm"],
+        **settings["budgets"],
+    )
+
+    rows = []
+    for result in simulate(tree, config, n=settings["replicates"], engine=point["engine"]):
+        rows.append({
+            **point,
+            "simulation_number": result["simulation_number"],
+            "seed": result["seed"],
+            "msa_length": result["msa_length"],
+            "number_of_leaves": len(result["msa"]) if result["msa"] is not None else None,
+            "rejected": result["rejected"]["budget"] if result["rejected"] else "",
+            "indel_seconds": result["indel_runtime_seconds"],
+            "substitution_seconds": result["substitution_runtime_seconds"],
+            "total_seconds": result["runtime_seconds"],
+        })
+    return rows
+
+
+def run_sweep(tree: Union[Path, str, Tree], grid: Dict[str, Iterable[Any]], replicates: int = 1, seed: int = 42,
+              enable_substitutions: bool = False, substitution_rate: float = 1.0,
+              substitution_algorithm: str = "matrix", indel_truncated_length: int = 50,
+              deletion_extra_edge_length: int = 49, budgets: Optional[Dict[str, int]] = None,
+              workers: int = 1) -> Iterator[Dict[str, Any]]:
+    """
+    Run a parameter sweep and yield one row per replicate, in grid order.
+
+    Args:
+        tree: Newick file, newick string or parsed ete3 tree
+        grid: Values per sweep axis (see SWEEP_AXES); missing axes use their default
+        replicates: Replicates per grid point, seeded ``seed + i`` like the CLIs
+        seed: Base random seed of every grid point
+        enable_substitutions: Also simulate substitutions on top of the indels
+        substitution_rate: Substitution rate multiplier
+        substitution_algorithm: "matrix" or "gillespie"
+        indel_truncated_length: Maximum indel length
+        deletion_extra_edge_length: Extra positions before the sequence start for deletions
+        budgets: Replicate budgets passed to SimConfiguration (``max_sequence_length``,
+            ``max_events_per_branch``, ``max_msa_length``, ``max_total_events``);
+            rejected replicates get the exceeded budget in their ``rejected`` column
+        workers: Number of worker processes the grid points are spread over
+    """
+    points = expand_grid(grid)
+    if replicates < 1:
+        raise ValueError("Number of replicates must be positive")
+    if workers < 1:
+        raise ValueError("Number of workers must be positive")
+    if not enable_substitutions and None in (point["engine"] for point in points):
+        raise ValueError("Nothing to simulate: engine None requires substitutions")
+
+    # Parsed trees are handed to workers as newick that keeps internal node names and exact branch lengths
+    tree_source, newick_format = ((tree.write(format=1, dist_formatter="%0.17g"), 1) if isinstance(tree, Tree)
+                                  else (str(tree), 0))
+    settings = {
+        "replicates": replicates,
+        "seed": seed,
+        "enable_substitutions": enable_substitutions,
+        "substitution_rate": substitution_rate,
+        "substitution_algorithm": substitution_algorithm,
+        "indel_truncated_length": indel_truncated_length,
+        "deletion_extra_edge_length": deletion_extra_edge_length,
+        "budgets": budgets or {},
+    }
+
+    if workers == 1:
+        _init_worker(tree_source, newick_format)
+        for point in points:
+            yield from _run_point(point, settings)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(tree_source, newick_format)) as pool:
+        for rows in pool.map(_run_point, points, itertools.repeat(settings)):
+            yield from rows
+
+
+def write_rows(rows: Iterable[Dict[str, Any]], output_path: Path) -> int:
+    """
+    Write sweep rows to CSV, or to Parquet when `output_path` ends in ``.parquet``.
+
+    CSV rows are streamed to disk as they arrive. Parquet output needs pandas with
+    a Parquet engine (pyarrow or fastparquet) installed.
+
+    Returns:
+        Number of rows written
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if output_path.suffix == ".parquet":
+        import pandas as pd
+        df = pd.DataFrame(list(rows))
+        df.to_parquet(output_path, index=False)
+        return len(df)
+
+    count = 0
+    with open(output_path, 'w', newline='') as f:
+        writer = None
+        for row in rows:
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(row))
+                writer.writeheader()
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def _create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Run a parameter sweep of indel (and substitution) simulations in-process",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Engines against root length on a tree with all branches set to 0.1
+  indel-sweep --tree_file tree.newick --engines naive list tree --root_lengths 100 1000 5000
+              --branch_lengths 0.1 --replicates 3 --output sweep.csv
+
+  # Rate grid with substitutions, spread over 4 processes
+  indel-sweep --tree_file tree.newick --insertion_rates 0.01 0.03 --deletion_rates 0.01 0.09
+              --substitutions --workers 4 --output sweep.parquet
+        """
+    )
+    parser.add_argument("--tree_file", type=str, required=True, help="Path to Newick format phylogenetic tree file")
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINE_TYPES), default=SWEEP_AXES["engine"],
+                        help="Indel engines to sweep (default: tree)")
+    parser.add_argument("--insertion_rates", nargs="+", type=float, default=SWEEP_AXES["insertion_rate"],
+                        help="Insertion rates to sweep (default: 0.03)")
+    parser.add_argument("--deletion_rates", nargs="+", type=float, default=SWEEP_AXES["deletion_rate"],
+                        help="Deletion rates to sweep (default: 0.09)")
+    parser.add_argument("--length_parameters", nargs="+", type=float, default=SWEEP_AXES["length_parameter"],
+                        help="Indel length distribution parameters to sweep (default: 2.0)")
+    parser.add_argument("--root_lengths", nargs="+", type=int, default=SWEEP_AXES["root_length"],
+                        help="Root sequence lengths to sweep (default: 1000)")
+    parser.add_argument("--branch_scales", nargs="+", type=float, default=SWEEP_AXES["branch_scale"],
+                        help="Factors multiplying all branch lengths (default: 1.0)")
+    parser.add_argument("--branch_lengths", nargs="+", type=float, default=SWEEP_AXES["branch_length"],
+                        help="Fixed lengths replacing all branch lengths (default: keep the tree's lengths)")
+    parser.add_argument("--replicates", type=int, default=1, help="Replicates per grid point (default: 1)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for reproducibility (default: 42)")
+    parser.add_argument("--indel_length_truncation", type=int, default=50, help="Maximum indel length (default: 50)")
+    parser.add_argument("--deletion_extra_edge_length", type=int, default=49,
+                        help="Extra positions before sequence start for deletion events (default: 49)")
+    parser.add_argument("--substitutions", action="store_true", help="Also simulate substitutions (JTT)")
+    parser.add_argument("--substitution_rate", type=float, default=1.0,
+                        help="Substitution rate multiplier (default: 1.0)")
+    parser.add_argument("--algorithm", choices=["gillespie", "matrix"], default="matrix",
+                        help="Substitution algorithm (default: matrix)")
+    parser.add_argument("--max_sequence_length", type=int, default=None,
+                        help="Reject replicates in which any sequence grows beyond this length")
+    parser.add_argument("--max_events_per_branch", type=int, default=None,
+                        help="Reject replicates with more indel events on a single branch")
+    parser.add_argument("--max_msa_length", type=int, default=None,
+                        help="Reject replicates whose MSA would be longer")
+    parser.add_argument("--max_total_events", type=int, default=None,
+                        help="Reject replicates with more indel events in total")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes (default: 1)")
+    parser.add_argument("--output", type=str, default="sweep.csv",
+                        help="Output table, CSV or .parquet (default: sweep.csv)")
+    return parser
+
+
+def main():
+    args = _create_parser().parse_args()
+    grid = {
+        "engine": args.engines,
+        "insertion_rate": args.insertion_rates,
+        "deletion_rate": args.deletion_rates,
+        "length_parameter": args.length_parameters,
+        "root_length": args.root_lengths,
+        "branch_scale": args.branch_scales,
+        "branch_length": args.branch_lengths,
+    }
+    try:
+        if not Path(args.tree_file).exists():
+            raise FileNotFoundError(f"Tree file not found: {args.tree_file}")
+        rows = run_sweep(args.tree_file, grid, replicates=args.replicates, seed=args.seed,
+                         enable_substitutions=args.substitutions, substitution_rate=args.substitution_rate,
+                         substitution_algorithm=args.algorithm,
+                         indel_truncated_length=args.indel_length_truncation,
+                         deletion_extra_edge_length=args.deletion_extra_edge_length,
+                         budgets={budget: getattr(args, budget) for budget in BUDGETS
+                                  if getattr(args, budget) is not None},
+                         workers=args.workers)
+        count = write_rows(rows, Path(args.output))
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Wrote {count} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
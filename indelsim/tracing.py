@@ -0,0 +1,137 @@
+"""
+Lightweight timing spans, exported in the Chrome trace event format.
+
+The simulation code marks its phases with ``span``:
+
+    with span("generate sequence", "indel", node=node.id):
+        ...
+
+Nothing is recorded until ``start_tracing`` is called: ``span`` then returns a
+shared no-op context manager, so instrumented code pays one global lookup per
+span. While tracing, every span becomes a complete ("X") event of the calling
+thread. Spans nest, and the trace written by ``Tracer.write`` can be opened in
+chrome://tracing or https://ui.perfetto.dev. While a memory profile is active
+(``start_memory_profile``), spans also account the memory of their phase, see
+``indelsim.memory``.
+"""
+
+import json
+import os
+import pathlib
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, ContextManager, Dict, Iterator, List, Optional
+
+from indelsim.memory import MemoryProfile
+
+__all__ = ["Tracer", "span", "start_tracing", "stop_tracing", "start_memory_profile", "stop_memory_profile",
+           "memory_profile"]
+
+_NO_SPAN = nullcontext()
+_TRACER: "Tracer | None" = None
+_MEMORY: "MemoryProfile | None" = None
+
+
+class Tracer:
+    """Collects the spans of this process."""
+    events: List[Dict[str, Any]]
+
+    def __init__(self):
+        self.events = []
+        self._origin_ns = time.perf_counter_ns()
+        self._pid = os.getpid()
+        self._thread_names: Dict[int, str] = {}
+
+    @contextmanager
+    def span(self, name: str, category: str, args: Dict[str, Any]) -> Iterator[None]:
+        start_ns = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end_ns = time.perf_counter_ns()
+            tid = threading.get_ident()
+            if tid not in self._thread_names:
+                self._thread_names[tid] = threading.current_thread().name
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start_ns - self._origin_ns) / 1000,
+                "dur": (end_ns - start_ns) / 1000,
+                "pid": self._pid,
+                "tid": tid,
+            }
+            if args:
+                event["args"] = args
+            # list.append is atomic, spans of pipeline threads need no lock
+            self.events.append(event)
+
+    def write(self, path: pathlib.Path | str) -> pathlib.Path:
+        """Write the collected spans as a Chrome trace JSON file."""
+        path = pathlib.Path(path)
+        metadata = [{"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+                    for tid, name in self._thread_names.items()]
+        with open(path, 'w') as f:
+            json.dump({"traceEvents": metadata + self.events, "displayTimeUnit": "ms"}, f)
+        return path
+
+
+@contextmanager
+def _profiled_span(memory: ContextManager[None], timing: ContextManager[None]) -> Iterator[None]:
+    # The memory bookkeeping stays out of the timed span
+    with memory, timing:
+        yield
+
+
+def span(name: str, category: str = "sim", **args: Any) -> ContextManager[None]:
+    """Time the enclosed block as span `name` if tracing is on, account its memory if profiling, else do nothing."""
+    tracer, memory = _TRACER, _MEMORY
+    if tracer is None:
+        return _NO_SPAN if memory is None else memory.phase(name)
+    if memory is None:
+        return tracer.span(name, category, args)
+    return _profiled_span(memory.phase(name), tracer.span(name, category, args))
+
+
+def start_tracing() -> Tracer:
+    """Start recording spans of this process into a new tracer and return it."""
+    global _TRACER
+    _TRACER = Tracer()
+    return _TRACER
+
+
+def stop_tracing() -> Optional[Tracer]:
+    """Stop recording spans and return the tracer that collected them, if any."""
+    global _TRACER
+    tracer, _TRACER = _TRACER, None
+    return tracer
+
+
+def start_memory_profile() -> MemoryProfile:
+    """Start accounting the memory of every span into a new profile and return it."""
+    global _MEMORY
+    _MEMORY = MemoryProfile()
+    return _MEMORY
+
+
+def stop_memory_profile() -> Optional[MemoryProfile]:
+    """Stop accounting memory and return the closed profile, if any."""
+    global _MEMORY
+    memory, _MEMORY = _MEMORY, None
+    if memory is not None:
+        memory.close()
+    return memory
+
+
+@contextmanager
+def memory_profile(enabled: bool = True) -> Iterator[Optional[MemoryProfile]]:
+    """Profile the memory of the spans of the enclosed block; yields the profile, or None if not `enabled`."""
+    if not enabled:
+        yield None
+        return
+    memory = start_memory_profile()
+    try:
+        yield memory
+    finally:
+        stop_memory_profile()
@@ -18,13 +18,19 @@ def random_zipf(a: float, max_int: int) -> int:
             return int(X)
 
 
-def calc_trunc_zipf(alpha: float, max_val: int) -> int:
+def calc_trunc_zipf(alpha: float, max_val: int, rng: np.random.Generator | None = None) -> int:
+    zipf = np.random.zipf if rng is None else rng.zipf
     while True:
-        z: int = np.random.zipf(alpha)
+        z: int = zipf(alpha)
         if z <= max_val:
             return z
 
 
+def branch_rng(seed: int, node_id: int) -> np.random.Generator:
+    """Return the random stream of one branch, which depends only on the seed and the node id."""
+    return np.random.default_rng([seed, node_id])
+
+
 # def plot_distribution(distribution_list: list[float], bins: int, density: bool, file_name: str,
 #                       measure: str):  # task 1 / st 5
 #     fig, ax = plt.subplots()
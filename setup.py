@@ -39,6 +39,12 @@ setup(
             "indel-simulator=indelsim.indel_simulator:main",
             "substitution-simulator=indelsim.substitution_simulator:main",
             "msa-simulator=indelsim.combined_simulator:main",
+            "indel-sweep=indelsim.sweep:main",
+            "indel-bench-engines=indelsim.bench.engines:main",
+            "indel-bench-scaling=indelsim.bench.scaling:main",
+            "indel-bench=indelsim.bench.harness:main",
+            "indel-bench-complexity=indelsim.bench.complexity:main",
+            "indel-bench-fuzz=indelsim.bench.fuzz:main",
         ],
     },
 )
@@ -0,0 +1,46 @@
+import itertools
+import types
+
+from ete3 import Tree
+
+from indelsim import simulate
+from indelsim.classes.sim_config import SimConfiguration
+from indelsim.classes.simulation import Simulation
+
+
+def make_config(enable_substitutions: bool = False) -> SimConfiguration:
+    return SimConfiguration(
+        original_sequence_length=150, indel_length_alpha=2.0, indel_truncated_length=50,
+        deletion_extra_edge_length=49, rate_ins=0.03, rate_del=0.09, seed=11,
+        enable_substitutions=enable_substitutions, substitution_algorithm="matrix")
+
+
+def test_simulate_is_lazy_and_reuses_seeds_of_cli(tree_file):
+    results = simulate(tree_file, make_config(), n=1000, engine="list")
+    assert isinstance(results, types.GeneratorType)
+    second = list(itertools.islice(results, 2))[1]
+    assert second["simulation_number"] == 2 and second["seed"] == 12
+
+    config = make_config()
+    config.random_seed = 12
+    simulation = Simulation(str(tree_file), config)
+    simulation.msa_from_blocklist()
+    simulation.msa.compute_msa()
+    expected = {simulation.id_to_name[key]: row for key, row in simulation.msa._aligned_sequences.items()}
+    assert second["msa"] == expected
+
+
+def test_substitutions_follow_gap_template(tree_file):
+    tree = Tree(str(tree_file))
+    indels = next(simulate(tree, make_config(), engine="tree"))
+    combined = next(simulate(tree, make_config(enable_substitutions=True), engine="tree"))
+    assert combined["msa_length"] == indels["msa_length"]
+    for name, template in indels["msa"].items():
+        row = combined["msa"][name]
+        assert [c == "-" for c in row] == [c == "-" for c in template]
+
+
+def test_substitution_only_keeps_root_length(tree_file):
+    result = next(simulate(tree_file, make_config(enable_substitutions=True), engine=None))
+    assert {len(row) for row in result["msa"].values()} == {150}
+    assert "-" not in "".join(result["msa"].values())
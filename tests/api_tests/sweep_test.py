@@ -0,0 +1,42 @@
+import pytest
+from ete3 import Tree
+
+from indelsim import sweep
+from indelsim.sweep import expand_grid, run_sweep, write_rows
+
+GRID = {"engine": ["list", "tree"], "root_length": [80, 120], "branch_scale": [0.5, 2.0]}
+
+
+def test_expand_grid_fills_defaults_and_rejects_unknown_axes():
+    points = expand_grid(GRID)
+    assert len(points) == 8
+    assert points[0]["insertion_rate"] == 0.03 and points[0]["branch_length"] is None
+    with pytest.raises(ValueError):
+        expand_grid({"branch_lenght": [0.1]})
+
+
+def test_sweep_rows_do_not_depend_on_workers(tmp_path, tree_file):
+    serial = list(run_sweep(tree_file, GRID, replicates=2))
+    pooled = list(run_sweep(tree_file, GRID, replicates=2, workers=2))
+    assert len(serial) == 16
+    keys = ("engine", "root_length", "branch_scale", "seed", "msa_length")
+    assert [[row[key] for key in keys] for row in serial] == [[row[key] for key in keys] for row in pooled]
+    # Both engines simulate the same alignment for the same seed
+    assert [row["msa_length"] for row in serial[:8]] == [row["msa_length"] for row in serial[8:]]
+
+    assert write_rows(serial, tmp_path / "sweep.csv") == 16
+    assert (tmp_path / "sweep.csv").read_text().splitlines()[0].startswith("engine,insertion_rate")
+
+
+def test_fixed_branch_length_replaces_tree_lengths(tree_file):
+    [scaled] = run_sweep(tree_file, {"branch_length": [0.0], "root_length": [50]})
+    assert scaled["msa_length"] == 50
+
+
+def test_parsed_tree_keeps_exact_branch_lengths(tree_file):
+    tree = Tree(str(tree_file))
+    for idx, node in enumerate(tree.traverse("preorder")):
+        node.dist = 0.0123456789123 * (idx % 7 + 1)
+
+    list(run_sweep(tree, {"root_length": [50]}))
+    assert sweep._TREE[0]._original_lengths == [node.dist for node in tree.traverse("preorder")][1:]
@@ -0,0 +1,61 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from indelsim.combined_simulator import CombinedSimulatorCLI
+from indelsim.indel_simulator import IndelSimulatorCLI
+
+
+def run_with_report(run_cli, cli_class, tmp_path: Path, *extra_args: str) -> tuple[dict, list[dict]]:
+    run_cli(cli_class, tmp_path / "out", "--original_sequence_length", "150", "--number_of_simulations", "3",
+            "--insertion_rate", "0.03", "--deletion_rate", "0.09",
+            "--benchmark_json", str(tmp_path / "bench.json"), *extra_args)
+
+    summary = json.loads((tmp_path / "bench.json").read_text())
+    lines = [json.loads(line) for line in (tmp_path / "bench.jsonl").read_text().splitlines()]
+    return summary, lines
+
+
+def test_combined_benchmark_json(tmp_path, run_cli):
+    summary, lines = run_with_report(run_cli, CombinedSimulatorCLI, tmp_path, "--type", "tree")
+
+    assert summary["tool"] == "combined"
+    assert summary["number_of_replicates"] == 3 and summary["rejected_replicates"] == 0
+    assert {"hostname", "cpu_count", "python", "numpy"} <= set(summary["host"])
+    assert summary["parameters"]["type"] == "tree" and summary["parameters"]["jobs"] == 1
+    assert summary["replicates"] == lines
+
+    for sim_num, record in enumerate(lines):
+        assert record["simulation_number"] == sim_num + 1
+        assert record["indel_config"]["seed"] == 42 + sim_num
+        assert record["number_of_leaves"] == 40
+        assert record["msa_length"] >= 150
+        assert record["total_events"] > 0 and record["total_blocks"] > 0
+        assert "final_msa" not in record
+
+
+def test_indel_benchmark_json_has_no_blocks_for_naive_engine(tmp_path, run_cli):
+    summary, lines = run_with_report(run_cli, IndelSimulatorCLI, tmp_path, "--type", "naive")
+    assert summary["tool"] == "indel"
+    assert [record["total_blocks"] for record in lines] == [None, None, None]
+    assert all(record["total_events"] > 0 for record in lines)
+
+
+def test_resumed_benchmark_json_covers_the_interrupted_replicates(tmp_path, monkeypatch, run_cli):
+    original = IndelSimulatorCLI._run_and_save_replicate
+
+    def crash_at_third_replicate(self, args, sim_num):
+        if sim_num == 2:
+            raise RuntimeError("simulated crash")
+        return original(self, args, sim_num)
+
+    with monkeypatch.context() as crash:
+        crash.setattr(IndelSimulatorCLI, "_run_and_save_replicate", crash_at_third_replicate)
+        with pytest.raises(SystemExit):
+            run_with_report(run_cli, IndelSimulatorCLI, tmp_path, "--type", "tree")
+
+    summary, lines = run_with_report(run_cli, IndelSimulatorCLI, tmp_path, "--type", "tree", "--resume")
+    assert summary["number_of_replicates"] == 3 and summary["resumed_replicates"] == 2
+    assert [record["simulation_number"] for record in summary["replicates"]] == [1, 2, 3]
+    assert summary["replicates"] == lines
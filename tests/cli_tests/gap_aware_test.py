@@ -0,0 +1,74 @@
+from pathlib import Path
+
+import pytest
+
+from indelsim.classes.msa import Msa
+from indelsim.classes.sim_config import SimConfiguration
+from indelsim.classes.simulation import Simulation
+from indelsim.combined_simulator import CombinedSimulatorCLI
+
+
+def run_combined(run_cli, output_dir: Path, *extra_args: str) -> dict[str, str]:
+    run_cli(CombinedSimulatorCLI, output_dir, "--original_sequence_length", "150", "--number_of_simulations", "3",
+            "--insertion_rate", "0.03", "--deletion_rate", "0.09", *extra_args)
+
+    [path] = output_dir.glob("combined_simulations_*.fasta")
+    rows, name = {}, None
+    for line in path.read_text().splitlines():
+        if line.startswith(">"):
+            name = line[1:]
+        elif line and not line.startswith("#"):
+            rows[f"{len(rows)}:{name}"] = line
+    return rows
+
+
+@pytest.mark.parametrize("engine", ["list", "tree"])
+@pytest.mark.parametrize("keep_in_memory", [False, True])
+def test_gap_aware_keeps_the_indel_template(tmp_path, run_cli, engine, keep_in_memory):
+    extra = ("--type", engine) + (("--keep_in_memory",) if keep_in_memory else ())
+    full = run_combined(run_cli, tmp_path / "full", *extra)
+    gap_aware = run_combined(run_cli, tmp_path / "gap_aware", *extra, "--gap_aware")
+
+    assert full.keys() == gap_aware.keys()
+    for key, row in full.items():
+        assert len(gap_aware[key]) == len(row)
+        assert [c == "-" for c in gap_aware[key]] == [c == "-" for c in row]
+
+
+def test_gap_aware_rejects_naive_engine(tmp_path, run_cli):
+    with pytest.raises(SystemExit):
+        run_combined(run_cli, tmp_path, "--type", "naive", "--gap_aware")
+
+
+@pytest.mark.parametrize("engine", ["naive", "list", "tree"])
+def test_streamed_rows_match_in_memory_rows(tmp_path, monkeypatch, run_cli, engine):
+    in_memory = run_combined(run_cli, tmp_path / "in_memory", "--type", engine, "--keep_in_memory")
+    # Each row is written once, the indel MSA never goes through a file
+    monkeypatch.setattr(Msa, "compute_msa_to_disk", lambda self, path: pytest.fail("indel MSA written to disk"))
+    streamed = run_combined(run_cli, tmp_path / "streamed", "--type", engine)
+
+    assert streamed == in_memory
+
+
+@pytest.mark.parametrize("method", ["msa_from_naive", "msa_from_blocklist", "msa_from_blocktree"])
+def test_every_rendering_of_the_rows_agrees(tmp_path, tree_file, method):
+    def simulated_msa() -> Msa:
+        config = SimConfiguration(original_sequence_length=150, indel_length_alpha=2.0, indel_truncated_length=50,
+                                  rate_ins=0.03, rate_del=0.09, deletion_extra_edge_length=49, seed=4)
+        simulation = Simulation(str(tree_file), config)
+        getattr(simulation, method)()
+        return simulation.msa
+
+    in_memory = simulated_msa()
+    in_memory.compute_msa()
+    rows = {in_memory._id_to_name[node_id]: row for node_id, row in in_memory._aligned_sequences.items()}
+
+    on_disk = simulated_msa()
+    on_disk.compute_msa_to_disk(tmp_path / "msa.fasta")
+    lines = (tmp_path / "msa.fasta").read_text().splitlines()
+    assert dict(zip([name[1:] for name in lines[::2]], lines[1::2])) == rows
+
+    streamed = simulated_msa()
+    streamed.index_rows()
+    name_to_id = {name: node_id for node_id, name in streamed._id_to_name.items()}
+    assert {name: streamed.pop_row(name_to_id[name]) for name in rows} == rows
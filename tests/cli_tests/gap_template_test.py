@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+from indelsim.substitution_simulator import SubstitutionSimulatorCLI, _GapTemplateFile
+
+
+def test_gap_template_rows_are_found_by_name(tmp_path):
+    path = tmp_path / "_temp_indels.fasta"
+    path.write_text(">A\nXX-X\n>Bb\n--XX\n>C\nX--X\n")
+    templates = _GapTemplateFile(path)
+    try:
+        # Any order, and repeatedly
+        assert templates.row("C") == b"X--X\n"
+        assert templates.row("A") == b"XX-X\n"
+        assert templates.row("C") == b"X--X\n"
+        with pytest.raises(KeyError):
+            templates.row("D")
+
+        cli = SubstitutionSimulatorCLI()
+        merged = cli._merge_with_gap_template(templates, "Bb", np.array([1, 2, 3, 4], dtype=np.uint8))
+        assert merged.tolist() == [20, 20, 3, 4]
+    finally:
+        templates.close()
@@ -0,0 +1,33 @@
+from pathlib import Path
+
+from indelsim.indel_simulator import IndelSimulatorCLI
+from indelsim.substitution_simulator import SubstitutionSimulatorCLI
+
+RUN_ARGS = ("--original_sequence_length", "150", "--number_of_simulations", "4")
+
+
+def read_outputs(output_dir: Path) -> dict[str, list[str]]:
+    outputs = {}
+    for path in sorted(output_dir.glob("*.fasta")):
+        name = "combined" if path.name.startswith("combined_simulations_") else path.name
+        outputs[name] = [line for line in path.read_text().splitlines() if not line.startswith("# Runtime")]
+    return outputs
+
+
+def test_indel_single_file_parallel_matches_serial(tmp_path, run_cli):
+    indel_args = ("--type", "tree", "--insertion_rate", "0.03", "--deletion_rate", "0.09")
+    run_cli(IndelSimulatorCLI, tmp_path / "serial", *RUN_ARGS, *indel_args)
+    run_cli(IndelSimulatorCLI, tmp_path / "parallel", *RUN_ARGS, *indel_args, "--jobs", "3")
+    serial = read_outputs(tmp_path / "serial")
+    assert list(serial) == ["combined"]
+    assert serial == read_outputs(tmp_path / "parallel")
+
+
+def test_substitution_multiple_files_parallel_matches_serial(tmp_path, run_cli):
+    run_cli(SubstitutionSimulatorCLI, tmp_path / "serial", *RUN_ARGS, "--output_type", "multiple_files")
+    run_cli(SubstitutionSimulatorCLI, tmp_path / "parallel", *RUN_ARGS, "--output_type", "multiple_files",
+            "--jobs", "2")
+    serial = read_outputs(tmp_path / "serial")
+    assert len(serial) == 4
+    assert serial == read_outputs(tmp_path / "parallel")
+    assert not list((tmp_path / "parallel").glob("_replicate_*"))
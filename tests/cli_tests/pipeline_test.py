@@ -0,0 +1,48 @@
+from pathlib import Path
+
+import pytest
+
+from indelsim.combined_simulator import CombinedSimulatorCLI
+from indelsim.pipeline import ReplicatePipeline
+
+
+def run_combined(run_cli, output_dir: Path, *extra_args: str) -> dict[str, list[str]]:
+    run_cli(CombinedSimulatorCLI, output_dir, "--original_sequence_length", "150", "--number_of_simulations", "4",
+            "--type", "tree", "--insertion_rate", "0.03", "--deletion_rate", "0.09", *extra_args)
+
+    outputs = {}
+    for path in sorted(output_dir.glob("*.fasta")):
+        name = "combined" if path.name.startswith("combined_simulations_") else path.name
+        outputs[name] = [line for line in path.read_text().splitlines() if "Runtime:" not in line]
+    return outputs
+
+
+@pytest.mark.parametrize("output_type", ["single_file", "multiple_files"])
+@pytest.mark.parametrize("keep_in_memory", [False, True])
+def test_pipelined_run_matches_serial_run(tmp_path, run_cli, output_type, keep_in_memory):
+    extra = ("--output_type", output_type) + (("--keep_in_memory",) if keep_in_memory else ())
+    serial = run_combined(run_cli, tmp_path / "serial", *extra)
+    pipelined = run_combined(run_cli, tmp_path / "pipelined", *extra, "--pipeline", "--queue_size", "1")
+
+    assert serial and pipelined == serial
+    assert not list((tmp_path / "pipelined").glob("_replicate_*"))
+
+
+def test_pipeline_keeps_order_and_counts_stages():
+    pipeline = ReplicatePipeline([("double", lambda x: 2 * x), ("shift", lambda x: x + 1)], queue_size=1)
+    assert list(pipeline.run(range(20))) == [2 * x + 1 for x in range(20)]
+    assert [(stats.name, stats.items) for stats in pipeline.stats] == [("double", 20), ("shift", 20)]
+
+
+def test_pipeline_reraises_stage_errors():
+    def fail_on_three(x):
+        if x == 3:
+            raise RuntimeError("stage failed")
+        return x
+
+    pipeline = ReplicatePipeline([("fail", fail_on_three), ("copy", lambda x: x)], queue_size=1)
+    results = []
+    with pytest.raises(RuntimeError, match="stage failed"):
+        for result in pipeline.run(range(10)):
+            results.append(result)
+    assert results == [0, 1, 2]
@@ -0,0 +1,91 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from indelsim.combined_simulator import CombinedSimulatorCLI
+from indelsim.indel_simulator import IndelSimulatorCLI, TEMP_FILE_NAME
+from indelsim.run_manifest import MANIFEST_FILE_NAME, RunManifest
+from indelsim.substitution_simulator import TEMP_FILE_NAME as TEMP_SUBS_FILE
+
+INDEL_ARGS = ("--original_sequence_length", "150", "--number_of_simulations", "5",
+              "--type", "list", "--insertion_rate", "0.03", "--deletion_rate", "0.09")
+
+
+def read_combined(output_dir: Path) -> list[str]:
+    [path] = output_dir.glob("combined_simulations_*.fasta")
+    return [line for line in path.read_text().splitlines() if "Runtime:" not in line]
+
+
+def crash_at_replicate(cli_class, monkeypatch, temp_file_name: str, crash_sim_num: int) -> None:
+    """Make replicate `crash_sim_num` die after writing part of its output."""
+    original = cli_class._run_and_save_replicate
+
+    def run_and_save(self, args, sim_num):
+        if sim_num == crash_sim_num:
+            with open(Path(args.output_directory) / temp_file_name, 'a') as f:
+                f.write(">partial\nACDE")
+            raise RuntimeError("simulated crash")
+        return original(self, args, sim_num)
+
+    monkeypatch.setattr(cli_class, "_run_and_save_replicate", run_and_save)
+
+
+def test_indel_resume_matches_uninterrupted_run(tmp_path, monkeypatch, run_cli):
+    run_cli(IndelSimulatorCLI, tmp_path / "full", *INDEL_ARGS)
+
+    with monkeypatch.context() as crash:
+        crash_at_replicate(IndelSimulatorCLI, crash, TEMP_FILE_NAME, 3)
+        with pytest.raises(SystemExit):
+            run_cli(IndelSimulatorCLI, tmp_path / "resumed", *INDEL_ARGS)
+    assert (tmp_path / "resumed" / MANIFEST_FILE_NAME).exists()
+
+    run_cli(IndelSimulatorCLI, tmp_path / "resumed", *INDEL_ARGS, "--resume")
+    assert read_combined(tmp_path / "resumed") == read_combined(tmp_path / "full")
+    assert not (tmp_path / "resumed" / MANIFEST_FILE_NAME).exists()
+
+
+def test_resume_rejects_changed_parameters(tmp_path, monkeypatch, capsys, run_cli):
+    with monkeypatch.context() as crash:
+        crash_at_replicate(IndelSimulatorCLI, crash, TEMP_FILE_NAME, 2)
+        with pytest.raises(SystemExit):
+            run_cli(IndelSimulatorCLI, tmp_path, *INDEL_ARGS)
+
+    with pytest.raises(SystemExit):
+        run_cli(IndelSimulatorCLI, tmp_path, *INDEL_ARGS, "--seed", "7", "--resume")
+    assert "parameters differ" in capsys.readouterr().err
+
+
+def test_combined_resume_with_jobs_matches_uninterrupted_run(tmp_path, monkeypatch, run_cli):
+    combined_args = (*INDEL_ARGS, "--substitution_rate", "1.0", "--algorithm", "matrix")
+    run_cli(CombinedSimulatorCLI, tmp_path / "full", *combined_args)
+
+    with monkeypatch.context() as crash:
+        crash_at_replicate(CombinedSimulatorCLI, crash, TEMP_SUBS_FILE, 1)
+        with pytest.raises(RuntimeError):
+            run_cli(CombinedSimulatorCLI, tmp_path / "resumed", *combined_args)
+
+    run_cli(CombinedSimulatorCLI, tmp_path / "resumed", *combined_args, "--resume", "--jobs", "2")
+    assert read_combined(tmp_path / "resumed") == read_combined(tmp_path / "full")
+
+
+def test_combined_resume_with_pipeline_matches_uninterrupted_run(tmp_path, monkeypatch, run_cli):
+    combined_args = (*INDEL_ARGS, "--substitution_rate", "1.0", "--algorithm", "matrix", "--pipeline")
+    run_cli(CombinedSimulatorCLI, tmp_path / "full", *combined_args)
+
+    original_record = RunManifest.record
+
+    def slow_record_then_kill(self, sim_num, temp_file=None):
+        # A slow checkpoint gives the later replicates time to be merged meanwhile
+        time.sleep(0.05)
+        original_record(self, sim_num, temp_file)
+        if sim_num == 2:
+            raise RuntimeError("killed after checkpointing replicate 2")
+
+    with monkeypatch.context() as crash:
+        crash.setattr(RunManifest, "record", slow_record_then_kill)
+        with pytest.raises(RuntimeError):
+            run_cli(CombinedSimulatorCLI, tmp_path / "resumed", *combined_args)
+
+    run_cli(CombinedSimulatorCLI, tmp_path / "resumed", *combined_args, "--resume")
+    assert read_combined(tmp_path / "resumed") == read_combined(tmp_path / "full")
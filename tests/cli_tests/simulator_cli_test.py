@@ -0,0 +1,31 @@
+import argparse
+
+import pytest
+
+from indelsim.combined_simulator import CombinedSimulatorCLI
+from indelsim.indel_simulator import IndelSimulatorCLI
+from indelsim.simulator_cli import RUN_ARGUMENTS, add_run_arguments
+from indelsim.substitution_simulator import SubstitutionSimulatorCLI
+
+
+def run_actions(parser: argparse.ArgumentParser) -> dict:
+    return {action.dest: (action.option_strings, action.default, action.help, type(action))
+            for action in parser._actions if action.dest in RUN_ARGUMENTS}
+
+
+@pytest.mark.parametrize("cli_class", [IndelSimulatorCLI, SubstitutionSimulatorCLI, CombinedSimulatorCLI])
+def test_every_cli_takes_the_shared_run_arguments(cli_class):
+    shared = argparse.ArgumentParser()
+    add_run_arguments(shared)
+    assert run_actions(cli_class().parser) == run_actions(shared)
+    assert sorted(run_actions(shared)) == sorted(RUN_ARGUMENTS)
+
+
+@pytest.mark.parametrize("cli_class", [IndelSimulatorCLI, SubstitutionSimulatorCLI, CombinedSimulatorCLI])
+def test_every_cli_rejects_tracing_a_process_pool(cli_class, run_cli, tmp_path, capsys):
+    args = ["--trace", str(tmp_path / "trace.json"), "--jobs", "2"]
+    if cli_class is not SubstitutionSimulatorCLI:
+        args += ["--type", "list", "--insertion_rate", "0.01", "--deletion_rate", "0.01"]
+    with pytest.raises(SystemExit):
+        run_cli(cli_class, tmp_path, *args)
+    assert "--trace records this process only" in capsys.readouterr().err
@@ -0,0 +1,60 @@
+import json
+
+from indelsim.combined_simulator import CombinedSimulatorCLI
+from indelsim.tracing import memory_profile, span, start_tracing, stop_tracing
+
+
+def test_spans_are_not_recorded_unless_tracing():
+    with span("ignored"):
+        pass
+    tracer = start_tracing()
+    try:
+        with span("outer", "test", size=3):
+            with span("inner", "test"):
+                pass
+    finally:
+        assert stop_tracing() is tracer
+    with span("ignored"):
+        pass
+
+    inner, outer = tracer.events
+    assert (inner["name"], outer["name"], outer["args"]) == ("inner", "outer", {"size": 3})
+    assert outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+
+
+def test_combined_run_writes_chrome_trace(tmp_path, run_cli):
+    trace_path = tmp_path / "trace.json"
+    run_cli(CombinedSimulatorCLI, tmp_path / "out", "--original_sequence_length", "150",
+            "--number_of_simulations", "2", "--type", "tree", "--insertion_rate", "0.03", "--deletion_rate", "0.09",
+            "--trace", str(trace_path))
+
+    events = [event for event in json.loads(trace_path.read_text())["traceEvents"] if event["ph"] == "X"]
+    names = {event["name"] for event in events}
+    assert {"generate events", "block updates", "generate sequence", "set absolute positions", "render MSA",
+            "substitute branch", "write row", "replicate", "save replicate"} <= names
+    assert sum(event["name"] == "replicate" for event in events) == 2
+
+
+def test_memory_profile_accounts_nested_phases():
+    import tracemalloc
+
+    with memory_profile() as memory:
+        with span("outer"):
+            kept = bytearray(2_000_000)
+            for _ in range(3):
+                with span("inner"):
+                    temporary = bytearray(4_000_000)
+                    del temporary
+    assert not tracemalloc.is_tracing()
+
+    phases = {phase["name"]: phase for phase in memory.report()}
+    assert phases["inner"]["calls"] == 3
+    assert phases["inner"]["peak_bytes"] >= 4_000_000
+    assert abs(phases["inner"]["net_bytes"]) < 100_000
+    # The peak of the inner phases counts for the outer one too
+    assert phases["outer"]["peak_bytes"] >= 6_000_000
+    assert phases["outer"]["net_bytes"] >= 2_000_000
+    del kept
+
+    with memory_profile(enabled=False) as memory:
+        assert memory is None
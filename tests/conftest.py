@@ -0,0 +1,28 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+TREE_FILE = Path(__file__).parents[1] / "benchmark" / "scaled_trees" / "test_tree.txt"
+
+
+@pytest.fixture
+def tree_file() -> Path:
+    """The 40-leaf test tree of the benchmark data."""
+    return TREE_FILE
+
+
+@pytest.fixture
+def run_cli(monkeypatch):
+    """
+    Run a simulator CLI on the test tree as if from the command line.
+
+    Usage: ``run_cli(cli_class, output_dir, *args)``, where `args` are the
+    command-line arguments besides --tree_file and --output_directory.
+    """
+    def run(cli_class, output_dir: Path, *args: str) -> None:
+        argv = ["simulator", "--tree_file", str(TREE_FILE), "--output_directory", str(output_dir), *args]
+        monkeypatch.setattr(sys, "argv", argv)
+        cli_class().run()
+
+    return run
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from indelsim.bench.complexity import (best_models, collect_samples, fit_cost_models, fit_per_event_slopes,
+                                       fit_slopes, write_report)
+
+
+@pytest.fixture(scope="module")
+def samples():
+    return collect_samples(engines=["naive", "tree"], root_lengths=[200, 800], mean_branch_lengths=[0.1, 0.4],
+                           leaves=8)
+
+
+def test_samples_cover_every_branch_and_phase(samples):
+    branches = 2 * 8 - 2
+    grid_points = 4
+    phases = {}
+    for sample in samples:
+        phases.setdefault((sample["engine"], sample["phase"]), []).append(sample)
+    assert len(phases["naive", "events"]) == len(phases["tree", "events"]) == branches * grid_points
+    assert len(phases["tree", "sequence"]) == branches * grid_points
+    assert len(phases["naive", "alignment"]) == len(phases["tree", "render"]) == grid_points
+
+    # The same branch has the same k, b and n' whatever the engine
+    naive = {(s["root_length"], s["mean_branch_length"], s["node"]): (s["k"], s["b"], s["n_after"])
+             for s in phases["naive", "events"]}
+    tree = {(s["root_length"], s["mean_branch_length"], s["node"]): (s["k"], s["b"], s["n_after"])
+            for s in phases["tree", "events"]}
+    assert naive == tree
+
+
+def test_report_is_written(samples, tmp_path):
+    report = write_report(samples, tmp_path, plot=False)
+    text = report.read_text()
+    assert (tmp_path / "samples.csv").exists()
+    assert "| tree | events |" in text
+    assert {fit.engine for fit in fit_slopes(samples)} == {"naive", "tree"}
+    assert set(fit_per_event_slopes(samples)) == {"naive", "tree"}
+
+
+def test_cost_models_recover_the_generating_model():
+    rng = np.random.default_rng(0)
+    samples = []
+    for _ in range(200):
+        k, b = int(rng.integers(1, 200)), int(rng.integers(1, 400))
+        samples.append({"engine": "list", "phase": "events", "k": k, "b": b, "n_after": 1000,
+                        "seconds": 2e-6 + 5e-8 * k * b * rng.uniform(0.95, 1.05)})
+    fits = fit_cost_models(samples)
+    best = best_models(fits)["list"]
+    assert best.model == "k*b"
+    assert best.seconds_per_unit == pytest.approx(5e-8, rel=0.05)
+    assert all(fit.overhead_seconds >= 0 for fit in fits)
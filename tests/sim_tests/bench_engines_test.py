@@ -0,0 +1,54 @@
+import pytest
+
+from indelsim.bench.engines import (DEFAULT_STREAMS, ENGINES, EventStreamSpec, compare_to_baseline, generate_events,
+                                    load_baseline, run_engine_benchmark, run_engine_suite, save_baseline)
+
+
+@pytest.mark.parametrize("spec", [spec.scaled(0.05) for spec in DEFAULT_STREAMS], ids=lambda spec: spec.name)
+def test_engines_agree_on_synthetic_streams(spec):
+    events = generate_events(spec)
+    assert len(events) == spec.events
+
+    sequence_length = spec.sequence_length
+    for event in events:
+        assert event.length > 0
+        if event.is_insertion:
+            assert 0 <= event.place <= sequence_length
+            sequence_length += event.length
+        else:
+            assert 0 <= event.place and event.place + event.length <= sequence_length
+            sequence_length -= event.length
+
+    nodes = {}
+    for name, factory in ENGINES.items():
+        nodes[name] = factory(spec.sequence_length)
+        for event in events:
+            nodes[name].calculate_event(event)
+        assert nodes[name].get_length() == sequence_length
+    assert nodes["list"].get_blocklist_str() == nodes["tree"].get_blocklist_str()
+
+
+def test_adversarial_patterns_place_events_as_described():
+    at_end = generate_events(EventStreamSpec("at_end", sequence_length=100, events=50, pattern="at_end"))
+    sequence_length = 100
+    for event in at_end:
+        assert event.place + (0 if event.is_insertion else event.length) == sequence_length
+        sequence_length += event.length if event.is_insertion else -event.length
+
+    at_start = generate_events(EventStreamSpec("at_start", sequence_length=100, events=50, pattern="at_start"))
+    assert all(event.place == 0 for event in at_start)
+
+    tiny = EventStreamSpec("tiny_blocks", sequence_length=1000, events=200, pattern="tiny_blocks")
+    assert all(event.length == 1 for event in generate_events(tiny))
+    assert run_engine_benchmark("tree", tiny, repeats=1).blocks > 150
+
+
+def test_regressions_against_baseline(tmp_path):
+    streams = [EventStreamSpec("small", sequence_length=200, events=50)]
+    measurements = run_engine_suite(["list", "tree"], streams, repeats=1)
+    baseline = load_baseline(save_baseline(measurements, tmp_path / "engines.json"))
+    assert compare_to_baseline(measurements, baseline) == []
+
+    baseline["tree/small"]["ns_per_event"] = measurements[1].ns_per_event / 2
+    regressions = compare_to_baseline(measurements, baseline)
+    assert len(regressions) == 1 and regressions[0].startswith("tree/small")
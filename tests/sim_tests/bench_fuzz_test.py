@@ -0,0 +1,61 @@
+from indelsim.bench.engines import ENGINES
+from indelsim.bench.fuzz import (MSA_BUILDERS, EventCase, TreeCase, check_event_case, check_tree_case,
+                                 homology_columns, run_fuzz)
+from indelsim.classes.indel_event import IndelEvent
+from indelsim.classes.seq_node_as_list import SequenceNodeAsList
+
+
+class _LosesLongInsertions(SequenceNodeAsList):
+    def calculate_event(self, event: IndelEvent):
+        if event.is_insertion and event.length >= 3:
+            return
+        super().calculate_event(event)
+
+
+def test_engines_and_builders_agree_with_the_oracle():
+    result = run_fuzz(iterations=150, seed=3)
+    assert result.failure is None
+    assert result.iterations == result.event_cases == result.tree_cases == 150
+
+
+def test_insertion_into_an_emptied_sequence():
+    case = EventCase(5, [IndelEvent(False, 0, 5), IndelEvent(True, 0, 2), IndelEvent(True, 1, 1)])
+    assert check_event_case(case) == []
+
+    tree_case = TreeCase("((t1:1,t2:1)n1:1,t3:1)n0;", 4, {
+        "n1": [IndelEvent(False, 0, 4)], "t1": [IndelEvent(True, 0, 3)], "t3": [IndelEvent(True, 2, 1)]})
+    assert check_tree_case(tree_case) == []
+
+
+def test_broken_engine_is_shrunk_to_a_minimal_reproducer(monkeypatch):
+    monkeypatch.setitem(ENGINES, "broken", lambda length: _LosesLongInsertions(0, length))
+    result = run_fuzz(iterations=200, seed=0, engines=["broken"], builders=[])
+
+    failure = result.failure
+    assert failure is not None and failure.kind == "engine" and failure.name == "broken"
+    assert failure.case.sequence_length == 1
+    assert [(e.is_insertion, e.place, e.length) for e in failure.case.events] == [(True, 0, 3)]
+    exec(failure.reproducer(), {})
+
+
+def test_broken_builder_is_shrunk_to_two_leaves(monkeypatch):
+    def swapped_rows(case):
+        rows = MSA_BUILDERS["tree"](case)
+        first, second = sorted(rows)[:2]
+        rows[first], rows[second] = rows[second], rows[first]
+        return rows
+
+    monkeypatch.setitem(MSA_BUILDERS, "swapped", swapped_rows)
+    result = run_fuzz(iterations=50, seed=1, builders=["swapped"], max_leaves=8)
+
+    failure = result.failure
+    assert failure is not None and failure.kind == "msa" and failure.name == "swapped"
+    leaves, events = failure.case.size[:2]
+    assert leaves == 2 and events == 1
+    exec(failure.reproducer(), {})
+
+
+def test_homology_columns_ignore_column_order_and_all_gap_columns():
+    rows = {"a": "X-X-", "b": "XX--"}
+    assert homology_columns(rows) == [(("a", 0), ("b", 0)), (("a", 1),), (("b", 1),)]
+    assert homology_columns({"a": "-X-X", "b": "-XX-"}) == homology_columns(rows)
@@ -0,0 +1,48 @@
+import pytest
+
+from indelsim.bench.harness import (CASES, BenchmarkCase, CaseResult, compare_results, load_results, run_case,
+                                    save_results, select_cases)
+
+
+def test_setup_is_not_timed_and_warmup_is_not_recorded():
+    calls = {"setup": 0, "run": 0}
+
+    def setup():
+        calls["setup"] += 1
+        return calls["setup"]
+
+    def run(state):
+        calls["run"] += 1
+        assert state == calls["setup"]
+
+    result = run_case(BenchmarkCase("counting", run, setup), warmup=2, repetitions=5)
+    assert calls == {"setup": 7, "run": 7}
+    assert len(result.samples) == 5
+    assert result.q1 <= result.median <= result.q3
+
+
+def test_select_cases_by_pattern():
+    assert [case.name for case in select_cases(["indels/*"])] == ["indels/naive", "indels/list", "indels/tree"]
+    assert len(select_cases()) == len(CASES)
+    with pytest.raises(ValueError):
+        select_cases(["no/such/case"])
+
+
+def test_default_cases_run():
+    for name in ("events", "indels/tree", "render/tree", "substitution/matrix", "engine_stream/tree/at_end"):
+        assert len(run_case(CASES[name], warmup=0, repetitions=1).samples) == 1
+
+
+def test_baselines_are_tagged_and_compared(tmp_path):
+    steady = [1.0, 1.01, 0.99, 1.02, 0.98, 1.0, 1.01, 0.99]
+    old = [CaseResult("same", steady), CaseResult("slower", steady), CaseResult("faster", steady)]
+    new = [CaseResult("same", [t + 0.001 for t in steady]), CaseResult("slower", [t * 1.5 for t in steady]),
+           CaseResult("faster", [t * 0.5 for t in steady]), CaseResult("added", steady)]
+
+    old_path = save_results(old, tmp_path, warmup=1, repetitions=8)
+    assert old_path.parent == tmp_path and old_path.stem == load_results(old_path)["revision"]
+    new_path = save_results(new, tmp_path / "new.json", warmup=1, repetitions=8)
+
+    comparisons = compare_results(load_results(old_path), load_results(new_path))
+    assert {comparison.name: comparison.verdict for comparison in comparisons} == {
+        "same": "unchanged", "slower": "regression", "faster": "speedup"}
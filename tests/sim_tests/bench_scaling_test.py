@@ -0,0 +1,65 @@
+import pytest
+from ete3 import Tree
+
+from indelsim.bench.scaling import fit_power_law, fit_scaling, run_scaling_benchmark
+from indelsim.bench.trees import TREE_SHAPES, generate_tree
+
+
+@pytest.mark.parametrize("shape", sorted(TREE_SHAPES))
+def test_generated_trees_have_requested_leaves_and_length(shape):
+    synthetic = generate_tree(shape, 37, total_length=12.5, seed=7)
+    tree = Tree(synthetic.to_newick())
+
+    assert len(tree) == 37
+    assert sorted(leaf.name for leaf in tree) == sorted(f"t{i}" for i in range(1, 38))
+    assert all(len(node.children) in (0, 2) for node in tree.traverse())
+    assert sum(node.dist for node in tree.traverse() if not node.is_root()) == pytest.approx(12.5, rel=1e-6)
+
+
+def test_tree_shapes():
+    yule = Tree(generate_tree("yule", 50, seed=1).to_newick())
+    depths = [yule.get_distance(leaf) for leaf in yule]
+    assert max(depths) == pytest.approx(min(depths))
+
+    balanced = Tree(generate_tree("balanced", 64).to_newick())
+    assert {len(leaf.get_ancestors()) for leaf in balanced} == {6}
+
+    caterpillar = Tree(generate_tree("caterpillar", 64).to_newick())
+    assert max(len(leaf.get_ancestors()) for leaf in caterpillar) == 63
+
+
+def test_large_deep_trees_are_built_without_recursion():
+    newick = generate_tree("caterpillar", 20_000).to_newick()
+    assert newick.count("(") == 19_999
+
+
+def test_fit_power_law_recovers_exponent():
+    coefficient, exponent = fit_power_law([10, 100, 1000], [3 * n ** 1.5 for n in (10, 100, 1000)])
+    assert coefficient == pytest.approx(3)
+    assert exponent == pytest.approx(1.5)
+
+
+def test_scaling_benchmark_measures_every_method():
+    rows = list(run_scaling_benchmark(shapes=["balanced"], leaf_counts=[4, 8], engines=["list", "tree"],
+                                      algorithms=["matrix"], sequence_length=100, repeats=1))
+    assert [(row["leaves"], row["phase"], row["method"]) for row in rows] == [
+        (4, "indel", "list"), (4, "indel", "tree"), (4, "substitution", "matrix"),
+        (8, "indel", "list"), (8, "indel", "tree"), (8, "substitution", "matrix"),
+    ]
+    assert all(row["seconds"] > 0 and row["peak_bytes"] > 0 for row in rows)
+    assert rows[0]["msa_length"] == rows[1]["msa_length"]
+
+    fits = fit_scaling(rows)
+    assert [(fit.phase, fit.method) for fit in fits] == [("indel", "list"), ("indel", "tree"),
+                                                         ("substitution", "matrix")]
+    assert all(fit.memory_exponent is not None for fit in fits)
+
+
+def test_repeats_time_the_same_replicate():
+    def msa_lengths(repeats):
+        rows = run_scaling_benchmark(shapes=["yule"], leaf_counts=[8], engines=["tree"], algorithms=[],
+                                     sequence_length=100, mean_branch_length=0.5, repeats=repeats,
+                                     measure_memory=False)
+        return [row["msa_length"] for row in rows]
+
+    assert msa_lengths(3) == msa_lengths(1)
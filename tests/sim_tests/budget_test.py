@@ -0,0 +1,45 @@
+import pytest
+
+from indelsim import simulate
+from indelsim.classes import SimConfiguration, Simulation, SimulationBudgetExceeded
+
+
+def make_config(**budgets) -> SimConfiguration:
+    # Insertions far outpace deletions, so sequences keep growing down the tree
+    return SimConfiguration(original_sequence_length=500, indel_length_alpha=2.0, indel_truncated_length=50,
+                            rate_ins=0.5, rate_del=0.01, deletion_extra_edge_length=49, seed=3, **budgets)
+
+
+@pytest.mark.parametrize("budget, limit", [
+    ("max_sequence_length", 900),
+    ("max_events_per_branch", 20),
+    ("max_total_events", 200),
+    ("max_msa_length", 1000),
+])
+def test_budget_rejects_during_event_generation(budget, limit, tree_file):
+    with pytest.raises(SimulationBudgetExceeded) as exc_info:
+        Simulation(str(tree_file), make_config(**{budget: limit}))
+    rejection = exc_info.value.as_dict()
+    assert rejection["budget"] == budget
+    assert rejection["value"] > limit
+
+
+def test_exact_msa_length_is_checked_before_rendering(tree_file):
+    simulation = Simulation(str(tree_file), make_config())
+    simulation.msa_from_blocklist()
+    msa_length = simulation.msa._msa_length
+
+    budgeted = Simulation(str(tree_file), make_config(max_msa_length=msa_length - 1))
+    with pytest.raises(SimulationBudgetExceeded):
+        budgeted.msa_from_blocktree()
+
+    accepted = Simulation(str(tree_file), make_config(max_msa_length=msa_length))
+    accepted.msa_from_blocktree()
+    assert accepted.msa._msa_length == msa_length
+
+
+def test_simulate_reports_rejected_replicates(tree_file):
+    results = list(simulate(tree_file, make_config(max_sequence_length=1500), n=4, engine="list"))
+    rejected = [result for result in results if result["rejected"]]
+    assert rejected and all(result["msa"] is None for result in rejected)
+    assert all(result["msa"] for result in results if not result["rejected"])
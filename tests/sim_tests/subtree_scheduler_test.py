@@ -0,0 +1,106 @@
+import copy
+from concurrent.futures import Future
+from pathlib import Path
+
+import pytest
+from ete3 import Tree
+
+from indelsim.api import simulate
+from indelsim.classes.sim_config import SimConfiguration, SimulationBudgetExceeded
+from indelsim.classes import subtree_scheduler
+from indelsim.classes.subtree_scheduler import SubtreeScheduler
+from indelsim.enums import SimulationTypes
+
+config: SimConfiguration = SimConfiguration(
+    original_sequence_length=200, indel_length_alpha=2.0, indel_truncated_length=50, deletion_extra_edge_length=49,
+    rate_ins=0.03, rate_del=0.09, seed=5)
+
+
+def scheduled_msa(tree_file: Path, sim_type: SimulationTypes, split_depth: int, workers: int) -> str:
+    msa = SubtreeScheduler(tree_file, config, sim_type, split_depth, workers).run()
+    msa.compute_msa()
+    return str(msa)
+
+
+def test_msa_independent_of_worker_count_and_split_depth(tree_file):
+    reference = scheduled_msa(tree_file, SimulationTypes.BLOCK_TREE, split_depth=1, workers=1)
+    assert scheduled_msa(tree_file, SimulationTypes.BLOCK_TREE, split_depth=3, workers=3) == reference
+    assert scheduled_msa(tree_file, SimulationTypes.BLOCK_LIST, split_depth=2, workers=2) == reference
+
+
+def test_msa_rows_cover_all_leaves_with_equal_length(tree_file):
+    rows = scheduled_msa(tree_file, SimulationTypes.BLOCK_LIST, split_depth=2, workers=1).splitlines()
+    names, sequences = rows[::2], rows[1::2]
+    assert len(names) == 40
+    assert len({len(seq) for seq in sequences}) == 1
+
+
+class _InProcessExecutor:
+    """Stands in for ProcessPoolExecutor, running the worker initializer and tasks in this process."""
+
+    def __init__(self, max_workers, initializer, initargs):
+        initializer(*initargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def submit(self, function, *args):
+        future = Future()
+        future.set_result(function(*args))
+        return future
+
+
+def test_workers_receive_exact_branch_lengths(tmp_path, tree_file, monkeypatch):
+    tree = Tree(str(tree_file))
+    for idx, node in enumerate(tree.traverse()):
+        node.dist = 0.0123456789123 * (idx % 7 + 1)
+    precise_tree_file = tmp_path / "precise.newick"
+    precise_tree_file.write_text(tree.write(dist_formatter="%0.17g"))
+
+    serial = scheduled_msa(precise_tree_file, SimulationTypes.BLOCK_TREE, split_depth=2, workers=1)
+    monkeypatch.setattr(subtree_scheduler, "ProcessPoolExecutor", _InProcessExecutor)
+    pooled = scheduled_msa(precise_tree_file, SimulationTypes.BLOCK_TREE, split_depth=2, workers=2)
+
+    # The root has no branch
+    expected_lengths = [node.dist for node in tree.traverse("preorder")][1:]
+    assert [node.dist for node in subtree_scheduler._WORKER_NODES][1:] == expected_lengths
+    assert pooled == serial
+
+
+def budget_config(**budgets) -> SimConfiguration:
+    budgeted = copy.copy(config)
+    for budget, limit in budgets.items():
+        setattr(budgeted, budget, limit)
+    return budgeted
+
+
+@pytest.mark.parametrize("split_depth, workers", [(1, 1), (2, 2), (3, 3)])
+def test_total_events_budget_covers_the_whole_replicate(tree_file, monkeypatch, split_depth, workers):
+    scheduler = SubtreeScheduler(tree_file, config)
+    scheduler.run()
+    total_events = scheduler.total_events
+    monkeypatch.setattr(subtree_scheduler, "ProcessPoolExecutor", _InProcessExecutor)
+
+    SubtreeScheduler(tree_file, budget_config(max_total_events=total_events), split_depth=split_depth,
+                     workers=workers).run()
+    with pytest.raises(SimulationBudgetExceeded) as exceeded:
+        SubtreeScheduler(tree_file, budget_config(max_total_events=total_events - 1), split_depth=split_depth,
+                         workers=workers).run()
+    assert exceeded.value.budget == "max_total_events"
+
+
+def test_root_longer_than_the_sequence_budget_is_rejected(tree_file):
+    with pytest.raises(SimulationBudgetExceeded) as exceeded:
+        SubtreeScheduler(tree_file, budget_config(max_sequence_length=199)).run()
+    assert (exceeded.value.budget, exceeded.value.node_id) == ("max_sequence_length", 0)
+
+
+def test_api_runs_the_scheduler(tree_file):
+    [result] = simulate(tree_file, config, engine="list", subtree_workers=2, split_depth=2)
+    rows = scheduled_msa(tree_file, SimulationTypes.BLOCK_LIST, split_depth=1, workers=1).splitlines()
+    assert result["msa"] == {name[1:]: row for name, row in zip(rows[::2], rows[1::2])}
+    with pytest.raises(ValueError):
+        next(simulate(tree_file, config, engine="naive", subtree_workers=2))
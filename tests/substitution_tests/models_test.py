@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from ete3 import Tree
+
+from indelsim.classes.jtt import get_jtt_model
+from indelsim.classes.models import SUBSTITUTION_MODELS, get_model
+from indelsim.classes.reversible_model import SubstitutionModelError
+from indelsim.classes.substitution import SubstitutionEvolver, _Packed2Bit, sample_root_sequence
+
+
+@pytest.mark.parametrize("name", sorted(SUBSTITUTION_MODELS))
+def test_models_are_valid_reversible_models(name):
+    model = get_model(name)
+    assert all(model.validate_model_properties().values())
+    assert np.isclose(model.equilibrium_frequencies.sum(), 1.0)
+    assert get_model(name) is model
+
+
+def test_registry_shares_jtt_and_keys_by_parameters():
+    assert get_model("JTT") is get_jtt_model()
+    assert get_model("hky", kappa=4.0) is get_model("hky", kappa=4.0)
+    assert get_model("hky", kappa=4.0) is not get_model("hky", kappa=2.0)
+    with pytest.raises(ValueError):
+        get_model("blosum")
+    with pytest.raises(SubstitutionModelError):
+        get_model("gtr", rates=[1, 2, 3])
+
+
+def test_hky_transitions_are_faster():
+    P = get_model("hky", kappa=8.0).transition_probability(0.1)
+    a, c, g, t = range(4)
+    assert P[a, g] > 4 * P[a, c]
+    assert P[c, t] > 4 * P[c, g]
+
+
+@pytest.mark.parametrize("length", [0, 1, 5, 8, 1001])
+def test_packed_2bit_round_trip(length):
+    sequence = np.random.default_rng(length).integers(0, 4, size=length).astype(np.uint8)
+    packed = _Packed2Bit(sequence)
+    assert packed.data.nbytes == -(-length // 4)
+    assert np.array_equal(packed.unpack(), sequence)
+
+
+@pytest.mark.parametrize("algorithm", ["matrix", "gillespie"])
+def test_dna_evolution_stays_in_the_alphabet(algorithm):
+    model = get_model("gtr", rates=[1, 3, 1, 1, 3, 1], frequencies=[0.4, 0.1, 0.1, 0.4])
+    tree = Tree("((A:0.1,B:0.2):0.05,(C:0.3,D:0.1):0.2);")
+    root = sample_root_sequence(500, 3, model)
+    assert root.max() < 4
+
+    evolver = SubstitutionEvolver(seed=3, model=model)
+    leaves = list(evolver.evolve_tree(tree, root, algorithm))
+    assert [node.name for _, node, _ in leaves] == ["A", "B", "C", "D"]
+    for _, _, sequence in leaves:
+        assert len(sequence) == 500
+        assert sequence.max() < 4
+
+
+@pytest.mark.parametrize("name", sorted(SUBSTITUTION_MODELS))
+def test_residue_bytes_match_alphabet(name):
+    model = get_model(name)
+    states = np.random.default_rng(5).integers(0, model.num_states + 1, size=300).astype(np.uint8)
+    row = model.residue_bytes(states)
+    assert isinstance(row, bytes)
+    characters = model.alphabet + "-"
+    assert row.decode("ascii") == "".join(characters[state] for state in states)
+
+
+
+@pytest.mark.parametrize("recycle_buffers", [False, True])
+def test_packed_parents_are_unpacked_once(monkeypatch, recycle_buffers):
+    model = get_model("hky")
+    tree = Tree("(((A:0.1,B:0.2):0.1,(C:0.1,D:0.3):0.2,E:0.1):0.05,(F:0.3,G:0.1):0.2);")
+    root = sample_root_sequence(1001, 4, model)
+    expected = [sequence.copy() for _, _, sequence in SubstitutionEvolver(seed=4, model=model).evolve_tree(tree, root)]
+
+    unpacked = []
+    unpack = _Packed2Bit.unpack
+    # Holding on to the packed sequences keeps their ids unique
+    monkeypatch.setattr(_Packed2Bit, "unpack", lambda self, out=None: unpacked.append(self) or unpack(self, out))
+    evolver = SubstitutionEvolver(seed=4, model=model)
+    leaves = [sequence.copy() for _, _, sequence in evolver.evolve_tree(tree, root, recycle_buffers=recycle_buffers)]
+
+    # Only parents waiting across the subtree of an internal child are packed: the
+    # root while (AB,CD,E) is evolved, and (AB,CD,E) while AB and while CD are
+    assert len(unpacked) == len(set(map(id, unpacked))) == 3
+    assert all(np.array_equal(a, b) for a, b in zip(leaves, expected, strict=True))
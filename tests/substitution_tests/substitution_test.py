@@ -0,0 +1,133 @@
+import numpy as np
+import pytest
+from ete3 import Tree
+
+from indelsim.classes.jtt import get_jtt_model
+from indelsim.classes.substitution import SubstitutionEvolver, TransitionCache, _SumTree, sample_root_sequence
+
+
+def test_sum_tree_matches_cumulative_search():
+    rng = np.random.default_rng(0)
+    rates = rng.random(37)
+    tree = _SumTree(rates)
+    tree.update(5, 2.5)
+    rates[5] = 2.5
+    assert np.isclose(tree.total, rates.sum())
+    for x in rng.random(200) * rates.sum():
+        assert tree.find(x) == np.cumsum(rates).searchsorted(x, side='right')
+
+
+def test_gillespie_matches_transition_probabilities():
+    # Starting every site in the same residue, the residues after time t are
+    # independent draws from the corresponding row of P(t)
+    sites, branch_length, start = 20000, 0.3, 3
+    evolver = SubstitutionEvolver(substitution_rate=1.0, seed=7)
+    evolved = evolver.evolve_branch_substitutions_gillespie(np.full(sites, start), branch_length)
+
+    expected = get_jtt_model().transition_probability(branch_length)[start]
+    observed = np.bincount(evolved, minlength=20) / sites
+    assert np.all(np.abs(observed - expected) < 4 * np.sqrt(expected * (1 - expected) / sites) + 1e-3)
+
+
+def test_matrix_sampler_matches_transition_probabilities():
+    sites, branch_length = 40000, 0.2
+    evolver = SubstitutionEvolver(substitution_rate=1.0, seed=11)
+    start = np.repeat(np.arange(20, dtype=np.uint8), sites // 20)
+    evolved = evolver.evolve_branch_substitutions_jtt(start, branch_length)
+    assert evolved.dtype == np.uint8 and len(evolved) == sites
+
+    P_t = get_jtt_model().transition_probability(branch_length)
+    for aa in (0, 9, 19):
+        observed = np.bincount(evolved[start == aa], minlength=20) / (sites // 20)
+        assert np.all(np.abs(observed - P_t[aa]) < 4 * np.sqrt(P_t[aa] * (1 - P_t[aa]) / (sites // 20)) + 1e-3)
+
+
+def test_sparse_sampler_matches_transition_probabilities_without_touching_parent():
+    sites, branch_length = 40000, 0.05
+    start = np.repeat(np.arange(20, dtype=np.uint8), sites // 20)
+    parent = start.copy()
+    evolved = SubstitutionEvolver(seed=5, matrix_sampler="sparse").evolve_branch_substitutions_sparse(parent,
+                                                                                                      branch_length)
+    assert np.array_equal(parent, start)
+
+    P_t = get_jtt_model().transition_probability(branch_length)
+    for aa in (0, 9, 19):
+        observed = np.bincount(evolved[start == aa], minlength=20) / (sites // 20)
+        assert np.all(np.abs(observed - P_t[aa]) < 4 * np.sqrt(P_t[aa] * (1 - P_t[aa]) / (sites // 20)) + 1e-3)
+
+    # Almost surely nothing changes on a tiny branch, and then the parent buffer is reused
+    assert SubstitutionEvolver(seed=5).evolve_branch_substitutions_sparse(parent[:100], 1e-7).base is parent
+
+
+def test_blocks_evolve_only_inherited_sites():
+    evolver = SubstitutionEvolver(substitution_rate=1.0, seed=5)
+    parent = sample_root_sequence(100, 5)
+    # Keep sites 0-9, insert 4 sites, skip 10-49, keep 50-99
+    blocks = [(0, 10, 4), (50, 50, 0)]
+
+    child = evolver.evolve_branch_with_blocks(parent, blocks, 1e-7)
+
+    assert len(child) == 64
+    assert np.array_equal(child[:10], parent[:10])
+    assert np.array_equal(child[14:], parent[50:])
+    assert child.max() < 20
+
+
+def test_transition_cache_matches_model_and_follows_branch_lengths():
+    tree = Tree("((A:0.1,B:0.25):0.05,(C:0.3,D:0.1):0.7);")
+    model = get_jtt_model()
+    cache = TransitionCache.for_tree(tree)
+    assert TransitionCache.for_tree(tree) is cache
+
+    for node in tree.traverse():
+        if node.dist > 0:
+            P, cumprob = cache.lookup(node.dist, 2.0)
+            assert np.array_equal(P, model.transition_probability(node.dist * 2.0))
+            assert np.array_equal(cumprob, np.cumsum(P, axis=1))
+    assert cache.lookup(0.123, 2.0) is None
+
+    for node in tree.traverse():
+        node.dist *= 3
+    assert TransitionCache.for_tree(tree) is not cache
+
+
+def test_transition_cache_keeps_the_matrices_of_alternating_rates(monkeypatch):
+    tree = Tree("((A:0.1,B:0.25):0.05,(C:0.3,D:0.1):0.7);")
+    model = get_jtt_model()
+    cache = TransitionCache(tree, model)
+    batches = []
+    transition_probabilities = model.transition_probabilities
+    monkeypatch.setattr(model, "transition_probabilities",
+                        lambda times: batches.append(len(times)) or transition_probabilities(times))
+
+    for rate in [1.0, 2.0, 1.0, 2.0, 0.5, 1.0]:
+        P, _ = cache.lookup(0.25, rate)
+        assert np.array_equal(P, transition_probabilities([0.25 * rate])[0])
+    assert batches == [5, 5, 5]
+
+
+def test_branches_outside_the_cache_use_the_batched_matrices():
+    evolver = SubstitutionEvolver(substitution_rate=2.0, seed=1)
+    evolver.transition_cache = TransitionCache(Tree("(A:0.1,B:0.2);"))
+    P, cumprob = evolver._transition(0.3)
+    assert np.array_equal(P, get_jtt_model().transition_probabilities([0.6])[0])
+    assert np.array_equal(cumprob, np.cumsum(P, axis=1))
+    assert not hasattr(get_jtt_model(), "_transition_probability_cached")
+
+
+@pytest.mark.parametrize("algorithm, matrix_sampler", [("matrix", "dense"), ("matrix", "sparse"), ("gillespie", "dense")])
+def test_recycled_buffers_give_the_same_leaves(algorithm, matrix_sampler):
+    tree = Tree("(((A:0.1,B:0.25):0.05,C:0.01):0.3,(D:0.3,E:0.1,F:0.2):0.7);")
+    root = sample_root_sequence(300, 9)
+
+    def leaves(recycle_buffers):
+        evolver = SubstitutionEvolver(seed=9, matrix_sampler=matrix_sampler)
+        return [(idx, sequence.copy()) for idx, _, sequence
+                in evolver.evolve_tree(tree, root, algorithm, recycle_buffers=recycle_buffers)]
+
+    root_before = root.copy()
+    recycled = leaves(True)
+    assert np.array_equal(root, root_before)
+    for (idx, sequence), (expected_idx, expected) in zip(recycled, leaves(False)):
+        assert idx == expected_idx
+        assert np.array_equal(sequence, expected)